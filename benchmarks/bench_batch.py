@@ -0,0 +1,99 @@
+"""Measure per-tick due checks, the per-event loop against a vectorized EventBatch.
+
+The per-event loop is the fire-time arithmetic the notify loop used to run
+for every event on every tick (``_check_event_notifications``). Requires the
+``vector`` extra.
+
+Usage:
+    python -m benchmarks.bench_batch [--events 100000] [--ticks 60]
+"""
+
+import argparse
+import random
+import time
+from datetime import UTC, datetime, timedelta
+
+from src.models import Event, NotificationPayload
+from src.tasks.batch import EventBatch
+from src.tasks.schedule import get_event_notifications, get_notification_range
+from src.utils.datetime import JST
+
+UNITS = ("分前", "時間前", "日前")
+
+
+def make_events(count: int, now: datetime) -> list[Event]:
+    """Create ``count`` events starting within a week of ``now``."""
+    rng = random.Random(0)
+    created = datetime(2024, 1, 1, tzinfo=UTC)
+    events = []
+    for i in range(count):
+        start_at = now + timedelta(minutes=rng.randrange(7 * 24 * 60))
+        events.append(
+            Event(
+                id=f"{i:08d}",
+                guild_id=str(900000000000000000 + i % 1000),
+                name="",
+                description=None,
+                color="#3B82F6",
+                is_all_day=rng.random() < 0.1,
+                start_at=start_at,
+                end_at=start_at + timedelta(hours=1),
+                location=None,
+                channel_id=None,
+                channel_name=None,
+                notifications=[
+                    NotificationPayload(key=k, num=rng.randint(1, 30), ty=rng.choice(UNITS))
+                    for k in range(rng.randrange(4))
+                ],
+                created_at=created,
+                updated_at=created,
+                partial=True,
+            )
+        )
+    return events
+
+
+def per_event_loop(events: list[Event], jst_now: datetime) -> list[tuple[str, int]]:
+    """Find due ``(event_id, key)`` pairs one event at a time."""
+    due = []
+    for event in events:
+        start, _ = get_notification_range(event)
+        for notification in get_event_notifications(event):
+            notify_time = start - timedelta(minutes=notification.to_minutes())
+            if timedelta(0) <= jst_now - notify_time < timedelta(minutes=1):
+                due.append((event.id, notification.key))
+    return due
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--ticks", type=int, default=60)
+    args = parser.parse_args()
+
+    now = datetime(2024, 1, 15, 10, 0, tzinfo=JST)
+    events = make_events(args.events, now)
+    ticks = [now + timedelta(minutes=i) for i in range(args.ticks)]
+
+    started = time.perf_counter()
+    batch = EventBatch(events)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    expected = [per_event_loop(events, tick) for tick in ticks]
+    loop = (time.perf_counter() - started) / len(ticks)
+
+    started = time.perf_counter()
+    actual = [batch.due_pairs(tick) for tick in ticks]
+    vectorized = (time.perf_counter() - started) / len(ticks)
+
+    assert [sorted(pairs) for pairs in actual] == [sorted(pairs) for pairs in expected]
+    print(f"events: {len(events)}  notifications: {len(batch.notifications)}")
+    print(f"per-event loop: {loop * 1000:,.2f} ms/tick")
+    print(f"EventBatch:     {vectorized * 1000:,.2f} ms/tick  (build {build * 1000:,.0f} ms once)")
+    print(f"speedup:        {loop / vectorized:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark change feed delivery through the local WebSocket stand-in.
+
+Usage:
+    python -m benchmarks.bench_change_feed [--changes 10000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from src.services.change_feed import LocalChangeFeedServer, RowChange, WebSocketChangeFeed
+
+
+async def run(changes: int) -> None:
+    """Publish ``changes`` event rows and measure delivery throughput and latency."""
+    server = LocalChangeFeedServer()
+    await server.start()
+
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    def on_change(change: RowChange) -> None:
+        latencies.append(time.perf_counter() - change.record["sent_at"])
+        if len(latencies) == changes:
+            done.set()
+
+    feed = WebSocketChangeFeed(server.url, on_change)
+    await feed.start()
+    await feed.wait_connected()
+    while server.client_count == 0:
+        await asyncio.sleep(0.01)
+
+    started = time.perf_counter()
+    for i in range(changes):
+        server.publish(
+            RowChange(
+                table="events",
+                type="UPDATE",
+                record={"id": str(i), "sent_at": time.perf_counter()},
+            )
+        )
+        if i % 500 == 0:
+            await asyncio.sleep(0)
+    await done.wait()
+    elapsed = time.perf_counter() - started
+
+    await feed.stop()
+    await server.stop()
+
+    latencies.sort()
+    print(f"changes:     {changes}")
+    print(f"throughput:  {changes / elapsed:,.0f} changes/s")
+    print(f"latency p50: {latencies[len(latencies) // 2] * 1000:.2f} ms")
+    print(f"latency p99: {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--changes", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.changes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Measure event decoding throughput, json + Event.from_dict against the msgspec codec.
+
+Requires the ``fast`` extra.
+
+Usage:
+    python -m benchmarks.bench_codec [--rows 10000] [--rounds 20]
+"""
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+
+from benchmarks.bench_models import make_rows
+from src.models import Event
+from src.services.codec import EventCodec
+
+
+def decode_with_dicts(content: bytes) -> list[Event]:
+    """Decode a response the way supabase-py and Event.from_dict do."""
+    return [Event.from_dict(row) for row in json.loads(content)]
+
+
+def measure(content: bytes, decode: Callable[[bytes], list[Event]], rounds: int) -> float:
+    """Best-of-``rounds`` rows decoded per second."""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        events = decode(content)
+        best = min(best, time.perf_counter() - started)
+    return len(events) / best
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--guilds", type=int, default=1_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    content = make_rows(args.rows, args.guilds).encode()
+    codec = EventCodec()
+    assert codec.decode_events(content) == decode_with_dicts(content)
+
+    before = measure(content, decode_with_dicts, args.rounds)
+    after = measure(content, codec.decode_events, args.rounds)
+
+    print(f"rows: {args.rows}  response: {len(content) / 1024:,.0f} KiB")
+    print(f"json + from_dict: {before:,.0f} rows/s")
+    print(f"msgspec codec:    {after:,.0f} rows/s")
+    print(f"speedup:          {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
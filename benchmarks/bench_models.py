@@ -0,0 +1,134 @@
+"""Measure the memory held per Event, against the previous plain dataclass layout.
+
+Usage:
+    python -m benchmarks.bench_models [--events 100000] [--guilds 1000]
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from src.models import Event
+from src.models.event import parse_timestamp
+
+
+@dataclass
+class LegacyNotification:
+    """NotificationPayload before slots and precomputed minutes."""
+
+    key: int
+    num: int
+    ty: str
+
+
+@dataclass
+class LegacyEvent:
+    """Event before slots, interning and the parsed color."""
+
+    id: str
+    guild_id: str
+    name: str
+    description: str | None
+    color: str
+    is_all_day: bool
+    start_at: datetime
+    end_at: datetime
+    location: str | None
+    channel_id: str | None
+    channel_name: str | None
+    notifications: list[LegacyNotification]
+    created_at: datetime | None
+    updated_at: datetime
+    partial: bool = False
+
+
+def legacy_from_dict(data: dict[str, Any]) -> LegacyEvent:
+    """Build a LegacyEvent the way Event.from_dict used to."""
+    return LegacyEvent(
+        id=data["id"],
+        guild_id=data["guild_id"],
+        name=data["name"],
+        description=data.get("description"),
+        color=data["color"],
+        is_all_day=data["is_all_day"],
+        start_at=parse_timestamp(data["start_at"]),
+        end_at=parse_timestamp(data["end_at"]),
+        location=data.get("location"),
+        channel_id=data.get("channel_id"),
+        channel_name=data.get("channel_name"),
+        notifications=[
+            LegacyNotification(key=n["key"], num=n["num"], ty=n["type"])
+            for n in data["notifications"]
+        ],
+        created_at=parse_timestamp(data["created_at"]),
+        updated_at=parse_timestamp(data["updated_at"]),
+    )
+
+
+def make_rows(events: int, guilds: int) -> str:
+    """Encode ``events`` rows spread over ``guilds`` guilds as PostgREST JSON."""
+    now = datetime(2024, 1, 1, tzinfo=UTC)
+    rows = [
+        {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "guild_id": str(900000000000000000 + i % guilds),
+            "name": f"Event {i}",
+            "description": None,
+            "color": "#3B82F6",
+            "is_all_day": False,
+            "start_at": (now + timedelta(hours=i)).isoformat(),
+            "end_at": (now + timedelta(hours=i + 1)).isoformat(),
+            "location": None,
+            "channel_id": str(800000000000000000 + i % guilds),
+            "channel_name": "general",
+            "notifications": [{"key": 0, "num": 10, "type": "分前"}],
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat(),
+        }
+        for i in range(events)
+    ]
+    return json.dumps(rows)
+
+
+def measure(payload: str, build: Callable[[dict[str, Any]], object]) -> tuple[float, float]:
+    """Bytes per model built from freshly decoded rows, and build time in seconds."""
+    rows = json.loads(payload)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    models = [build(row) for row in rows]
+    elapsed = time.perf_counter() - started
+    # Drop the decoded rows so only what the models keep alive is counted
+    del rows
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held / len(models), elapsed
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--guilds", type=int, default=1_000)
+    args = parser.parse_args()
+
+    payload = make_rows(args.events, args.guilds)
+    legacy_bytes, legacy_time = measure(payload, legacy_from_dict)
+    slotted_bytes, slotted_time = measure(payload, Event.from_dict)
+
+    print(f"events: {args.events}  guilds: {args.guilds}")
+    print(f"before: {legacy_bytes:,.0f} bytes/event  build {legacy_time:.2f} s")
+    print(f"after:  {slotted_bytes:,.0f} bytes/event  build {slotted_time:.2f} s")
+    print(f"saved:  {1 - slotted_bytes / legacy_bytes:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+-- Precomputed time of each event's next notification (NOTIFY_NEXT_AT=true).
+-- Lets the bot find due events with one indexed range query per tick.
+-- Run once in the Supabase SQL Editor; safe to run again.
+
+ALTER TABLE events ADD COLUMN IF NOT EXISTS next_notify_at TIMESTAMPTZ;
+
+-- First fire time later than ``after``. Lead times count back from start_at,
+-- or from midnight JST of its (UTC) date for all-day events, and the event
+-- start itself is always a fire time. Mirrors src/models/notification.py.
+CREATE OR REPLACE FUNCTION event_next_notify_at(
+    start_at TIMESTAMPTZ, is_all_day BOOLEAN, notifications JSONB, after TIMESTAMPTZ
+)
+RETURNS TIMESTAMPTZ
+LANGUAGE sql STABLE AS $$
+    WITH anchor AS (
+        SELECT CASE
+            WHEN is_all_day THEN date_trunc('day', start_at AT TIME ZONE 'UTC') AT TIME ZONE 'Asia/Tokyo'
+            ELSE start_at
+        END AS at
+    ),
+    leads AS (
+        SELECT 0::numeric AS minutes
+        UNION ALL
+        SELECT (n ->> 'num')::numeric * CASE n ->> 'type'
+            WHEN '時間前' THEN 60
+            WHEN '日前' THEN 60 * 24
+            WHEN '週間前' THEN 60 * 24 * 7
+            ELSE 1
+        END
+        FROM jsonb_array_elements(
+            CASE WHEN jsonb_typeof(notifications) = 'array' THEN notifications ELSE '[]' END
+        ) AS n
+        WHERE jsonb_typeof(n -> 'num') = 'number'
+    )
+    SELECT min(anchor.at - leads.minutes * interval '1 minute')
+    FROM anchor, leads
+    WHERE anchor.at - leads.minutes * interval '1 minute' > after
+$$;
+
+-- Keeps the column current for rows written by the web app. Inserts that
+-- already carry a value (the bot's EventService.create) keep it.
+CREATE OR REPLACE FUNCTION events_set_next_notify_at()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' OR NEW.next_notify_at IS NULL THEN
+        NEW.next_notify_at := event_next_notify_at(
+            NEW.start_at, NEW.is_all_day, NEW.notifications, now()
+        );
+    END IF;
+    RETURN NEW;
+END
+$$;
+
+DROP TRIGGER IF EXISTS events_next_notify_at ON events;
+CREATE TRIGGER events_next_notify_at
+    BEFORE INSERT OR UPDATE OF start_at, is_all_day, notifications ON events
+    FOR EACH ROW EXECUTE FUNCTION events_set_next_notify_at();
+
+-- Called by the notify loop after delivering, with the tick time as ``after``
+CREATE OR REPLACE FUNCTION advance_next_notify_at(event_ids UUID[], after TIMESTAMPTZ)
+RETURNS void
+LANGUAGE sql AS $$
+    UPDATE events
+    SET next_notify_at = event_next_notify_at(start_at, is_all_day, notifications, after)
+    WHERE id = ANY(event_ids);
+$$;
+
+-- Events that have already started have no notification left
+UPDATE events
+SET next_notify_at = event_next_notify_at(start_at, is_all_day, notifications, now())
+WHERE start_at > now() AND next_notify_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS events_next_notify_at
+    ON events (next_notify_at) WHERE next_notify_at IS NOT NULL;
@@ -0,0 +1,54 @@
+-- Local schema mirroring the discalendar-next Supabase tables used by the bot.
+-- Loaded automatically by the docker-compose postgres service.
+
+CREATE TABLE IF NOT EXISTS guilds (
+    id SERIAL PRIMARY KEY,
+    guild_id VARCHAR(32) UNIQUE NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    avatar_url VARCHAR(512),
+    locale VARCHAR(10) NOT NULL DEFAULT 'ja'
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    guild_id VARCHAR(32) NOT NULL REFERENCES guilds(guild_id) ON DELETE CASCADE,
+    name VARCHAR(255) NOT NULL,
+    description TEXT,
+    color VARCHAR(7) NOT NULL DEFAULT '#3B82F6',
+    is_all_day BOOLEAN NOT NULL DEFAULT false,
+    start_at TIMESTAMPTZ NOT NULL,
+    end_at TIMESTAMPTZ NOT NULL,
+    location VARCHAR(255),
+    channel_id VARCHAR(32),
+    channel_name VARCHAR(100),
+    notifications JSONB DEFAULT '[]'::jsonb,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS events_start_at_id ON events (start_at, id);
+CREATE INDEX IF NOT EXISTS events_guild_id_start_at ON events (guild_id, start_at);
+CREATE INDEX IF NOT EXISTS events_updated_at ON events (updated_at);
+
+CREATE TABLE IF NOT EXISTS event_settings (
+    id SERIAL PRIMARY KEY,
+    guild_id VARCHAR(32) UNIQUE NOT NULL REFERENCES guilds(guild_id) ON DELETE CASCADE,
+    channel_id VARCHAR(32) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS guild_config (
+    guild_id VARCHAR(32) PRIMARY KEY REFERENCES guilds(guild_id) ON DELETE CASCADE,
+    restricted BOOLEAN NOT NULL DEFAULT false
+);
+
+CREATE OR REPLACE FUNCTION event_settings_checksum()
+RETURNS TABLE (row_count bigint, checksum text)
+LANGUAGE sql STABLE AS $$
+    SELECT
+        count(*),
+        md5(coalesce(
+            string_agg(id || ':' || guild_id || ':' || channel_id, ',' ORDER BY guild_id COLLATE "C"),
+            ''
+        ))
+    FROM event_settings;
+$$;
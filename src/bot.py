@@ -1,12 +1,41 @@
 """Discord Bot class definition."""
 
+import asyncio
+from typing import TYPE_CHECKING
+
 import discord
 import structlog
 from discord.ext import commands
-from supabase import Client, create_client
-
-from src.config import get_config
-from src.services import EventService, GuildService
+from supabase import Client, ClientOptions, create_client
+
+from src.config import Config, get_config
+from src.models import GuildConfig
+from src.services import (
+    CircuitBreaker,
+    EventRepository,
+    EventService,
+    GuildRepository,
+    GuildService,
+    GuildWriteBuffer,
+    HttpPool,
+    LocalReplica,
+    QueryExecutor,
+    ReplicaSync,
+    Resilience,
+    RetryPolicy,
+    TTLCache,
+)
+from src.services.change_feed import (
+    ChangeFeed,
+    RealtimeChangeFeed,
+    RowChange,
+    WebSocketChangeFeed,
+)
+
+if TYPE_CHECKING:
+    import asyncpg
+
+    from src.services.codec import EventCodec
 
 logger = structlog.get_logger()
 
@@ -16,6 +45,7 @@ class DisCalendarBot(commands.Bot):
 
     def __init__(self) -> None:
         config = get_config()
+        self.config = config
 
         intents = discord.Intents.default()
         intents.guilds = True
@@ -27,20 +57,148 @@ class DisCalendarBot(commands.Bot):
             application_id=int(config.application_id),
         )
 
+        # One pooled HTTP client shared by every Supabase request
+        self.http_pool = HttpPool(
+            max_connections=config.supabase_http_max_connections,
+            max_keepalive_connections=config.supabase_http_max_connections,
+            keepalive_expiry=config.supabase_http_keepalive_expiry,
+            connect_timeout=config.supabase_connect_timeout,
+            read_timeout=config.supabase_read_timeout,
+            http2=config.supabase_http2,
+        )
+
         # Supabase client
         self.supabase: Client = create_client(
             config.supabase_url,
             config.supabase_key,
+            options=ClientOptions(httpx_client=self.http_pool.client),
+        )
+
+        # Blocking Supabase calls run here instead of on the event loop
+        self.query_executor = QueryExecutor(max_workers=config.supabase_max_workers)
+
+        # Retries and a circuit breaker shared by every Supabase call
+        self.resilience = Resilience(
+            self.query_executor,
+            retry=RetryPolicy(attempts=config.supabase_retry_attempts),
+            breaker=CircuitBreaker(
+                failure_threshold=config.supabase_breaker_threshold,
+                reset_timeout=config.supabase_breaker_reset_seconds,
+            ),
         )
 
         # Services
-        self.guild_service: GuildService = GuildService(self.supabase)
-        self.event_service: EventService = EventService(self.supabase)
+        config_cache: TTLCache[str, GuildConfig | None] = TTLCache(
+            max_size=config.guild_config_cache_size, ttl=config.guild_config_cache_ttl
+        )
+        self.db_pool: asyncpg.Pool | None = None
+        self.replica: LocalReplica | None = None
+        self.replica_sync: ReplicaSync | None = None
+        self.guild_service: GuildRepository
+        self.event_service: EventRepository
+        if config.storage_backend == "postgres":
+            self._create_postgres_services(config, config_cache)
+        else:
+            # Optional local mirror that serves reads; writes still go to Supabase
+            if config.replica_path:
+                self.replica = LocalReplica(config.replica_path)
+                self.replica_sync = ReplicaSync(
+                    self.replica,
+                    self.supabase,
+                    self.resilience,
+                    page_size=config.supabase_page_size,
+                )
+            self.guild_service = GuildService(
+                self.supabase,
+                self.query_executor,
+                config_cache=config_cache,
+                resilience=self.resilience,
+                replica=self.replica,
+            )
+            self.event_service = EventService(
+                self.supabase,
+                self.query_executor,
+                page_size=config.supabase_page_size,
+                resilience=self.resilience,
+                replica=self.replica,
+                codec=self._create_codec(config),
+                track_next_notify=config.notify_next_at,
+            )
+
+        # Guild name and icon changes are batched instead of written one by one
+        self.guild_writes = GuildWriteBuffer(self.guild_service)
+
+        # Optional push-based change feed; polling is used while it is disconnected
+        self.change_feed: ChangeFeed | None = self._create_change_feed(config)
+
+    def _create_codec(self, config: Config) -> "EventCodec | None":
+        """Create the msgspec event codec if enabled and installed."""
+        if not config.fast_decode:
+            return None
+        try:
+            from src.services.codec import EventCodec
+        except ImportError:
+            logger.info("msgspec is not installed; decoding event responses with json")
+            return None
+        return EventCodec()
+
+    def _create_postgres_services(
+        self, config: Config, config_cache: TTLCache[str, GuildConfig | None]
+    ) -> None:
+        """Create services that query Postgres directly through an asyncpg pool."""
+        if not config.database_url:
+            raise ValueError("DATABASE_URL is required when STORAGE_BACKEND=postgres")
+        try:
+            from src.services.postgres import (
+                PostgresEventService,
+                PostgresGuildService,
+                create_pool,
+            )
+        except ImportError as e:
+            raise RuntimeError(
+                "STORAGE_BACKEND=postgres requires the 'postgres' extra (asyncpg)"
+            ) from e
+
+        # Connections are opened in setup_hook
+        self.db_pool = create_pool(
+            config.database_url,
+            max_size=config.database_pool_size,
+            statement_cache_size=config.database_statement_cache_size,
+        )
+        self.guild_service = PostgresGuildService(self.db_pool, config_cache=config_cache)
+        self.event_service = PostgresEventService(
+            self.db_pool,
+            page_size=config.supabase_page_size,
+            track_next_notify=config.notify_next_at,
+        )
+
+    def _create_change_feed(self, config: Config) -> ChangeFeed | None:
+        """Create the change feed selected by the configuration."""
+        if not config.change_feed:
+            return None
+        if config.change_feed == "realtime":
+            return RealtimeChangeFeed(config.supabase_url, config.supabase_key, self._on_row_change)
+        return WebSocketChangeFeed(config.change_feed, self._on_row_change)
+
+    def _on_row_change(self, change: RowChange) -> None:
+        """Re-dispatch a row change as ``on_<table>_change`` to cogs."""
+        self.dispatch(f"{change.table}_change", change)
+
+    async def _start_change_feed(self, feed: ChangeFeed) -> None:
+        """Start the change feed without blocking startup."""
+        try:
+            await feed.start()
+        except Exception as e:
+            logger.warning("Change feed unavailable, using polling", error=str(e))
 
     async def setup_hook(self) -> None:
         """Called when the bot is starting up."""
         logger.info("Setting up bot...")
 
+        if self.db_pool is not None:
+            await self.db_pool
+            logger.info("Connected to Postgres")
+
         # Load extensions (cogs)
         await self.load_extension("src.commands.help")
         await self.load_extension("src.commands.invite")
@@ -50,9 +208,15 @@ class DisCalendarBot(commands.Bot):
         await self.load_extension("src.events.guild")
         await self.load_extension("src.tasks.presence")
         await self.load_extension("src.tasks.notify")
+        await self.load_extension("src.tasks.metrics")
+        if self.replica_sync is not None:
+            await self.load_extension("src.tasks.replica")
 
         logger.info("Loaded all extensions")
 
+        if self.change_feed:
+            self._change_feed_task = asyncio.create_task(self._start_change_feed(self.change_feed))
+
         # Sync slash commands
         await self.tree.sync()
         logger.info("Synced slash commands")
@@ -64,6 +228,22 @@ class DisCalendarBot(commands.Bot):
         else:
             logger.info("Bot is ready")
 
+    async def close(self) -> None:
+        """Shut down the bot, the change feed and the database connections."""
+        if self.change_feed:
+            await self.change_feed.stop()
+        await super().close()
+        try:
+            await self.guild_writes.flush()
+        except Exception as e:
+            logger.warning("Failed to flush guild updates", error=str(e))
+        if self.db_pool is not None:
+            await self.db_pool.close()
+        self.query_executor.shutdown()
+        self.http_pool.close()
+        if self.replica is not None:
+            self.replica.close()
+
     async def on_error(self, event_method: str, *args, **kwargs) -> None:
         """Called when an error occurs."""
         logger.exception(
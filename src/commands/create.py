@@ -8,7 +8,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from src.models import EventCreate
+from src.models import EventCreate, NotificationSet
 from src.utils.datetime import validate_date
 from src.utils.embeds import create_event_embed
 from src.utils.permissions import has_manage_permissions
@@ -219,8 +219,7 @@ class CreateCommand(commands.Cog):
 
         if not validate_date(end_year, end_month, end_day, end_hour, end_minute):
             await interaction.response.send_message(
-                f"無効な終了日時です: {end_year}/{end_month}/{end_day} "
-                f"{end_hour}:{end_minute}",
+                f"無効な終了日時です: {end_year}/{end_month}/{end_day} {end_hour}:{end_minute}",
                 ephemeral=True,
             )
             return
@@ -235,9 +234,7 @@ class CreateCommand(commands.Cog):
                 start_minute,
                 tzinfo=UTC,
             )
-            end_at = datetime(
-                end_year, end_month, end_day, end_hour, end_minute, tzinfo=UTC
-            )
+            end_at = datetime(end_year, end_month, end_day, end_hour, end_minute, tzinfo=UTC)
         except ValueError as e:
             await interaction.response.send_message(f"日時の形式が無効です: {e}", ephemeral=True)
             return
@@ -264,7 +261,6 @@ class CreateCommand(commands.Cog):
         color_hex = color_map.get(color, "#3e44f7")
 
         # Parse notifications
-        notifications = []
         notify_map = {
             "5m": (5, "分前"),
             "10m": (10, "分前"),
@@ -281,10 +277,11 @@ class CreateCommand(commands.Cog):
             "7d": (7, "日前"),
         }
 
-        for i, notify in enumerate([notify_1, notify_2, notify_3, notify_4]):
-            if notify and notify in notify_map:
-                num, ty = notify_map[notify]
-                notifications.append({"key": i, "num": num, "type": ty})
+        notifications = NotificationSet.from_pairs(
+            notify_map[notify]
+            for notify in (notify_1, notify_2, notify_3, notify_4)
+            if notify and notify in notify_map
+        ).to_rows()
 
         # Create event
         event_data = EventCreate(
@@ -39,14 +39,10 @@ class EventListView(discord.ui.View):
         page_events = self.events[start:end]
 
         for event in page_events:
-            notifications_str = ""
-            if event.notifications:
-                notifications_str = ", ".join(str(n) for n in event.notifications)
-
             value = (
                 f"`開始時刻`: {format_datetime(event.start_at)}\n"
                 f"`終了時刻`: {format_datetime(event.end_at)}\n"
-                f"`　通知　`: {notifications_str or 'なし'}"
+                f"`　通知　`: {event.notifications.label or 'なし'}"
             )
             embed.add_field(name=event.name, value=value, inline=False)
 
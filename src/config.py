@@ -25,6 +25,47 @@ class Config:
     # Optional
     log_level: str = "INFO"
     sentry_dsn: str | None = None
+    supabase_max_workers: int = 8
+    supabase_page_size: int = 1000
+    supabase_http_max_connections: int = 16
+    supabase_http_keepalive_expiry: float = 30.0
+    supabase_http2: bool = True
+    supabase_connect_timeout: float = 5.0
+    supabase_read_timeout: float = 30.0
+    supabase_retry_attempts: int = 3
+    supabase_breaker_threshold: int = 5
+    supabase_breaker_reset_seconds: float = 30.0
+    guild_config_cache_size: int = 1024
+    guild_config_cache_ttl: int = 300
+    guild_flush_seconds: float = 5.0
+
+    # Storage backend: "postgrest" (supabase-py) or "postgres" (asyncpg, needs DATABASE_URL)
+    storage_backend: str = "postgrest"
+    database_url: str | None = None
+    database_pool_size: int = 10
+    database_statement_cache_size: int = 100
+
+    # Notifications
+    notify_lookahead_days: int = 7
+    notify_reconcile_minutes: int = 10
+    notify_max_concurrency: int = 16
+    notify_grace_minutes: int = 10
+    notify_ledger_path: str = "data/notify_ledger.db"
+    # Query due events by the next_notify_at column (needs scripts/db/next_notify_at.sql)
+    notify_next_at: bool = False
+
+    # Optional local SQLite mirror serving reads (None disables)
+    replica_path: str | None = None
+    replica_sync_seconds: int = 30
+
+    # Decode event responses with msgspec when the "fast" extra is installed
+    fast_decode: bool = True
+
+    # Interval for logging pool and executor statistics (0 disables)
+    metrics_interval_seconds: int = 60
+
+    # Push-based change feed: "realtime", a ws:// URL of a local stand-in, or None
+    change_feed: str | None = None
 
     @classmethod
     def from_env(cls) -> "Config":
@@ -40,6 +81,42 @@ class Config:
             supabase_key=os.environ["SUPABASE_SERVICE_KEY"],
             log_level=os.environ.get("LOG_LEVEL", "INFO"),
             sentry_dsn=os.environ.get("SENTRY_DSN"),
+            supabase_max_workers=int(os.environ.get("SUPABASE_MAX_WORKERS", "8")),
+            supabase_page_size=int(os.environ.get("SUPABASE_PAGE_SIZE", "1000")),
+            supabase_http_max_connections=int(
+                os.environ.get("SUPABASE_HTTP_MAX_CONNECTIONS", "16")
+            ),
+            supabase_http_keepalive_expiry=float(
+                os.environ.get("SUPABASE_HTTP_KEEPALIVE_EXPIRY", "30")
+            ),
+            supabase_http2=os.environ.get("SUPABASE_HTTP2", "true").lower() != "false",
+            supabase_connect_timeout=float(os.environ.get("SUPABASE_CONNECT_TIMEOUT", "5")),
+            supabase_read_timeout=float(os.environ.get("SUPABASE_READ_TIMEOUT", "30")),
+            supabase_retry_attempts=int(os.environ.get("SUPABASE_RETRY_ATTEMPTS", "3")),
+            supabase_breaker_threshold=int(os.environ.get("SUPABASE_BREAKER_THRESHOLD", "5")),
+            supabase_breaker_reset_seconds=float(
+                os.environ.get("SUPABASE_BREAKER_RESET_SECONDS", "30")
+            ),
+            guild_config_cache_size=int(os.environ.get("GUILD_CONFIG_CACHE_SIZE", "1024")),
+            guild_config_cache_ttl=int(os.environ.get("GUILD_CONFIG_CACHE_TTL", "300")),
+            guild_flush_seconds=float(os.environ.get("GUILD_FLUSH_SECONDS", "5")),
+            storage_backend=os.environ.get("STORAGE_BACKEND", "postgrest"),
+            database_url=os.environ.get("DATABASE_URL") or None,
+            database_pool_size=int(os.environ.get("DATABASE_POOL_SIZE", "10")),
+            database_statement_cache_size=int(
+                os.environ.get("DATABASE_STATEMENT_CACHE_SIZE", "100")
+            ),
+            notify_lookahead_days=int(os.environ.get("NOTIFY_LOOKAHEAD_DAYS", "7")),
+            notify_reconcile_minutes=int(os.environ.get("NOTIFY_RECONCILE_MINUTES", "10")),
+            notify_max_concurrency=int(os.environ.get("NOTIFY_MAX_CONCURRENCY", "16")),
+            notify_grace_minutes=int(os.environ.get("NOTIFY_GRACE_MINUTES", "10")),
+            notify_ledger_path=os.environ.get("NOTIFY_LEDGER_PATH", "data/notify_ledger.db"),
+            notify_next_at=os.environ.get("NOTIFY_NEXT_AT", "false").lower() == "true",
+            replica_path=os.environ.get("REPLICA_PATH") or None,
+            replica_sync_seconds=int(os.environ.get("REPLICA_SYNC_SECONDS", "30")),
+            fast_decode=os.environ.get("FAST_DECODE", "true").lower() != "false",
+            metrics_interval_seconds=int(os.environ.get("METRICS_INTERVAL_SECONDS", "60")),
+            change_feed=os.environ.get("CHANGE_FEED") or None,
         )
 
 
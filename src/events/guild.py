@@ -1,44 +1,121 @@
 """Guild event handlers."""
 
+import asyncio
+import time
 from typing import TYPE_CHECKING
 
 import discord
 import structlog
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 from src.models import GuildCreate
+from src.services.change_feed import RowChange
 
 if TYPE_CHECKING:
     from src.bot import DisCalendarBot
 
 logger = structlog.get_logger()
 
+# Deletes are skipped if the bot seems to have left more than this share of
+# its known guilds while offline, which is more likely an incomplete guild
+# list than real departures
+MAX_DELETE_FRACTION = 0.5
+
+
+def guild_create(guild: discord.Guild) -> GuildCreate:
+    """Build the guilds row for a Discord guild."""
+    return GuildCreate(
+        guild_id=str(guild.id),
+        name=guild.name,
+        avatar_url=guild.icon.url if guild.icon else None,
+        locale="ja",
+    )
+
 
 class GuildEvents(commands.Cog):
     """Cog for handling guild events."""
 
     def __init__(self, bot: "DisCalendarBot"):
         self.bot = bot
+        self._reconcile_lock = asyncio.Lock()
+        self.flush_loop.change_interval(seconds=bot.config.guild_flush_seconds)
+        self.flush_loop.start()
+
+    async def cog_unload(self) -> None:
+        """Called when cog is unloaded."""
+        self.flush_loop.cancel()
+
+    @tasks.loop(seconds=5)
+    async def flush_loop(self) -> None:
+        """Write queued guild updates."""
+        try:
+            await self.bot.guild_writes.flush()
+        except Exception as e:
+            logger.warning("Failed to flush guild updates", error=str(e))
+
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        """Reconcile the guilds table with the guilds the bot is in."""
+        if self._reconcile_lock.locked():
+            return
+        async with self._reconcile_lock:
+            try:
+                await self.reconcile_guilds()
+            except Exception as e:
+                logger.warning("Failed to reconcile guilds", error=str(e))
+
+    async def reconcile_guilds(self) -> None:
+        """Apply joins, departures and renames that happened while offline.
+
+        Diffs ``bot.guilds`` against one read of the guilds table, then
+        writes only the differences with bulk upserts and deletes.
+        """
+        started = time.perf_counter()
+        service = self.bot.guild_service
+        present = {str(guild.id) for guild in self.bot.guilds}
+        joined = {
+            str(guild.id): guild_create(guild) for guild in self.bot.guilds if not guild.unavailable
+        }
+        known = {guild.guild_id: guild for guild in await service.find_all()}
+
+        changed = [
+            data
+            for guild_id, data in joined.items()
+            if (row := known.get(guild_id)) is None
+            or (row.name, row.avatar_url) != (data.name, data.avatar_url)
+        ]
+        left = [guild_id for guild_id in known if guild_id not in present]
+        if known and len(left) > len(known) * MAX_DELETE_FRACTION:
+            logger.warning(
+                "Not deleting guilds; too many appear to have been left",
+                left=len(left),
+                known=len(known),
+            )
+            left = []
+
+        if changed:
+            await service.upsert_many(changed)
+        if left:
+            for guild_id in left:
+                service.invalidate_config(guild_id)
+                self.bot.event_service.forget_settings(guild_id)
+            await service.delete_many(left)
+        logger.info(
+            "Reconciled guilds",
+            guilds=len(present),
+            upserted=len(changed),
+            deleted=len(left),
+            elapsed=round(time.perf_counter() - started, 3),
+        )
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild: discord.Guild) -> None:
         """Called when the bot joins a guild."""
         logger.info("Joined guild", guild_id=guild.id, guild_name=guild.name)
 
-        # Check if guild already exists
-        existing = await self.bot.guild_service.find_by_guild_id(str(guild.id))
-        if existing:
-            logger.debug("Guild already exists", guild_id=guild.id)
-            return
-
-        # Create guild in database
-        guild_data = GuildCreate(
-            guild_id=str(guild.id),
-            name=guild.name,
-            avatar_url=guild.icon.url if guild.icon else None,
-            locale="ja",
-        )
-        await self.bot.guild_service.create(guild_data)
+        # Insert, or refresh the row left from an earlier stay
+        await self.bot.guild_writes.discard(str(guild.id))
+        await self.bot.guild_service.upsert(guild_create(guild))
 
     @commands.Cog.listener()
     async def on_guild_remove(self, guild: discord.Guild) -> None:
@@ -46,12 +123,20 @@ class GuildEvents(commands.Cog):
         logger.info("Left guild", guild_id=guild.id, guild_name=guild.name)
 
         # Delete guild from database
+        await self.bot.guild_writes.discard(str(guild.id))
+        self.bot.guild_service.invalidate_config(str(guild.id))
+        self.bot.event_service.forget_settings(str(guild.id))
         await self.bot.guild_service.delete(str(guild.id))
 
     @commands.Cog.listener()
-    async def on_guild_update(
-        self, before: discord.Guild, after: discord.Guild
-    ) -> None:
+    async def on_guild_config_change(self, change: RowChange) -> None:
+        """Drop the cached config of a guild whose ``guild_config`` row changed."""
+        guild_id = change.record.get("guild_id") or change.old_record.get("guild_id")
+        if guild_id is not None:
+            self.bot.guild_service.invalidate_config(str(guild_id))
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild) -> None:
         """Called when a guild is updated."""
         # Only update if name or icon changed
         name_changed = before.name != after.name
@@ -67,14 +152,8 @@ class GuildEvents(commands.Cog):
             new_name=after.name,
         )
 
-        # Update guild in database
-        guild_data = GuildCreate(
-            guild_id=str(after.id),
-            name=after.name,
-            avatar_url=after.icon.url if after.icon else None,
-            locale="ja",
-        )
-        await self.bot.guild_service.update(str(after.id), guild_data)
+        # Queue the new state; bursts for one guild collapse into one write
+        self.bot.guild_writes.put(guild_create(after))
 
 
 async def setup(bot: "DisCalendarBot") -> None:
@@ -1,13 +1,26 @@
 """Data models."""
 
-from src.models.event import Event, EventCreate, EventSettings, NotificationPayload
+from src.models.event import (
+    DETAIL_COLUMNS,
+    EVENT_COLUMNS,
+    SCHEDULE_COLUMNS,
+    Event,
+    EventCreate,
+    EventSettings,
+)
 from src.models.guild import Guild, GuildConfig, GuildCreate
+from src.models.notification import NotificationPayload, NotificationSet, notification_set
 
 __all__ = [
+    "DETAIL_COLUMNS",
+    "EVENT_COLUMNS",
+    "SCHEDULE_COLUMNS",
     "Event",
     "EventCreate",
     "EventSettings",
     "NotificationPayload",
+    "NotificationSet",
+    "notification_set",
     "Guild",
     "GuildConfig",
     "GuildCreate",
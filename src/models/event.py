@@ -1,44 +1,86 @@
 """Event data models."""
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import Self
-
-
-@dataclass
-class NotificationPayload:
-    """Notification payload model."""
-
-    key: int
-    num: int
-    ty: str  # "分前", "時間前", "日前"
-
-    @classmethod
-    def from_dict(cls, data: dict) -> Self:
-        """Create NotificationPayload from dictionary."""
-        return cls(
-            key=data["key"],
-            num=data["num"],
-            ty=data.get("type", "分前"),
-        )
-
-    def to_minutes(self) -> int:
-        """Convert to minutes."""
-        if self.ty == "時間前":
-            return self.num * 60
-        elif self.ty == "日前":
-            return self.num * 60 * 24
-        elif self.ty == "週間前":
-            return self.num * 60 * 24 * 7
-        return self.num  # 分前
-
-    def __str__(self) -> str:
-        return f"{self.num}{self.ty}"
-
-
-@dataclass
+from functools import lru_cache
+from sys import intern
+from typing import Any, Self
+
+from src.models.notification import NotificationSet, next_notify_at
+
+# Columns of the events table
+EVENT_COLUMNS = (
+    "id",
+    "guild_id",
+    "name",
+    "description",
+    "color",
+    "is_all_day",
+    "start_at",
+    "end_at",
+    "location",
+    "channel_id",
+    "channel_name",
+    "notifications",
+    "created_at",
+    "updated_at",
+)
+
+# Columns needed to schedule notifications; everything else is loaded lazily
+SCHEDULE_COLUMNS = (
+    "id",
+    "guild_id",
+    "is_all_day",
+    "start_at",
+    "end_at",
+    "notifications",
+    "updated_at",
+)
+
+# Columns missing from a partial event, loaded with ``Event.with_details``
+DETAIL_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "color",
+    "location",
+    "channel_id",
+    "channel_name",
+    "created_at",
+)
+
+DEFAULT_COLOR = "#3B82F6"
+
+
+@lru_cache(maxsize=256)
+def _color_int(value: str) -> int:
+    return parse_color(value)
+
+
+def parse_color(value: str) -> int:
+    """Parse a ``#RRGGBB`` color, falling back to DEFAULT_COLOR if it is malformed."""
+    try:
+        return int(value.lstrip("#"), 16)
+    except ValueError:
+        return int(DEFAULT_COLOR.lstrip("#"), 16)
+
+
+def parse_timestamp(value: str | datetime) -> datetime:
+    """Parse a timestamp column, which PostgREST returns as ISO 8601 text."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+@dataclass(slots=True)
 class Event:
-    """Event model."""
+    """Event model.
+
+    Slotted so that the hundreds of thousands of events a schedule may hold
+    stay small. Snowflakes and colors repeat across events and are
+    interned, notifications are shared NotificationSets, and the color is
+    parsed once into ``color_int``.
+    """
 
     id: str
     guild_id: str
@@ -51,34 +93,63 @@ class Event:
     location: str | None
     channel_id: str | None
     channel_name: str | None
-    notifications: list[NotificationPayload]
-    created_at: datetime
+    # Payload sequences, e.g. in tests, are encoded into a NotificationSet
+    notifications: NotificationSet
+    created_at: datetime | None
     updated_at: datetime
+    # Loaded with SCHEDULE_COLUMNS only; the DETAIL_COLUMNS fields are placeholders
+    partial: bool = False
+    color_int: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.guild_id = intern(self.guild_id)
+        self.color = intern(self.color)
+        if self.channel_id is not None:
+            self.channel_id = intern(self.channel_id)
+        if not isinstance(self.notifications, NotificationSet):
+            self.notifications = NotificationSet.of(self.notifications)
+        self.color_int = _color_int(self.color)
 
     @classmethod
     def from_dict(cls, data: dict) -> Self:
-        """Create Event from dictionary."""
-        notifications = []
-        if data.get("notifications"):
-            for n in data["notifications"]:
-                if isinstance(n, dict):
-                    notifications.append(NotificationPayload.from_dict(n))
+        """Create Event from dictionary.
 
+        Rows without a ``name`` column (see SCHEDULE_COLUMNS) create a partial
+        event whose detail fields are placeholders until ``with_details``.
+        """
+        notifications = NotificationSet.from_rows(data.get("notifications") or ())
+        created_at = data.get("created_at")
         return cls(
             id=data["id"],
             guild_id=data["guild_id"],
-            name=data["name"],
+            name=data.get("name", ""),
             description=data.get("description"),
-            color=data.get("color", "#3B82F6"),
+            color=data.get("color", DEFAULT_COLOR),
             is_all_day=data.get("is_all_day", False),
-            start_at=datetime.fromisoformat(data["start_at"].replace("Z", "+00:00")),
-            end_at=datetime.fromisoformat(data["end_at"].replace("Z", "+00:00")),
+            start_at=parse_timestamp(data["start_at"]),
+            end_at=parse_timestamp(data["end_at"]),
             location=data.get("location"),
             channel_id=data.get("channel_id"),
             channel_name=data.get("channel_name"),
             notifications=notifications,
-            created_at=datetime.fromisoformat(data["created_at"].replace("Z", "+00:00")),
-            updated_at=datetime.fromisoformat(data["updated_at"].replace("Z", "+00:00")),
+            created_at=parse_timestamp(created_at) if created_at else None,
+            updated_at=parse_timestamp(data["updated_at"]),
+            partial="name" not in data,
+        )
+
+    def with_details(self, data: dict[str, Any]) -> Self:
+        """Return a complete copy of this event from a row of DETAIL_COLUMNS."""
+        created_at = data.get("created_at")
+        return replace(
+            self,
+            name=data["name"],
+            description=data.get("description"),
+            color=data.get("color", DEFAULT_COLOR),
+            location=data.get("location"),
+            channel_id=data.get("channel_id"),
+            channel_name=data.get("channel_name"),
+            created_at=parse_timestamp(created_at) if created_at else None,
+            partial=False,
         )
 
 
@@ -91,16 +162,26 @@ class EventCreate:
     start_at: datetime
     end_at: datetime
     description: str | None = None
-    color: str = "#3B82F6"
+    color: str = DEFAULT_COLOR
     is_all_day: bool = False
     location: str | None = None
     channel_id: str | None = None
     channel_name: str | None = None
     notifications: list[dict] = field(default_factory=list)
+    # Only sent once the next_notify_at column exists (NOTIFY_NEXT_AT)
+    next_notify_at: datetime | None = None
+
+    def with_next_notify_at(self, after: datetime) -> Self:
+        """Return a copy with ``next_notify_at`` set to its first fire time after ``after``."""
+        notifications = NotificationSet.from_rows(self.notifications)
+        return replace(
+            self,
+            next_notify_at=next_notify_at(self.start_at, self.is_all_day, notifications, after),
+        )
 
     def to_dict(self) -> dict:
         """Convert to dictionary."""
-        return {
+        data = {
             "guild_id": self.guild_id,
             "name": self.name,
             "description": self.description,
@@ -113,9 +194,12 @@ class EventCreate:
             "channel_name": self.channel_name,
             "notifications": self.notifications,
         }
+        if self.next_notify_at is not None:
+            data["next_notify_at"] = self.next_notify_at.isoformat()
+        return data
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class EventSettings:
     """Event settings model."""
 
@@ -123,6 +207,10 @@ class EventSettings:
     guild_id: str
     channel_id: str
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "guild_id", intern(self.guild_id))
+        object.__setattr__(self, "channel_id", intern(self.channel_id))
+
     @classmethod
     def from_dict(cls, data: dict) -> Self:
         """Create EventSettings from dictionary."""
@@ -1,10 +1,11 @@
 """Guild data models."""
 
 from dataclasses import dataclass
+from sys import intern
 from typing import Self
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Guild:
     """Guild model."""
 
@@ -14,6 +15,9 @@ class Guild:
     avatar_url: str | None
     locale: str
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "guild_id", intern(self.guild_id))
+
     @classmethod
     def from_dict(cls, data: dict) -> Self:
         """Create Guild from dictionary."""
@@ -45,13 +49,16 @@ class GuildCreate:
         }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class GuildConfig:
     """Guild configuration model."""
 
     guild_id: str
     restricted: bool
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "guild_id", intern(self.guild_id))
+
     @classmethod
     def from_dict(cls, data: dict) -> Self:
         """Create GuildConfig from dictionary."""
@@ -0,0 +1,184 @@
+"""Notification models and their compact per-event encoding."""
+
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from sys import intern
+from typing import Any, overload
+
+JST = timezone(timedelta(hours=9))
+
+# Lead time of each notification unit, in minutes
+MINUTES_PER_UNIT = {"分前": 1, "時間前": 60, "日前": 60 * 24, "週間前": 60 * 24 * 7}
+
+# The fixed choices of /create, indexed by their bit in NotificationSet.mask
+NOTIFICATION_PRESETS: tuple[tuple[int, str], ...] = (
+    (5, "分前"),
+    (10, "分前"),
+    (15, "分前"),
+    (30, "分前"),
+    (1, "時間前"),
+    (2, "時間前"),
+    (3, "時間前"),
+    (6, "時間前"),
+    (12, "時間前"),
+    (1, "日前"),
+    (2, "日前"),
+    (3, "日前"),
+    (7, "日前"),
+)
+PRESET_BITS = {preset: bit for bit, preset in enumerate(NOTIFICATION_PRESETS)}
+
+# Presets fit in a 16-bit mask; custom notifications are keyed above it
+MASK_BITS = 16
+CUSTOM_KEY_BASE = MASK_BITS
+
+
+@dataclass(frozen=True, slots=True)
+class NotificationPayload:
+    """Notification payload model."""
+
+    key: int
+    num: int
+    ty: str  # "分前", "時間前", "日前"
+    # Lead time, computed once instead of on every schedule rebuild
+    minutes: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "ty", intern(self.ty))
+        object.__setattr__(self, "minutes", self.num * MINUTES_PER_UNIT.get(self.ty, 1))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NotificationPayload":
+        """Create NotificationPayload from dictionary.
+
+        Payloads are immutable, so events with the same notification share
+        one instance.
+        """
+        return notification_payload(data["key"], data["num"], data.get("type", "分前"))
+
+    def to_minutes(self) -> int:
+        """Convert to minutes."""
+        return self.minutes
+
+    def __str__(self) -> str:
+        return f"{self.num}{self.ty}"
+
+
+@lru_cache(maxsize=4096)
+def notification_payload(key: int, num: int, ty: str) -> NotificationPayload:
+    """A shared NotificationPayload instance."""
+    return NotificationPayload(key=key, num=num, ty=ty)
+
+
+@dataclass(frozen=True, slots=True)
+class NotificationSet(Sequence[NotificationPayload]):
+    """The notifications of an event.
+
+    Presets are bits of ``mask``; other lead times the web app allows are
+    kept in ``custom`` as ``(num, type)`` pairs. Rows are translated only at
+    the database boundary, and the payloads and label are built once per
+    distinct set, which ``notification_set`` shares between events.
+
+    Iterating yields payloads ordered by key: presets by lead time with
+    their bit as key, then custom ones keyed from CUSTOM_KEY_BASE.
+    """
+
+    mask: int = 0
+    custom: tuple[tuple[int, str], ...] = ()
+    payloads: tuple[NotificationPayload, ...] = field(init=False, repr=False, compare=False)
+    # Rendered lead times, e.g. "30分前, 1時間前"
+    label: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.mask < 1 << len(NOTIFICATION_PRESETS):
+            raise ValueError(f"Invalid notification mask: {self.mask:#x}")
+        payloads = tuple(
+            notification_payload(bit, num, ty)
+            for bit, (num, ty) in enumerate(NOTIFICATION_PRESETS)
+            if self.mask >> bit & 1
+        ) + tuple(
+            notification_payload(CUSTOM_KEY_BASE + i, num, ty)
+            for i, (num, ty) in enumerate(self.custom)
+        )
+        object.__setattr__(self, "payloads", payloads)
+        object.__setattr__(self, "label", ", ".join(str(p) for p in payloads))
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[tuple[int, str]]) -> "NotificationSet":
+        """Encode ``(num, type)`` lead times, dropping duplicates."""
+        mask = 0
+        custom: list[tuple[int, str]] = []
+        for pair in pairs:
+            bit = PRESET_BITS.get(pair)
+            if bit is not None:
+                mask |= 1 << bit
+            elif pair not in custom:
+                custom.append(pair)
+        return notification_set(mask, tuple(custom))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any]) -> "NotificationSet":
+        """Encode ``events.notifications`` rows, skipping entries that are not objects."""
+        return cls.from_pairs(
+            (row["num"], row.get("type", "分前")) for row in rows if isinstance(row, dict)
+        )
+
+    @classmethod
+    def of(cls, payloads: Iterable[NotificationPayload]) -> "NotificationSet":
+        """Encode payloads; their keys are replaced by the set's."""
+        return cls.from_pairs((p.num, p.ty) for p in payloads)
+
+    def to_rows(self) -> list[dict[str, Any]]:
+        """Decode into ``events.notifications`` rows, keyed in order."""
+        return [{"key": i, "num": p.num, "type": p.ty} for i, p in enumerate(self.payloads)]
+
+    def __iter__(self) -> Iterator[NotificationPayload]:
+        return iter(self.payloads)
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    @overload
+    def __getitem__(self, index: int) -> NotificationPayload: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> tuple[NotificationPayload, ...]: ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> NotificationPayload | tuple[NotificationPayload, ...]:
+        return self.payloads[index]
+
+    def __str__(self) -> str:
+        return self.label
+
+
+@lru_cache(maxsize=4096)
+def notification_set(mask: int = 0, custom: tuple[tuple[int, str], ...] = ()) -> NotificationSet:
+    """A shared NotificationSet instance."""
+    return NotificationSet(mask, custom)
+
+
+def notification_anchor(value: datetime, is_all_day: bool) -> datetime:
+    """The JST time lead times count back from.
+
+    All-day events are anchored at midnight JST of their date.
+    """
+    if is_all_day:
+        return value.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=JST)
+    return value.astimezone(JST)
+
+
+def next_notify_at(
+    start_at: datetime,
+    is_all_day: bool,
+    notifications: Iterable[NotificationPayload],
+    after: datetime,
+) -> datetime | None:
+    """The first fire time later than ``after``, including the one at event start."""
+    anchor = notification_anchor(start_at, is_all_day)
+    fire_times = [anchor - timedelta(minutes=n.minutes) for n in notifications]
+    fire_times.append(anchor)
+    return min((t for t in fire_times if t > after), default=None)
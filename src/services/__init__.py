@@ -1,6 +1,43 @@
 """Business logic services."""
 
+from src.services.cache import CacheStats, TTLCache
 from src.services.event_service import EventService
+from src.services.executor import ExecutorStats, QueryExecutor
 from src.services.guild_service import GuildService
+from src.services.http import HttpPool, HttpPoolStats, ResponseStats
+from src.services.replica import LocalReplica, ReplicaSync
+from src.services.repository import EventRepository, GuildRepository
+from src.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    EndpointStats,
+    Resilience,
+    RetryPolicy,
+)
+from src.services.singleflight import FlightStats, SingleFlight
+from src.services.write_buffer import GuildWriteBuffer, WriteBufferStats
 
-__all__ = ["EventService", "GuildService"]
+__all__ = [
+    "CacheStats",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "EndpointStats",
+    "EventRepository",
+    "EventService",
+    "ExecutorStats",
+    "FlightStats",
+    "GuildRepository",
+    "GuildService",
+    "GuildWriteBuffer",
+    "HttpPool",
+    "HttpPoolStats",
+    "LocalReplica",
+    "QueryExecutor",
+    "ReplicaSync",
+    "Resilience",
+    "ResponseStats",
+    "RetryPolicy",
+    "SingleFlight",
+    "TTLCache",
+    "WriteBufferStats",
+]
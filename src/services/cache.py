@@ -0,0 +1,112 @@
+"""Bounded in-memory caches for rarely changing rows."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Final, Generic, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+# Returned by TTLCache.get when the key is absent or expired, so that a
+# cached ``None`` (a known-missing row) can be told apart from a miss.
+MISSING: Final[Any] = object()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Snapshot of TTLCache activity."""
+
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TTLCache(Generic[K, V]):
+    """LRU cache whose entries also expire ``ttl`` seconds after being stored.
+
+    ``None`` is a valid value, which allows negative caching of rows that do
+    not exist. Loaders read ``version(key)`` before fetching and pass it to
+    ``put``, so a fetch that raced an ``invalidate`` does not store its stale
+    result.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        # Bumped by invalidate (per key) and clear (all keys)
+        self._versions: dict[K, int] = {}
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V:
+        """Get a fresh value, or MISSING."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    def version(self, key: K) -> int:
+        """A number that changes whenever ``key`` is invalidated."""
+        return self._generation + self._versions.get(key, 0)
+
+    def put(self, key: K, value: V, ttl: float | None = None, version: int | None = None) -> None:
+        """Store a value, evicting the least recently used entry if full.
+
+        Nothing is stored if ``version`` is given and ``key`` has been
+        invalidated since it was read.
+        """
+        if version is not None and version != self.version(key):
+            return
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        """Drop a key if present."""
+        self._entries.pop(key, None)
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self._generation += 1
+
+    def stats(self) -> CacheStats:
+        """Get a snapshot of cache statistics."""
+        return CacheStats(
+            size=len(self._entries),
+            max_size=self.max_size,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+        )
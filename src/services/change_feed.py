@@ -0,0 +1,234 @@
+"""Push-based row change feeds for in-memory state."""
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Self
+
+import structlog
+from realtime import (
+    AsyncRealtimeClient,
+    RealtimePostgresChangesListenEvent,
+    RealtimeSubscribeStates,
+)
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import Server, ServerConnection, broadcast, serve
+from websockets.exceptions import ConnectionClosed
+
+logger = structlog.get_logger()
+
+# Tables whose changes the bot keeps in memory
+WATCHED_TABLES = ("events", "event_settings", "guild_config")
+
+
+@dataclass(frozen=True)
+class RowChange:
+    """A single INSERT, UPDATE or DELETE on a watched table."""
+
+    table: str
+    type: str  # "INSERT", "UPDATE", "DELETE"
+    record: dict[str, Any] = field(default_factory=dict)
+    old_record: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Self:
+        """Create RowChange from a Realtime ``postgres_changes`` data dictionary."""
+        return cls(
+            table=data["table"],
+            type=str(data["type"]).upper(),
+            record=data.get("record") or {},
+            old_record=data.get("old_record") or {},
+        )
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return {
+            "table": self.table,
+            "type": self.type,
+            "record": self.record,
+            "old_record": self.old_record,
+        }
+
+
+class ChangeFeed(ABC):
+    """Base class for sources that push RowChanges to a callback."""
+
+    def __init__(self, on_change: Callable[[RowChange], None]):
+        self.on_change = on_change
+        self.received = 0
+
+    @property
+    @abstractmethod
+    def connected(self) -> bool:
+        """Whether changes are currently being delivered."""
+
+    @abstractmethod
+    async def start(self) -> None:
+        """Start receiving changes."""
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop receiving changes."""
+
+    def _deliver(self, data: dict) -> None:
+        try:
+            change = RowChange.from_dict(data)
+        except (KeyError, TypeError) as e:
+            logger.warning("Ignoring malformed row change", error=str(e))
+            return
+        if change.table not in WATCHED_TABLES:
+            return
+        self.received += 1
+        self.on_change(change)
+
+
+class RealtimeChangeFeed(ChangeFeed):
+    """Change feed backed by Supabase Realtime ``postgres_changes``."""
+
+    def __init__(
+        self,
+        supabase_url: str,
+        supabase_key: str,
+        on_change: Callable[[RowChange], None],
+    ):
+        super().__init__(on_change)
+        self.client = AsyncRealtimeClient(f"{supabase_url}/realtime/v1", supabase_key)
+        self._subscribed = False
+
+    @property
+    def connected(self) -> bool:
+        """Whether the channel is subscribed over a live socket."""
+        return self._subscribed and self.client.is_connected
+
+    async def start(self) -> None:
+        """Connect and subscribe to all watched tables."""
+        await self.client.connect()
+        channel = self.client.channel("discalendar-bot")
+        for table in WATCHED_TABLES:
+            channel.on_postgres_changes(
+                RealtimePostgresChangesListenEvent.All,
+                callback=lambda payload: self._deliver(payload["data"]),
+                table=table,
+                schema="public",
+            )
+        await channel.subscribe(self._on_subscribe_state)
+
+    async def stop(self) -> None:
+        """Unsubscribe and close the socket."""
+        self._subscribed = False
+        await self.client.remove_all_channels()
+        await self.client.close()
+
+    def _on_subscribe_state(self, state: RealtimeSubscribeStates, error: Exception | None) -> None:
+        self._subscribed = state == RealtimeSubscribeStates.SUBSCRIBED
+        if self._subscribed:
+            logger.info("Subscribed to Realtime changes", tables=WATCHED_TABLES)
+        else:
+            logger.warning(
+                "Realtime subscription lost",
+                state=str(state),
+                error=str(error) if error else None,
+            )
+
+
+class WebSocketChangeFeed(ChangeFeed):
+    """Change feed reading JSON RowChanges from a plain WebSocket.
+
+    Used with LocalChangeFeedServer to test and benchmark without Supabase.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        on_change: Callable[[RowChange], None],
+        reconnect_delay: float = 5.0,
+    ):
+        super().__init__(on_change)
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self._connected = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def connected(self) -> bool:
+        """Whether the socket is open."""
+        return self._connected.is_set()
+
+    async def wait_connected(self) -> None:
+        """Wait until the socket is open."""
+        await self._connected.wait()
+
+    async def start(self) -> None:
+        """Start the receive loop in the background."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the receive loop."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self._connected.clear()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with connect(self.url) as ws:
+                    self._connected.set()
+                    logger.info("Connected to change feed", url=self.url)
+                    async for message in ws:
+                        try:
+                            data = json.loads(message)
+                        except ValueError:
+                            logger.warning("Ignoring non-JSON change feed message")
+                            continue
+                        self._deliver(data)
+            except (OSError, ConnectionClosed) as e:
+                logger.warning("Change feed disconnected", url=self.url, error=str(e))
+            finally:
+                self._connected.clear()
+            await asyncio.sleep(self.reconnect_delay)
+
+
+class LocalChangeFeedServer:
+    """Local stand-in for Supabase Realtime broadcasting RowChanges over WebSocket."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self._server: Server | None = None
+        self._clients: set[ServerConnection] = set()
+
+    @property
+    def url(self) -> str:
+        """WebSocket URL clients should connect to."""
+        return f"ws://{self.host}:{self.port}"
+
+    @property
+    def client_count(self) -> int:
+        """Number of connected clients."""
+        return len(self._clients)
+
+    async def start(self) -> None:
+        """Start listening."""
+        self._server = await serve(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Close all connections and stop listening."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def publish(self, change: RowChange) -> None:
+        """Send a change to every connected client."""
+        broadcast(self._clients, json.dumps(change.to_dict()))
+
+    async def _handle(self, ws: ServerConnection) -> None:
+        self._clients.add(ws)
+        try:
+            await ws.wait_closed()
+        finally:
+            self._clients.discard(ws)
@@ -0,0 +1,73 @@
+"""In-memory copy of the event_settings table."""
+
+import hashlib
+from collections.abc import Iterable
+
+from src.models import EventSettings
+
+
+class NotificationChannelMap:
+    """``guild_id -> notification channel`` map mirroring ``event_settings``.
+
+    IDs are stored as ints to keep the map compact. Until ``replace`` has
+    been called the map is not ``loaded`` and callers must fall back to the
+    database; afterwards a guild absent from the map has no settings.
+    """
+
+    def __init__(self) -> None:
+        # guild_id -> (event_settings.id, channel_id)
+        self._channels: dict[int, tuple[int, int]] = {}
+        # event_settings.id -> guild_id, for DELETEs that only carry the primary key
+        self._guild_by_row: dict[int, int] = {}
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def get(self, guild_id: str) -> EventSettings | None:
+        """Get a guild's settings."""
+        entry = self._channels.get(int(guild_id))
+        if entry is None:
+            return None
+        return EventSettings(id=entry[0], guild_id=guild_id, channel_id=str(entry[1]))
+
+    def set(self, settings: EventSettings) -> None:
+        """Add or replace a guild's settings."""
+        guild_id = int(settings.guild_id)
+        self.discard(settings.guild_id)
+        self._channels[guild_id] = (settings.id, int(settings.channel_id))
+        self._guild_by_row[settings.id] = guild_id
+
+    def discard(self, guild_id: str) -> None:
+        """Remove a guild's settings if present."""
+        entry = self._channels.pop(int(guild_id), None)
+        if entry is not None:
+            self._guild_by_row.pop(entry[0], None)
+
+    def discard_row(self, settings_id: int) -> None:
+        """Remove the settings with the given ``event_settings.id`` if present."""
+        guild_id = self._guild_by_row.pop(settings_id, None)
+        if guild_id is not None:
+            self._channels.pop(guild_id, None)
+
+    def replace(self, rows: Iterable[EventSettings]) -> None:
+        """Replace the whole map and mark it loaded."""
+        self._channels.clear()
+        self._guild_by_row.clear()
+        for settings in rows:
+            self.set(settings)
+        self.loaded = True
+
+    def checksum(self) -> str:
+        """MD5 of ``id:guild_id:channel_id`` rows joined by commas in guild_id text order.
+
+        Matches the ``event_settings_checksum()`` SQL function.
+        """
+        rows = sorted(
+            (str(guild_id), settings_id, channel_id)
+            for guild_id, (settings_id, channel_id) in self._channels.items()
+        )
+        joined = ",".join(
+            f"{row_id}:{guild_id}:{channel_id}" for guild_id, row_id, channel_id in rows
+        )
+        return hashlib.md5(joined.encode()).hexdigest()
@@ -0,0 +1,87 @@
+"""Decoding of PostgREST event responses straight into models with msgspec.
+
+Requires the optional ``fast`` extra (``msgspec``). msgspec validates the
+response bytes against typed structs and parses the timestamps in C, so no
+intermediate dicts or ``datetime.fromisoformat`` calls are needed.
+"""
+
+import json
+from datetime import datetime
+
+import msgspec
+
+from src.models import Event, EventCreate, NotificationSet
+from src.models.event import DEFAULT_COLOR
+
+
+class NotificationRow(msgspec.Struct):
+    """An element of ``events.notifications``; ``key`` is not needed."""
+
+    num: int
+    type: str = "分前"
+
+
+class EventRow(msgspec.Struct):
+    """An ``events`` row; detail columns are unset for SCHEDULE_COLUMNS selects."""
+
+    id: str
+    guild_id: str
+    start_at: datetime
+    end_at: datetime
+    updated_at: datetime
+    is_all_day: bool = False
+    notifications: list[NotificationRow] | None = None
+    name: str | msgspec.UnsetType = msgspec.UNSET
+    description: str | None = None
+    color: str = DEFAULT_COLOR
+    location: str | None = None
+    channel_id: str | None = None
+    channel_name: str | None = None
+    created_at: datetime | None = None
+
+
+class EventCodec:
+    """Decodes ``events`` responses into Events and encodes EventCreate payloads."""
+
+    def __init__(self) -> None:
+        self._decoder = msgspec.json.Decoder(list[EventRow])
+        self._encoder = msgspec.json.Encoder()
+
+    def decode_events(self, content: bytes) -> list[Event]:
+        """Build Events from a PostgREST JSON array.
+
+        Rows the schema does not cover, such as malformed notifications,
+        are decoded the slow way through ``Event.from_dict``.
+        """
+        try:
+            rows = self._decoder.decode(content)
+        except msgspec.ValidationError:
+            return [Event.from_dict(row) for row in json.loads(content)]
+        return [self._to_event(row) for row in rows]
+
+    def encode_create(self, data: EventCreate) -> bytes:
+        """Encode an insert payload; equivalent to ``json.dumps(data.to_dict())``."""
+        return self._encoder.encode(data.to_dict())
+
+    @staticmethod
+    def _to_event(row: EventRow) -> Event:
+        partial = row.name is msgspec.UNSET
+        return Event(
+            id=row.id,
+            guild_id=row.guild_id,
+            name="" if isinstance(row.name, msgspec.UnsetType) else row.name,
+            description=row.description,
+            color=row.color,
+            is_all_day=row.is_all_day,
+            start_at=row.start_at,
+            end_at=row.end_at,
+            location=row.location,
+            channel_id=row.channel_id,
+            channel_name=row.channel_name,
+            notifications=NotificationSet.from_pairs(
+                (n.num, n.type) for n in row.notifications or ()
+            ),
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            partial=partial,
+        )
@@ -1,87 +1,496 @@
 """Event service for database operations."""
 
-from datetime import datetime
-from typing import Any, cast
+import json
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any, cast
 
 import structlog
+from postgrest.exceptions import APIError
 from supabase import Client
 
-from src.models import Event, EventCreate, EventSettings
+from src.models import DETAIL_COLUMNS, EVENT_COLUMNS, Event, EventCreate, EventSettings
+from src.services.change_feed import RowChange
+from src.services.channel_map import NotificationChannelMap
+from src.services.executor import QueryExecutor
+from src.services.http import execute_raw
+from src.services.replica import LocalReplica
+from src.services.resilience import Resilience, is_transient
+from src.services.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from src.services.codec import EventCodec
 
 logger = structlog.get_logger()
 
+# Rows per page when streaming events; PostgREST's default max-rows is 1000
+DEFAULT_PAGE_SIZE = 1000
+
+SETTINGS_COLUMNS = "id,guild_id,channel_id"
+
+
+def select_list(columns: Sequence[str]) -> str:
+    """Build a PostgREST ``select`` parameter from column names."""
+    return ",".join(columns)
+
+
+async def _iter_list(events: list[Event]) -> AsyncIterator[Event]:
+    for event in events:
+        yield event
+
 
 class EventService:
-    """Service for event database operations."""
+    """Service for event database operations.
+
+    With a loaded ``replica``, reads are served from the local SQLite mirror
+    and return complete events whatever ``columns`` asks for. Writes always
+    go to Supabase and are then applied to the replica.
 
-    def __init__(self, supabase: Client):
+    With a ``codec``, event responses are decoded from the raw bytes
+    instead of through supabase-py's dicts.
+    """
+
+    def __init__(
+        self,
+        supabase: Client,
+        executor: QueryExecutor | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        resilience: Resilience | None = None,
+        replica: LocalReplica | None = None,
+        codec: "EventCodec | None" = None,
+        track_next_notify: bool = False,
+    ):
         self.supabase = supabase
+        self.executor = executor or QueryExecutor()
+        self.resilience = resilience or Resilience(self.executor)
+        self.page_size = page_size
+        self.replica = replica
+        self.codec = codec
+        self.track_next_notify = track_next_notify
+        self.channels = NotificationChannelMap()
+        self.flights = SingleFlight()
 
-    async def find_by_guild_id(
-        self, guild_id: str, range_type: str = "future"
-    ) -> list[Event]:
-        """Find events by guild ID with optional range filter."""
-        now = datetime.utcnow().isoformat()
+    def _local(self) -> LocalReplica | None:
+        """The replica if it can serve reads."""
+        if self.replica is not None and self.replica.loaded:
+            return self.replica
+        return None
+
+    def iter_by_guild_id(
+        self, guild_id: str, range_type: str = "future", page_size: int | None = None
+    ) -> AsyncIterator[Event]:
+        """Stream events by guild ID with optional range filter, ordered by start_at."""
+        now = datetime.now(UTC)
+        if replica := self._local():
+            return _iter_list(replica.events_by_guild(guild_id, range_type, now))
+        cutoff = now.isoformat()
 
-        query = self.supabase.table("events").select("*").eq("guild_id", guild_id)
+        def build() -> Any:
+            query = (
+                self.supabase.table("events")
+                .select(select_list(EVENT_COLUMNS))
+                .eq("guild_id", guild_id)
+            )
+            if range_type == "past":
+                query = query.lt("start_at", cutoff)
+            elif range_type == "future":
+                query = query.gte("start_at", cutoff)
+            # "all" - no additional filter
+            return query
 
-        if range_type == "past":
-            query = query.lt("start_at", now)
-        elif range_type == "future":
-            query = query.gte("start_at", now)
-        # "all" - no additional filter
+        return self._iter_by_start("events.by_guild", build, page_size)
+
+    def iter_future_events(
+        self, from_time: datetime, page_size: int | None = None
+    ) -> AsyncIterator[Event]:
+        """Stream all future events across all guilds, ordered by start_at."""
+        if replica := self._local():
+            return _iter_list(replica.events_starting_between(from_time))
+        return self._iter_by_start(
+            "events.future",
+            lambda: (
+                self.supabase.table("events")
+                .select(select_list(EVENT_COLUMNS))
+                .gte("start_at", from_time.isoformat())
+            ),
+            page_size,
+        )
+
+    def iter_events_starting_between(
+        self,
+        start: datetime,
+        end: datetime,
+        page_size: int | None = None,
+        columns: Sequence[str] = EVENT_COLUMNS,
+    ) -> AsyncIterator[Event]:
+        """Stream events across all guilds whose start_at is in ``[start, end)``."""
+        if replica := self._local():
+            return _iter_list(replica.events_starting_between(start, end))
+        return self._iter_by_start(
+            "events.starting_between",
+            lambda: (
+                self.supabase.table("events")
+                .select(select_list(columns))
+                .gte("start_at", start.isoformat())
+                .lt("start_at", end.isoformat())
+            ),
+            page_size,
+        )
 
-        query = query.order("start_at")
-        response = query.execute()
+    async def find_by_guild_id(self, guild_id: str, range_type: str = "future") -> list[Event]:
+        """Find events by guild ID with optional range filter.
 
-        return [Event.from_dict(cast(dict[str, Any], e)) for e in response.data]
+        Identical concurrent calls share a single query.
+        """
+
+        async def fetch() -> list[Event]:
+            return [event async for event in self.iter_by_guild_id(guild_id, range_type)]
+
+        events = await self.flights.do(("events.find_by_guild_id", guild_id, range_type), fetch)
+        return list(events)
 
     async def find_all_future_events(self, from_time: datetime) -> list[Event]:
         """Find all future events across all guilds."""
-        response = (
+        return [event async for event in self.iter_future_events(from_time)]
+
+    async def find_events_starting_between(
+        self, start: datetime, end: datetime, columns: Sequence[str] = EVENT_COLUMNS
+    ) -> list[Event]:
+        """Find events across all guilds whose start_at is in ``[start, end)``."""
+        return [
+            event async for event in self.iter_events_starting_between(start, end, columns=columns)
+        ]
+
+    async def find_events_updated_since(
+        self, since: datetime, columns: Sequence[str] = EVENT_COLUMNS
+    ) -> list[Event]:
+        """Find events across all guilds with ``updated_at >= since``, oldest first.
+
+        Paged with an ``(updated_at, id)`` keyset, so bulk edits are not
+        truncated at max-rows.
+        """
+        if replica := self._local():
+            return replica.events_updated_since(since)
+        return [
+            event
+            async for event in self._iter_by_key(
+                "events.updated_since",
+                lambda: (
+                    self.supabase.table("events")
+                    .select(select_list(columns))
+                    .gte("updated_at", since.isoformat())
+                ),
+                "updated_at",
+                None,
+            )
+        ]
+
+    async def find_event_versions_between(
+        self, start: datetime, end: datetime
+    ) -> dict[str, datetime]:
+        """Get ``id -> updated_at`` for events whose start_at is in ``[start, end)``.
+
+        Paged by ``id``: the caller treats absent IDs as deleted, so the
+        result must never be cut off at max-rows.
+        """
+        if replica := self._local():
+            return replica.event_versions_between(start, end)
+        versions: dict[str, datetime] = {}
+        cursor: str | None = None
+        while True:
+            query = (
+                self.supabase.table("events")
+                .select("id,updated_at")
+                .gte("start_at", start.isoformat())
+                .lt("start_at", end.isoformat())
+            )
+            if cursor is not None:
+                query = query.gt("id", cursor)
+            query = query.order("id").limit(self.page_size)
+            response = await self.resilience.run("events.versions", query.execute)
+            rows = cast(list[dict[str, Any]], response.data)
+            for row in rows:
+                versions[row["id"]] = datetime.fromisoformat(
+                    row["updated_at"].replace("Z", "+00:00")
+                )
+            if len(rows) < self.page_size:
+                return versions
+            cursor = rows[-1]["id"]
+
+    async def find_by_ids(
+        self, event_ids: Iterable[str], columns: Sequence[str] = EVENT_COLUMNS
+    ) -> list[Event]:
+        """Find events by ID."""
+        ids = list(dict.fromkeys(event_ids))
+        if not ids:
+            return []
+        if replica := self._local():
+            return replica.events_by_ids(ids)
+
+        # One query per page of IDs keeps each response under max-rows
+        events: list[Event] = []
+        for i in range(0, len(ids), self.page_size):
+            query = (
+                self.supabase.table("events")
+                .select(select_list(columns))
+                .in_("id", ids[i : i + self.page_size])
+            )
+            events.extend(await self._fetch_events("events.by_ids", query))
+        return events
+
+    async def find_due_events(
+        self, now: datetime, columns: Sequence[str] = EVENT_COLUMNS
+    ) -> list[Event]:
+        """Find events whose ``next_notify_at`` has been reached, earliest first.
+
+        One range scan of the ``events_next_notify_at`` index. At most
+        ``page_size`` rows are returned; the rest follow once these have been
+        advanced. Always read from Supabase, as the replica does not see
+        ``advance_next_notify_at``.
+        """
+        query = (
             self.supabase.table("events")
-            .select("*")
-            .gte("start_at", from_time.isoformat())
-            .order("start_at")
-            .execute()
+            .select(select_list(columns))
+            .lte("next_notify_at", now.isoformat())
+            .order("next_notify_at")
+            .limit(self.page_size)
         )
-        return [Event.from_dict(cast(dict[str, Any], e)) for e in response.data]
+        return await self._fetch_events("events.due", query)
+
+    async def advance_next_notify_at(self, event_ids: Iterable[str], after: datetime) -> None:
+        """Move ``next_notify_at`` of the events to their first fire time after ``after``."""
+        ids = list(dict.fromkeys(event_ids))
+        if not ids:
+            return
+        query = self.supabase.rpc(
+            "advance_next_notify_at", {"event_ids": ids, "after": after.isoformat()}
+        )
+        await self.resilience.run("events.advance_next_notify_at", query.execute)
+
+    async def load_details(self, events: Iterable[Event]) -> dict[str, Event]:
+        """Complete partial events with their DETAIL_COLUMNS, keyed by event ID.
+
+        Complete events are returned as they are. Events deleted in the
+        meantime are absent from the result.
+        """
+        by_id = {event.id: event for event in events}
+        partial = {event_id: event for event_id, event in by_id.items() if event.partial}
+        if not partial:
+            return by_id
+        if replica := self._local():
+            for event_id in partial:
+                del by_id[event_id]
+            by_id.update((event.id, event) for event in replica.events_by_ids(partial))
+            return by_id
+
+        query = (
+            self.supabase.table("events")
+            .select(select_list(DETAIL_COLUMNS))
+            .in_("id", list(partial))
+        )
+        response = await self.resilience.run("events.details", query.execute)
+        for event_id in partial:
+            del by_id[event_id]
+        for row in cast(list[dict[str, Any]], response.data):
+            by_id[row["id"]] = partial[row["id"]].with_details(row)
+        return by_id
+
+    def _iter_by_start(
+        self, endpoint: str, build: Callable[[], Any], page_size: int | None
+    ) -> AsyncIterator[Event]:
+        """Page through ``build()`` with a ``(start_at, id)`` keyset cursor."""
+        return self._iter_by_key(endpoint, build, "start_at", page_size)
+
+    async def _iter_by_key(
+        self, endpoint: str, build: Callable[[], Any], key: str, page_size: int | None
+    ) -> AsyncIterator[Event]:
+        """Page through ``build()`` with a ``(key, id)`` keyset cursor.
+
+        ``key`` is a timestamp column of the selected events. Unlike OFFSET
+        paging, each page is an index range scan that starts where the
+        previous one ended, and no single response is large enough to hit
+        PostgREST's max-rows cap.
+        """
+        page_size = page_size or self.page_size
+        cursor: tuple[str, str] | None = None
+        while True:
+            query = build()
+            if cursor is not None:
+                value, event_id = cursor
+                query = query.or_(f'{key}.gt."{value}",and({key}.eq."{value}",id.gt."{event_id}")')
+            query = query.order(key).order("id").limit(page_size)
+            events = await self._fetch_events(endpoint, query)
+
+            for event in events:
+                yield event
+            if len(events) < page_size:
+                return
+            cursor = (getattr(events[-1], key).isoformat(), events[-1].id)
+
+    async def _fetch_events(self, endpoint: str, query: Any) -> list[Event]:
+        """Run an ``events`` select and build Events from the response."""
+        codec = self.codec
+        if codec is None:
+            response = await self.resilience.run(endpoint, query.execute)
+            return [Event.from_dict(cast(dict[str, Any], e)) for e in response.data]
+        content = await self.resilience.run(endpoint, lambda: execute_raw(query))
+        return codec.decode_events(content)
 
     async def create(self, data: EventCreate) -> Event:
         """Create a new event."""
-        response = self.supabase.table("events").insert(data.to_dict()).execute()
+        if self.track_next_notify:
+            data = data.with_next_notify_at(datetime.now(UTC))
+        query = self.supabase.table("events").insert(data.to_dict())
+        if self.codec is not None:
+            body = self.codec.encode_create(data)
+            content = await self.resilience.run(
+                "events.create", lambda: execute_raw(query, body), idempotent=False
+            )
+            rows = cast(list[dict[str, Any]], json.loads(content))
+        else:
+            response = await self.resilience.run("events.create", query.execute, idempotent=False)
+            rows = cast(list[dict[str, Any]], response.data)
         logger.info("Created event", guild_id=data.guild_id, name=data.name)
-        return Event.from_dict(cast(dict[str, Any], response.data[0]))
+        if self.replica is not None:
+            self.replica.upsert_events(rows[:1])
+        return Event.from_dict(rows[0])
 
     async def get_settings(self, guild_id: str) -> EventSettings | None:
-        """Get event settings for a guild."""
-        response = (
-            self.supabase.table("event_settings")
-            .select("*")
-            .eq("guild_id", guild_id)
-            .execute()
-        )
-        if response.data:
-            return EventSettings.from_dict(cast(dict[str, Any], response.data[0]))
-        return None
+        """Get event settings for a guild.
+
+        Served from the in-memory channel map once it has been loaded, or
+        else from the replica.
+        """
+        if self.channels.loaded:
+            return self.channels.get(guild_id)
+        if replica := self._local():
+            return replica.settings(guild_id)
+
+        async def fetch() -> EventSettings | None:
+            query = (
+                self.supabase.table("event_settings")
+                .select(SETTINGS_COLUMNS)
+                .eq("guild_id", guild_id)
+            )
+            response = await self.resilience.run("event_settings.get", query.execute)
+            if response.data:
+                return EventSettings.from_dict(cast(dict[str, Any], response.data[0]))
+            return None
+
+        return await self.flights.do(("event_settings.get", guild_id), fetch)
+
+    async def get_settings_many(self, guild_ids: Iterable[str]) -> dict[str, EventSettings]:
+        """Get event settings for multiple guilds, keyed by guild ID.
+
+        Guilds without settings are absent from the result.
+        """
+        ids = list(dict.fromkeys(guild_ids))
+        if not ids:
+            return {}
+
+        if self.channels.loaded:
+            found = (self.channels.get(guild_id) for guild_id in ids)
+            return {s.guild_id: s for s in found if s is not None}
+        if replica := self._local():
+            found = (replica.settings(guild_id) for guild_id in ids)
+            return {s.guild_id: s for s in found if s is not None}
+
+        query = self.supabase.table("event_settings").select(SETTINGS_COLUMNS).in_("guild_id", ids)
+        response = await self.resilience.run("event_settings.get_many", query.execute)
+        settings = [EventSettings.from_dict(cast(dict[str, Any], s)) for s in response.data]
+        return {s.guild_id: s for s in settings}
 
     async def create_settings(self, guild_id: str, channel_id: str) -> EventSettings:
         """Create event settings for a guild."""
-        response = (
-            self.supabase.table("event_settings")
-            .insert({"guild_id": guild_id, "channel_id": channel_id})
-            .execute()
+        query = self.supabase.table("event_settings").insert(
+            {"guild_id": guild_id, "channel_id": channel_id}
+        )
+        response = await self.resilience.run(
+            "event_settings.create", query.execute, idempotent=False
         )
         logger.info("Created event settings", guild_id=guild_id, channel_id=channel_id)
-        return EventSettings.from_dict(cast(dict[str, Any], response.data[0]))
+        settings = EventSettings.from_dict(cast(dict[str, Any], response.data[0]))
+        self.channels.set(settings)
+        if self.replica is not None:
+            self.replica.put_settings(settings)
+        return settings
 
     async def update_settings(self, guild_id: str, channel_id: str) -> EventSettings:
         """Update event settings for a guild."""
-        response = (
+        query = (
             self.supabase.table("event_settings")
             .update({"channel_id": channel_id})
             .eq("guild_id", guild_id)
-            .execute()
         )
+        response = await self.resilience.run("event_settings.update", query.execute)
         logger.info("Updated event settings", guild_id=guild_id, channel_id=channel_id)
-        return EventSettings.from_dict(cast(dict[str, Any], response.data[0]))
+        settings = EventSettings.from_dict(cast(dict[str, Any], response.data[0]))
+        self.channels.set(settings)
+        if self.replica is not None:
+            self.replica.put_settings(settings)
+        return settings
+
+    def forget_settings(self, guild_id: str) -> None:
+        """Drop a guild from the channel map, e.g. after the bot left it."""
+        self.channels.discard(guild_id)
+        if self.replica is not None:
+            self.replica.delete_settings(guild_id)
+
+    def apply_settings_change(self, change: RowChange) -> None:
+        """Apply a pushed ``event_settings`` row change to the channel map."""
+        if change.type == "DELETE":
+            settings_id = change.old_record.get("id")
+            if settings_id is not None:
+                self.channels.discard_row(int(settings_id))
+            return
+        self.channels.set(EventSettings.from_dict(change.record))
+
+    async def load_channels(self) -> None:
+        """Bulk-load every event_settings row into the channel map."""
+        rows: list[EventSettings] = []
+        last_id: int | None = None
+        while True:
+            query = self.supabase.table("event_settings").select(SETTINGS_COLUMNS)
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            query = query.order("id").limit(self.page_size)
+            response = await self.resilience.run("event_settings.load", query.execute)
+            page = [EventSettings.from_dict(cast(dict[str, Any], r)) for r in response.data]
+            rows.extend(page)
+            if len(page) < self.page_size:
+                break
+            last_id = page[-1].id
+
+        self.channels.replace(rows)
+        logger.info("Loaded notification channels", count=len(self.channels))
+
+    async def reconcile_channels(self) -> bool:
+        """Reload the channel map if it differs from the table.
+
+        Compares the local checksum with ``event_settings_checksum()``, falling
+        back to a full reload if the function is not installed. Returns
+        whether the map was reloaded.
+        """
+        if self.channels.loaded:
+            try:
+                response = await self.resilience.run(
+                    "event_settings.checksum", self.supabase.rpc("event_settings_checksum").execute
+                )
+            except APIError as e:
+                if is_transient(e):
+                    raise
+                logger.debug("Checksum function unavailable, reloading", error=str(e))
+            else:
+                remote = cast(list[dict[str, Any]], response.data)[0]
+                if (
+                    remote["row_count"] == len(self.channels)
+                    and remote["checksum"] == self.channels.checksum()
+                ):
+                    return False
+                logger.info(
+                    "Notification channels out of sync",
+                    local=len(self.channels),
+                    remote=remote["row_count"],
+                )
+        await self.load_channels()
+        return True
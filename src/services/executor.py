@@ -0,0 +1,103 @@
+"""Bounded thread pool for blocking Supabase calls."""
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TypeVar
+
+import structlog
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+# Queue waits longer than this are logged as warnings
+SLOW_WAIT_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class ExecutorStats:
+    """Snapshot of QueryExecutor activity."""
+
+    max_workers: int
+    queue_depth: int
+    running: int
+    completed: int
+    total_wait: float
+    max_wait: float
+
+    @property
+    def average_wait(self) -> float:
+        """Average time calls spent queued, in seconds."""
+        return self.total_wait / self.completed if self.completed else 0.0
+
+
+class QueryExecutor:
+    """Runs blocking supabase-py calls on a dedicated, bounded thread pool.
+
+    The synchronous ``execute()`` of supabase-py would otherwise block the
+    discord.py event loop for the whole HTTP round trip.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="supabase")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for a free worker."""
+        return self._queued
+
+    def stats(self) -> ExecutorStats:
+        """Get a snapshot of executor statistics."""
+        with self._lock:
+            return ExecutorStats(
+                max_workers=self.max_workers,
+                queue_depth=self._queued,
+                running=self._running,
+                completed=self._completed,
+                total_wait=self._total_wait,
+                max_wait=self._max_wait,
+            )
+
+    async def run(self, fn: Callable[[], T]) -> T:
+        """Run ``fn`` on the pool and await its result."""
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+
+        def call() -> T:
+            wait = time.perf_counter() - submitted_at
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            if wait > SLOW_WAIT_SECONDS:
+                logger.warning(
+                    "Supabase call waited for a worker",
+                    wait_seconds=round(wait, 3),
+                    queue_depth=self._queued,
+                )
+            try:
+                return fn()
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, call)
+
+    def shutdown(self) -> None:
+        """Shut down the pool without waiting for queued calls."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,34 +1,122 @@
 """Guild service for database operations."""
 
-from typing import Any, cast
+import asyncio
+from collections.abc import Iterable, Sequence
+from typing import Any, TypeVar, cast
 
 import structlog
+from postgrest.types import ReturnMethod
 from supabase import Client
 
 from src.models import Guild, GuildConfig, GuildCreate
+from src.services.cache import MISSING, TTLCache
+from src.services.executor import QueryExecutor
+from src.services.replica import LocalReplica
+from src.services.resilience import Resilience
+from src.services.singleflight import SingleFlight
 
 logger = structlog.get_logger()
 
+T = TypeVar("T")
+
+GUILD_COLUMNS = "id,guild_id,name,avatar_url,locale"
+# Columns read when reconciling; only these are compared against Discord
+SUMMARY_COLUMNS = "guild_id,name,avatar_url"
+CONFIG_COLUMNS = "guild_id,restricted"
+
+# Rows per page when listing guilds; PostgREST's default max-rows is 1000
+PAGE_SIZE = 1000
+
+# Rows per bulk upsert or delete; deletes put the IDs in the URL
+BULK_CHUNK_SIZE = 200
+
+
+def upsert_row(data: GuildCreate) -> dict[str, Any]:
+    """Columns written by an upsert.
+
+    ``locale`` is left out so that existing guilds keep theirs and new ones
+    get the column default.
+    """
+    return {"guild_id": data.guild_id, "name": data.name, "avatar_url": data.avatar_url}
+
+
+def chunked(items: Sequence[T], size: int) -> list[Sequence[T]]:
+    """Split ``items`` into consecutive chunks of at most ``size``."""
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
 
 class GuildService:
     """Service for guild database operations."""
 
-    def __init__(self, supabase: Client):
+    def __init__(
+        self,
+        supabase: Client,
+        executor: QueryExecutor | None = None,
+        config_cache: TTLCache[str, GuildConfig | None] | None = None,
+        resilience: Resilience | None = None,
+        replica: LocalReplica | None = None,
+    ):
         self.supabase = supabase
+        self.executor = executor or QueryExecutor()
+        self.resilience = resilience or Resilience(self.executor)
+        self.config_cache: TTLCache[str, GuildConfig | None] = config_cache or TTLCache()
+        self.replica = replica
+        self.flights = SingleFlight()
 
     async def find_by_guild_id(self, guild_id: str) -> Guild | None:
         """Find a guild by Discord guild ID."""
-        response = self.supabase.table("guilds").select("*").eq("guild_id", guild_id).execute()
-        if response.data:
-            return Guild.from_dict(cast(dict[str, Any], response.data[0]))
-        return None
+
+        async def fetch() -> Guild | None:
+            query = self.supabase.table("guilds").select(GUILD_COLUMNS).eq("guild_id", guild_id)
+            response = await self.resilience.run("guilds.get", query.execute)
+            if response.data:
+                return Guild.from_dict(cast(dict[str, Any], response.data[0]))
+            return None
+
+        return await self.flights.do(("guilds.find_by_guild_id", guild_id), fetch)
+
+    async def find_all(self) -> list[GuildCreate]:
+        """Find the ID, name and avatar of every guild, paged by guild ID."""
+        guilds: list[GuildCreate] = []
+        last: str | None = None
+        while True:
+            query = self.supabase.table("guilds").select(SUMMARY_COLUMNS)
+            if last is not None:
+                query = query.gt("guild_id", last)
+            query = query.order("guild_id").limit(PAGE_SIZE)
+            response = await self.resilience.run("guilds.list", query.execute)
+            page = [GuildCreate(**cast(dict[str, Any], g)) for g in response.data]
+            guilds.extend(page)
+            if len(page) < PAGE_SIZE:
+                return guilds
+            last = page[-1].guild_id
 
     async def create(self, data: GuildCreate) -> Guild:
         """Create a new guild."""
-        response = self.supabase.table("guilds").insert(data.to_dict()).execute()
+        query = self.supabase.table("guilds").insert(data.to_dict())
+        response = await self.resilience.run("guilds.create", query.execute, idempotent=False)
         logger.info("Created guild", guild_id=data.guild_id, name=data.name)
         return Guild.from_dict(cast(dict[str, Any], response.data[0]))
 
+    async def upsert(self, data: GuildCreate) -> Guild:
+        """Create a guild, or update its name and avatar if it already exists."""
+        query = self.supabase.table("guilds").upsert(upsert_row(data), on_conflict="guild_id")
+        response = await self.resilience.run("guilds.upsert", query.execute)
+        logger.info("Upserted guild", guild_id=data.guild_id, name=data.name)
+        return Guild.from_dict(cast(dict[str, Any], response.data[0]))
+
+    async def upsert_many(self, guilds: Iterable[GuildCreate]) -> None:
+        """Upsert guilds in chunks of BULK_CHUNK_SIZE, sent concurrently."""
+        rows = [upsert_row(data) for data in guilds]
+
+        async def send(chunk: Sequence[dict[str, Any]]) -> None:
+            query = self.supabase.table("guilds").upsert(
+                list(chunk), on_conflict="guild_id", returning=ReturnMethod.minimal
+            )
+            await self.resilience.run("guilds.upsert_many", query.execute)
+
+        await asyncio.gather(*(send(chunk) for chunk in chunked(rows, BULK_CHUNK_SIZE)))
+
     async def update(self, guild_id: str, data: GuildCreate) -> Guild:
         """Update a guild."""
         update_data = {
@@ -36,31 +124,74 @@ class GuildService:
             "avatar_url": data.avatar_url,
             "locale": data.locale,
         }
-        response = (
-            self.supabase.table("guilds").update(update_data).eq("guild_id", guild_id).execute()
-        )
+        query = self.supabase.table("guilds").update(update_data).eq("guild_id", guild_id)
+        response = await self.resilience.run("guilds.update", query.execute)
         logger.info("Updated guild", guild_id=guild_id, name=data.name)
         return Guild.from_dict(cast(dict[str, Any], response.data[0]))
 
     async def delete(self, guild_id: str) -> None:
         """Delete a guild."""
-        self.supabase.table("guilds").delete().eq("guild_id", guild_id).execute()
+        query = self.supabase.table("guilds").delete().eq("guild_id", guild_id)
+        await self.resilience.run("guilds.delete", query.execute)
         logger.info("Deleted guild", guild_id=guild_id)
 
+    async def delete_many(self, guild_ids: Iterable[str]) -> None:
+        """Delete guilds in chunks of BULK_CHUNK_SIZE, sent concurrently."""
+        ids = list(dict.fromkeys(guild_ids))
+
+        async def send(chunk: Sequence[str]) -> None:
+            query = self.supabase.table("guilds").delete(returning=ReturnMethod.minimal)
+            await self.resilience.run(
+                "guilds.delete_many", query.in_("guild_id", list(chunk)).execute
+            )
+
+        await asyncio.gather(*(send(chunk) for chunk in chunked(ids, BULK_CHUNK_SIZE)))
+
     async def get_config(self, guild_id: str) -> GuildConfig | None:
-        """Get guild configuration."""
-        response = (
-            self.supabase.table("guild_config").select("*").eq("guild_id", guild_id).execute()
-        )
-        if response.data:
-            return GuildConfig.from_dict(cast(dict[str, Any], response.data[0]))
-        return None
+        """Get guild configuration.
+
+        Results, including the absence of a row, are served from
+        ``config_cache`` until they expire or are invalidated. Concurrent
+        misses for the same guild share a single query. A loaded ``replica``
+        answers instead of Supabase.
+        """
+        if self.replica is not None and self.replica.loaded:
+            return self.replica.config(guild_id)
+        cached = self.config_cache.get(guild_id)
+        if cached is not MISSING:
+            return cached
+
+        async def fetch() -> GuildConfig | None:
+            query = (
+                self.supabase.table("guild_config").select(CONFIG_COLUMNS).eq("guild_id", guild_id)
+            )
+            response = await self.resilience.run("guild_config.get", query.execute)
+            config = (
+                GuildConfig.from_dict(cast(dict[str, Any], response.data[0]))
+                if response.data
+                else None
+            )
+            self.config_cache.put(guild_id, config, version=version)
+            return config
+
+        # Callers after an invalidation start a new fetch instead of joining
+        version = self.config_cache.version(guild_id)
+        return await self.flights.do(("guild_config.get", guild_id, version), fetch)
+
+    def invalidate_config(self, guild_id: str) -> None:
+        """Drop a guild's cached configuration."""
+        self.config_cache.invalidate(guild_id)
 
     async def upsert_config(self, guild_id: str, restricted: bool) -> GuildConfig:
         """Create or update guild configuration."""
-        response = (
-            self.supabase.table("guild_config")
-            .upsert({"guild_id": guild_id, "restricted": restricted})
-            .execute()
+        query = self.supabase.table("guild_config").upsert(
+            {"guild_id": guild_id, "restricted": restricted}
         )
-        return GuildConfig.from_dict(cast(dict[str, Any], response.data[0]))
+        try:
+            response = await self.resilience.run("guild_config.upsert", query.execute)
+        finally:
+            self.invalidate_config(guild_id)
+        config = GuildConfig.from_dict(cast(dict[str, Any], response.data[0]))
+        if self.replica is not None:
+            self.replica.put_config(config)
+        return config
@@ -0,0 +1,173 @@
+"""Shared HTTP client for Supabase traffic."""
+
+import importlib.util
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+import httpcore
+import httpx
+from postgrest.exceptions import APIError
+
+
+@dataclass(frozen=True)
+class HttpPoolStats:
+    """Snapshot of the shared HTTP connection pool."""
+
+    max_connections: int
+    connections: int
+    idle: int
+    http2: int
+    requests: int
+
+    @property
+    def active(self) -> int:
+        """Connections currently serving a request."""
+        return self.connections - self.idle
+
+
+@dataclass(frozen=True)
+class ResponseStats:
+    """Response sizes of one query shape (table and ``select`` projection)."""
+
+    responses: int
+    bytes: int
+    wire_bytes: int
+
+    @property
+    def average_bytes(self) -> float:
+        """Average decoded response size."""
+        return self.bytes / self.responses if self.responses else 0.0
+
+
+def query_key(request: httpx.Request) -> str:
+    """Label a request by method, table and projection, e.g. ``GET events?select=id``.
+
+    Filter values are left out so every call site maps to a handful of keys.
+    """
+    table = request.url.path.rsplit("/", 1)[-1]
+    select = request.url.params.get("select")
+    key = f"{request.method} {table}"
+    return f"{key}?select={select}" if select else key
+
+
+def execute_raw(query: Any, body: bytes | None = None) -> bytes:
+    """Send a postgrest-py query and return the response body undecoded.
+
+    Lets a faster codec build models from the bytes instead of supabase-py
+    decoding them into dicts first. ``body`` replaces the query's JSON
+    payload with pre-encoded bytes. Errors are raised as APIError like
+    ``execute()`` does.
+    """
+    request = query.request
+    headers = httpx.Headers(request.headers)
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+    response = request.session.request(
+        request.http_method,
+        str(request.path),
+        params=request.params,
+        headers=headers,
+        auth=request.auth,
+        content=body,
+        json=request.json if body is None else None,
+    )
+    if response.is_success:
+        return response.content
+    try:
+        error = json.loads(response.content)
+    except ValueError:
+        error = None
+    if not isinstance(error, dict):
+        # Same shape as postgrest-py's error for a non-JSON body
+        error = {
+            "message": "JSON could not be generated",
+            "code": response.status_code,
+            "hint": "Refer to full message for details",
+            "details": str(response.content),
+        }
+    raise APIError(error)
+
+
+class HttpPool:
+    """One pooled ``httpx.Client`` shared by every Supabase sub-client.
+
+    Keeps connections alive between calls and negotiates HTTP/2 when the
+    ``h2`` package is installed. httpx sends ``Accept-Encoding: gzip`` and
+    decodes transparently, so large ``select`` responses arrive compressed.
+    The client is thread-safe, so QueryExecutor workers share it.
+
+    Decoded and on-the-wire response bytes are recorded per ``query_key``.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 16,
+        max_keepalive_connections: int = 16,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        http2: bool = True,
+    ):
+        self.max_connections = max_connections
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._lock = threading.Lock()
+        self._requests = 0
+        # query_key -> [responses, bytes, wire_bytes]
+        self._responses: dict[str, list[int]] = {}
+        self.client = httpx.Client(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=connect_timeout),
+            follow_redirects=True,
+            event_hooks={"request": [self._on_request], "response": [self._on_response]},
+        )
+
+    def stats(self) -> HttpPoolStats:
+        """Get a snapshot of pool statistics."""
+        connections = self._connections()
+        return HttpPoolStats(
+            max_connections=self.max_connections,
+            connections=len(connections),
+            idle=sum(1 for conn in connections if conn.is_idle()),
+            http2=sum(1 for conn in connections if "HTTP/2" in conn.info()),
+            requests=self._requests,
+        )
+
+    def response_stats(self) -> dict[str, ResponseStats]:
+        """Get response sizes per query shape."""
+        with self._lock:
+            return {
+                key: ResponseStats(responses=responses, bytes=size, wire_bytes=wire)
+                for key, (responses, size, wire) in self._responses.items()
+            }
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.client.close()
+
+    def _on_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self._requests += 1
+
+    def _on_response(self, response: httpx.Response) -> None:
+        # supabase-py reads every body anyway; reading it here makes its size known
+        response.read()
+        key = query_key(response.request)
+        with self._lock:
+            counters = self._responses.setdefault(key, [0, 0, 0])
+            counters[0] += 1
+            counters[1] += len(response.content)
+            counters[2] += response.num_bytes_downloaded
+
+    def _connections(self) -> list[httpcore.ConnectionInterface]:
+        transport = self.client._transport
+        pool = getattr(transport, "_pool", None)
+        if not isinstance(pool, httpcore.ConnectionPool):
+            return []
+        return list(pool.connections)
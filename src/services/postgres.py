@@ -0,0 +1,541 @@
+"""Storage backend talking to Postgres directly over an asyncpg pool.
+
+Requires the optional ``postgres`` extra (``asyncpg``). Every query is a
+fixed SQL string, so asyncpg prepares it once per connection and reuses the
+statement from its cache; rows arrive in the binary protocol and are built
+into models without a JSON round trip.
+"""
+
+import json
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import UTC, datetime
+from typing import Any
+
+import asyncpg
+import structlog
+
+from src.models import (
+    DETAIL_COLUMNS,
+    EVENT_COLUMNS,
+    Event,
+    EventCreate,
+    EventSettings,
+    Guild,
+    GuildConfig,
+    GuildCreate,
+    NotificationSet,
+)
+from src.services.cache import MISSING, TTLCache
+from src.services.change_feed import RowChange
+from src.services.channel_map import NotificationChannelMap
+from src.services.event_service import DEFAULT_PAGE_SIZE
+from src.services.singleflight import SingleFlight
+
+logger = structlog.get_logger()
+
+EVENT_SELECT = ", ".join(EVENT_COLUMNS)
+
+# Same definition as the event_settings_checksum() function in the README
+SETTINGS_CHECKSUM_SQL = """
+SELECT
+    count(*) AS row_count,
+    md5(coalesce(
+        string_agg(id || ':' || guild_id || ':' || channel_id, ',' ORDER BY guild_id COLLATE "C"),
+        ''
+    )) AS checksum
+FROM event_settings
+"""
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    await conn.set_type_codec("jsonb", encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+
+def create_pool(dsn: str, max_size: int = 10, statement_cache_size: int = 100) -> asyncpg.Pool:
+    """Create a connection pool; await it before first use.
+
+    Set ``statement_cache_size`` to 0 when connecting through a transaction
+    pooler such as Supabase's port 6543, which cannot keep prepared statements.
+    """
+    return asyncpg.create_pool(
+        dsn,
+        min_size=1,
+        max_size=max_size,
+        statement_cache_size=statement_cache_size,
+        init=_init_connection,
+    )
+
+
+def event_from_record(row: asyncpg.Record) -> Event:
+    """Build an Event from an ``events`` row, partial if it lacks DETAIL_COLUMNS."""
+    if "name" not in row.keys():
+        return Event.from_dict({**row, "id": str(row["id"])})
+    return Event(
+        id=str(row["id"]),
+        guild_id=row["guild_id"],
+        name=row["name"],
+        description=row["description"],
+        color=row["color"],
+        is_all_day=row["is_all_day"],
+        start_at=row["start_at"],
+        end_at=row["end_at"],
+        location=row["location"],
+        channel_id=row["channel_id"],
+        channel_name=row["channel_name"],
+        notifications=NotificationSet.from_rows(row["notifications"] or ()),
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+    )
+
+
+def settings_from_record(row: asyncpg.Record) -> EventSettings:
+    """Build EventSettings from an ``event_settings`` row."""
+    return EventSettings(id=row["id"], guild_id=row["guild_id"], channel_id=row["channel_id"])
+
+
+class PostgresEventService:
+    """EventRepository backed by an asyncpg pool."""
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        track_next_notify: bool = False,
+    ):
+        self.pool = pool
+        self.page_size = page_size
+        self.track_next_notify = track_next_notify
+        self.channels = NotificationChannelMap()
+        self.flights = SingleFlight()
+
+    def iter_by_guild_id(
+        self, guild_id: str, range_type: str = "future", page_size: int | None = None
+    ) -> AsyncIterator[Event]:
+        """Stream events by guild ID with optional range filter, ordered by start_at."""
+        now = datetime.now(UTC)
+        if range_type == "past":
+            return self._iter_by_start(
+                "guild_id = $1 AND start_at < $2", (guild_id, now), page_size
+            )
+        if range_type == "future":
+            return self._iter_by_start(
+                "guild_id = $1 AND start_at >= $2", (guild_id, now), page_size
+            )
+        # "all" - no additional filter
+        return self._iter_by_start("guild_id = $1", (guild_id,), page_size)
+
+    def iter_future_events(
+        self, from_time: datetime, page_size: int | None = None
+    ) -> AsyncIterator[Event]:
+        """Stream all future events across all guilds, ordered by start_at."""
+        return self._iter_by_start("start_at >= $1", (from_time,), page_size)
+
+    def iter_events_starting_between(
+        self,
+        start: datetime,
+        end: datetime,
+        page_size: int | None = None,
+        columns: Sequence[str] = EVENT_COLUMNS,
+    ) -> AsyncIterator[Event]:
+        """Stream events across all guilds whose start_at is in ``[start, end)``."""
+        return self._iter_by_start(
+            "start_at >= $1 AND start_at < $2", (start, end), page_size, columns
+        )
+
+    async def find_by_guild_id(self, guild_id: str, range_type: str = "future") -> list[Event]:
+        """Find events by guild ID with optional range filter.
+
+        Identical concurrent calls share a single query.
+        """
+
+        async def fetch() -> list[Event]:
+            return [event async for event in self.iter_by_guild_id(guild_id, range_type)]
+
+        events = await self.flights.do(("events.find_by_guild_id", guild_id, range_type), fetch)
+        return list(events)
+
+    async def find_all_future_events(self, from_time: datetime) -> list[Event]:
+        """Find all future events across all guilds."""
+        return [event async for event in self.iter_future_events(from_time)]
+
+    async def find_events_starting_between(
+        self, start: datetime, end: datetime, columns: Sequence[str] = EVENT_COLUMNS
+    ) -> list[Event]:
+        """Find events across all guilds whose start_at is in ``[start, end)``."""
+        return [
+            event async for event in self.iter_events_starting_between(start, end, columns=columns)
+        ]
+
+    async def find_events_updated_since(
+        self, since: datetime, columns: Sequence[str] = EVENT_COLUMNS
+    ) -> list[Event]:
+        """Find events across all guilds with ``updated_at >= since``, oldest first."""
+        return [
+            event
+            async for event in self._iter_by_key(
+                "updated_at >= $1", (since,), None, columns, key="updated_at"
+            )
+        ]
+
+    async def find_event_versions_between(
+        self, start: datetime, end: datetime
+    ) -> dict[str, datetime]:
+        """Get ``id -> updated_at`` for events whose start_at is in ``[start, end)``."""
+        rows = await self.pool.fetch(
+            "SELECT id, updated_at FROM events WHERE start_at >= $1 AND start_at < $2",
+            start,
+            end,
+        )
+        return {str(row["id"]): row["updated_at"] for row in rows}
+
+    async def find_by_ids(
+        self, event_ids: Iterable[str], columns: Sequence[str] = EVENT_COLUMNS
+    ) -> list[Event]:
+        """Find events by ID."""
+        ids = list(dict.fromkeys(event_ids))
+        if not ids:
+            return []
+
+        rows = await self.pool.fetch(
+            f"SELECT {', '.join(columns)} FROM events WHERE id = ANY($1::uuid[])", ids
+        )
+        return [event_from_record(row) for row in rows]
+
+    async def find_due_events(
+        self, now: datetime, columns: Sequence[str] = EVENT_COLUMNS
+    ) -> list[Event]:
+        """Find events whose ``next_notify_at`` has been reached, earliest first."""
+        rows = await self.pool.fetch(
+            f"SELECT {', '.join(columns)} FROM events WHERE next_notify_at <= $1 "
+            "ORDER BY next_notify_at LIMIT $2",
+            now,
+            self.page_size,
+        )
+        return [event_from_record(row) for row in rows]
+
+    async def advance_next_notify_at(self, event_ids: Iterable[str], after: datetime) -> None:
+        """Move ``next_notify_at`` of the events to their first fire time after ``after``."""
+        ids = list(dict.fromkeys(event_ids))
+        if ids:
+            await self.pool.execute("SELECT advance_next_notify_at($1::uuid[], $2)", ids, after)
+
+    async def load_details(self, events: Iterable[Event]) -> dict[str, Event]:
+        """Complete partial events with their DETAIL_COLUMNS, keyed by event ID."""
+        by_id = {event.id: event for event in events}
+        partial = {event_id: event for event_id, event in by_id.items() if event.partial}
+        if not partial:
+            return by_id
+
+        rows = await self.pool.fetch(
+            f"SELECT {', '.join(DETAIL_COLUMNS)} FROM events WHERE id = ANY($1::uuid[])",
+            list(partial),
+        )
+        for event_id in partial:
+            del by_id[event_id]
+        for row in rows:
+            event_id = str(row["id"])
+            by_id[event_id] = partial[event_id].with_details(dict(row))
+        return by_id
+
+    async def create(self, data: EventCreate) -> Event:
+        """Create a new event."""
+        values = {
+            "guild_id": data.guild_id,
+            "name": data.name,
+            "description": data.description,
+            "color": data.color,
+            "is_all_day": data.is_all_day,
+            "start_at": data.start_at,
+            "end_at": data.end_at,
+            "location": data.location,
+            "channel_id": data.channel_id,
+            "channel_name": data.channel_name,
+            "notifications": data.notifications,
+        }
+        if self.track_next_notify:
+            values["next_notify_at"] = data.with_next_notify_at(datetime.now(UTC)).next_notify_at
+        placeholders = ", ".join(f"${i}" for i in range(1, len(values) + 1))
+        row = await self.pool.fetchrow(
+            f"INSERT INTO events ({', '.join(values)}) VALUES ({placeholders}) "
+            f"RETURNING {EVENT_SELECT}",
+            *values.values(),
+        )
+        logger.info("Created event", guild_id=data.guild_id, name=data.name)
+        return event_from_record(row)
+
+    async def get_settings(self, guild_id: str) -> EventSettings | None:
+        """Get event settings for a guild.
+
+        Served from the in-memory channel map once it has been loaded.
+        """
+        if self.channels.loaded:
+            return self.channels.get(guild_id)
+
+        async def fetch() -> EventSettings | None:
+            row = await self.pool.fetchrow(
+                "SELECT id, guild_id, channel_id FROM event_settings WHERE guild_id = $1",
+                guild_id,
+            )
+            return settings_from_record(row) if row else None
+
+        return await self.flights.do(("event_settings.get", guild_id), fetch)
+
+    async def get_settings_many(self, guild_ids: Iterable[str]) -> dict[str, EventSettings]:
+        """Get event settings for multiple guilds, keyed by guild ID.
+
+        Guilds without settings are absent from the result.
+        """
+        ids = list(dict.fromkeys(guild_ids))
+        if not ids:
+            return {}
+
+        if self.channels.loaded:
+            found = (self.channels.get(guild_id) for guild_id in ids)
+            return {s.guild_id: s for s in found if s is not None}
+
+        rows = await self.pool.fetch(
+            "SELECT id, guild_id, channel_id FROM event_settings WHERE guild_id = ANY($1::varchar[])",
+            ids,
+        )
+        settings = [settings_from_record(row) for row in rows]
+        return {s.guild_id: s for s in settings}
+
+    async def create_settings(self, guild_id: str, channel_id: str) -> EventSettings:
+        """Create event settings for a guild."""
+        row = await self.pool.fetchrow(
+            "INSERT INTO event_settings (guild_id, channel_id) VALUES ($1, $2) "
+            "RETURNING id, guild_id, channel_id",
+            guild_id,
+            channel_id,
+        )
+        logger.info("Created event settings", guild_id=guild_id, channel_id=channel_id)
+        settings = settings_from_record(row)
+        self.channels.set(settings)
+        return settings
+
+    async def update_settings(self, guild_id: str, channel_id: str) -> EventSettings:
+        """Update event settings for a guild."""
+        row = await self.pool.fetchrow(
+            "UPDATE event_settings SET channel_id = $2 WHERE guild_id = $1 "
+            "RETURNING id, guild_id, channel_id",
+            guild_id,
+            channel_id,
+        )
+        logger.info("Updated event settings", guild_id=guild_id, channel_id=channel_id)
+        settings = settings_from_record(row)
+        self.channels.set(settings)
+        return settings
+
+    def forget_settings(self, guild_id: str) -> None:
+        """Drop a guild from the channel map, e.g. after the bot left it."""
+        self.channels.discard(guild_id)
+
+    def apply_settings_change(self, change: RowChange) -> None:
+        """Apply a pushed ``event_settings`` row change to the channel map."""
+        if change.type == "DELETE":
+            settings_id = change.old_record.get("id")
+            if settings_id is not None:
+                self.channels.discard_row(int(settings_id))
+            return
+        self.channels.set(EventSettings.from_dict(change.record))
+
+    async def load_channels(self) -> None:
+        """Bulk-load every event_settings row into the channel map."""
+        rows = await self.pool.fetch("SELECT id, guild_id, channel_id FROM event_settings")
+        self.channels.replace(settings_from_record(row) for row in rows)
+        logger.info("Loaded notification channels", count=len(self.channels))
+
+    async def reconcile_channels(self) -> bool:
+        """Reload the channel map if its checksum differs from the table's.
+
+        Returns whether the map was reloaded.
+        """
+        if self.channels.loaded:
+            remote = await self.pool.fetchrow(SETTINGS_CHECKSUM_SQL)
+            if (
+                remote["row_count"] == len(self.channels)
+                and remote["checksum"] == self.channels.checksum()
+            ):
+                return False
+            logger.info(
+                "Notification channels out of sync",
+                local=len(self.channels),
+                remote=remote["row_count"],
+            )
+        await self.load_channels()
+        return True
+
+    def _iter_by_start(
+        self,
+        where: str,
+        args: tuple[Any, ...],
+        page_size: int | None,
+        columns: Sequence[str] = EVENT_COLUMNS,
+    ) -> AsyncIterator[Event]:
+        """Page through ``where`` with a ``(start_at, id)`` keyset cursor."""
+        return self._iter_by_key(where, args, page_size, columns)
+
+    async def _iter_by_key(
+        self,
+        where: str,
+        args: tuple[Any, ...],
+        page_size: int | None,
+        columns: Sequence[str] = EVENT_COLUMNS,
+        key: str = "start_at",
+    ) -> AsyncIterator[Event]:
+        """Page through ``where`` with a ``(key, id)`` keyset cursor."""
+        page_size = page_size or self.page_size
+        n = len(args)
+        select = ", ".join(columns)
+        first_page = f"SELECT {select} FROM events WHERE {where} ORDER BY {key}, id LIMIT ${n + 1}"
+        next_page = (
+            f"SELECT {select} FROM events WHERE {where} "
+            f"AND ({key}, id) > (${n + 1}, ${n + 2}::uuid) "
+            f"ORDER BY {key}, id LIMIT ${n + 3}"
+        )
+
+        rows = await self.pool.fetch(first_page, *args, page_size)
+        while True:
+            for row in rows:
+                yield event_from_record(row)
+            if len(rows) < page_size:
+                return
+            last = rows[-1]
+            rows = await self.pool.fetch(next_page, *args, last[key], last["id"], page_size)
+
+
+class PostgresGuildService:
+    """GuildRepository backed by an asyncpg pool."""
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        config_cache: TTLCache[str, GuildConfig | None] | None = None,
+    ):
+        self.pool = pool
+        self.config_cache: TTLCache[str, GuildConfig | None] = config_cache or TTLCache()
+        self.flights = SingleFlight()
+
+    async def find_by_guild_id(self, guild_id: str) -> Guild | None:
+        """Find a guild by Discord guild ID."""
+
+        async def fetch() -> Guild | None:
+            row = await self.pool.fetchrow(
+                "SELECT id, guild_id, name, avatar_url, locale FROM guilds WHERE guild_id = $1",
+                guild_id,
+            )
+            return Guild.from_dict(dict(row)) if row else None
+
+        return await self.flights.do(("guilds.find_by_guild_id", guild_id), fetch)
+
+    async def find_all(self) -> list[GuildCreate]:
+        """Find the ID, name and avatar of every guild."""
+        rows = await self.pool.fetch("SELECT guild_id, name, avatar_url FROM guilds")
+        return [GuildCreate(**dict(row)) for row in rows]
+
+    async def create(self, data: GuildCreate) -> Guild:
+        """Create a new guild."""
+        row = await self.pool.fetchrow(
+            "INSERT INTO guilds (guild_id, name, avatar_url, locale) VALUES ($1, $2, $3, $4) "
+            "RETURNING id, guild_id, name, avatar_url, locale",
+            data.guild_id,
+            data.name,
+            data.avatar_url,
+            data.locale,
+        )
+        logger.info("Created guild", guild_id=data.guild_id, name=data.name)
+        return Guild.from_dict(dict(row))
+
+    async def upsert(self, data: GuildCreate) -> Guild:
+        """Create a guild, or update its name and avatar if it already exists."""
+        row = await self.pool.fetchrow(
+            "INSERT INTO guilds (guild_id, name, avatar_url) VALUES ($1, $2, $3) "
+            "ON CONFLICT (guild_id) DO UPDATE "
+            "SET name = EXCLUDED.name, avatar_url = EXCLUDED.avatar_url "
+            "RETURNING id, guild_id, name, avatar_url, locale",
+            data.guild_id,
+            data.name,
+            data.avatar_url,
+        )
+        logger.info("Upserted guild", guild_id=data.guild_id, name=data.name)
+        return Guild.from_dict(dict(row))
+
+    async def upsert_many(self, guilds: Iterable[GuildCreate]) -> None:
+        """Upsert guilds in one statement."""
+        rows = list(guilds)
+        if not rows:
+            return
+        await self.pool.execute(
+            "INSERT INTO guilds (guild_id, name, avatar_url) "
+            "SELECT * FROM unnest($1::varchar[], $2::varchar[], $3::varchar[]) "
+            "ON CONFLICT (guild_id) DO UPDATE "
+            "SET name = EXCLUDED.name, avatar_url = EXCLUDED.avatar_url",
+            [g.guild_id for g in rows],
+            [g.name for g in rows],
+            [g.avatar_url for g in rows],
+        )
+
+    async def update(self, guild_id: str, data: GuildCreate) -> Guild:
+        """Update a guild."""
+        row = await self.pool.fetchrow(
+            "UPDATE guilds SET name = $2, avatar_url = $3, locale = $4 WHERE guild_id = $1 "
+            "RETURNING id, guild_id, name, avatar_url, locale",
+            guild_id,
+            data.name,
+            data.avatar_url,
+            data.locale,
+        )
+        logger.info("Updated guild", guild_id=guild_id, name=data.name)
+        return Guild.from_dict(dict(row))
+
+    async def delete(self, guild_id: str) -> None:
+        """Delete a guild."""
+        await self.pool.execute("DELETE FROM guilds WHERE guild_id = $1", guild_id)
+        logger.info("Deleted guild", guild_id=guild_id)
+
+    async def delete_many(self, guild_ids: Iterable[str]) -> None:
+        """Delete guilds in one statement."""
+        ids = list(dict.fromkeys(guild_ids))
+        if ids:
+            await self.pool.execute("DELETE FROM guilds WHERE guild_id = ANY($1::varchar[])", ids)
+
+    async def get_config(self, guild_id: str) -> GuildConfig | None:
+        """Get guild configuration.
+
+        Results, including the absence of a row, are served from
+        ``config_cache`` until they expire or are invalidated. Concurrent
+        misses for the same guild share a single query.
+        """
+        cached = self.config_cache.get(guild_id)
+        if cached is not MISSING:
+            return cached
+
+        async def fetch() -> GuildConfig | None:
+            row = await self.pool.fetchrow(
+                "SELECT guild_id, restricted FROM guild_config WHERE guild_id = $1", guild_id
+            )
+            config = GuildConfig.from_dict(dict(row)) if row else None
+            self.config_cache.put(guild_id, config, version=version)
+            return config
+
+        # Callers after an invalidation start a new fetch instead of joining
+        version = self.config_cache.version(guild_id)
+        return await self.flights.do(("guild_config.get", guild_id, version), fetch)
+
+    def invalidate_config(self, guild_id: str) -> None:
+        """Drop a guild's cached configuration."""
+        self.config_cache.invalidate(guild_id)
+
+    async def upsert_config(self, guild_id: str, restricted: bool) -> GuildConfig:
+        """Create or update guild configuration."""
+        try:
+            row = await self.pool.fetchrow(
+                "INSERT INTO guild_config (guild_id, restricted) VALUES ($1, $2) "
+                "ON CONFLICT (guild_id) DO UPDATE SET restricted = EXCLUDED.restricted "
+                "RETURNING guild_id, restricted",
+                guild_id,
+                restricted,
+            )
+        finally:
+            self.invalidate_config(guild_id)
+        return GuildConfig.from_dict(dict(row))
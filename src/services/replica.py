@@ -0,0 +1,427 @@
+"""Local SQLite mirror of the tables the bot reads."""
+
+import json
+import sqlite3
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any, cast
+
+import structlog
+from supabase import Client
+
+from src.models import EVENT_COLUMNS, Event, EventSettings, GuildConfig
+from src.models.event import parse_timestamp
+from src.services.change_feed import RowChange
+from src.services.resilience import Resilience
+
+logger = structlog.get_logger()
+
+# Stored in UTC with a fixed width so text comparison orders by time
+_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    guild_id TEXT NOT NULL,
+    start_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    synced_at TEXT NOT NULL,
+    row TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_guild_start ON events (guild_id, start_at);
+CREATE INDEX IF NOT EXISTS events_start ON events (start_at);
+CREATE INDEX IF NOT EXISTS events_updated ON events (updated_at);
+CREATE TABLE IF NOT EXISTS event_settings (
+    guild_id TEXT PRIMARY KEY,
+    id INTEGER NOT NULL,
+    channel_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS guild_config (
+    guild_id TEXT PRIMARY KEY,
+    restricted INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    synced_at TEXT NOT NULL
+);
+"""
+
+# Supabase rows newer than the watermark may commit after it was taken and
+# the two clocks may disagree, so incremental syncs re-read a margin
+SYNC_OVERLAP = timedelta(minutes=1)
+
+# Rows per page when loading tables from Supabase
+DEFAULT_PAGE_SIZE = 1000
+
+
+def _format_time(value: str | datetime) -> str:
+    value = parse_timestamp(value)
+    if value.tzinfo is None:
+        # Naive timestamps are taken to be UTC
+        value = value.replace(tzinfo=UTC)
+    return value.astimezone(UTC).strftime(_TIME_FORMAT)
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.strptime(value, _TIME_FORMAT).replace(tzinfo=UTC)
+
+
+class LocalReplica:
+    """On-disk copy of ``events``, ``event_settings`` and ``guild_config``.
+
+    Reads are indexed SQLite queries on the event loop thread, so they cost
+    microseconds instead of a Supabase round trip. The replica only serves
+    reads once every table has been loaded; because it is kept on disk, a
+    restarted bot serves from it immediately while ReplicaSync catches up.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    @property
+    def loaded(self) -> bool:
+        """Whether every table has been loaded at least once."""
+        return self.synced_at("events") is not None and all(
+            self.synced_at(table) is not None for table in ("event_settings", "guild_config")
+        )
+
+    def synced_at(self, table: str) -> datetime | None:
+        """When ``table`` was last brought up to date, or None if never loaded."""
+        row = self._conn.execute(
+            "SELECT synced_at FROM sync_state WHERE name = ?", (table,)
+        ).fetchone()
+        return _parse_time(row[0]) if row else None
+
+    # Sync
+
+    def replace_events(self, rows: Iterable[dict[str, Any]], synced_at: datetime) -> None:
+        """Replace every event with ``rows`` fetched at ``synced_at``."""
+        with self._conn:
+            self._conn.execute("DELETE FROM events")
+            self._insert_events(rows, synced_at)
+            self._mark_synced("events", synced_at)
+
+    def upsert_events(
+        self, rows: Iterable[dict[str, Any]], synced_at: datetime | None = None
+    ) -> None:
+        """Insert or update events; ``synced_at`` also advances the events watermark."""
+        with self._conn:
+            self._insert_events(rows, synced_at or datetime.now(UTC))
+            if synced_at is not None:
+                self._mark_synced("events", synced_at)
+
+    def delete_events(self, event_ids: Iterable[str]) -> int:
+        """Delete events by ID. Returns the number removed."""
+        with self._conn:
+            cursor = self._conn.executemany(
+                "DELETE FROM events WHERE id = ?", [(event_id,) for event_id in event_ids]
+            )
+        return cursor.rowcount
+
+    def retain_events(self, event_ids: Iterable[str], synced_before: datetime) -> int:
+        """Delete events missing from ``event_ids`` that were synced before ``synced_before``.
+
+        Rows written after the remote ID list was taken are kept, so events
+        created meanwhile are not mistaken for deleted ones. Returns the
+        number removed.
+        """
+        keep = set(event_ids)
+        rows = self._conn.execute(
+            "SELECT id FROM events WHERE synced_at < ?", (_format_time(synced_before),)
+        ).fetchall()
+        return self.delete_events(event_id for (event_id,) in rows if event_id not in keep)
+
+    def replace_settings(self, settings: Iterable[EventSettings], synced_at: datetime) -> None:
+        """Replace every event_settings row."""
+        with self._conn:
+            self._conn.execute("DELETE FROM event_settings")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO event_settings (guild_id, id, channel_id) VALUES (?, ?, ?)",
+                [(s.guild_id, s.id, s.channel_id) for s in settings],
+            )
+            self._mark_synced("event_settings", synced_at)
+
+    def put_settings(self, settings: EventSettings) -> None:
+        """Insert or update a guild's event_settings row."""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO event_settings (guild_id, id, channel_id) VALUES (?, ?, ?)",
+                (settings.guild_id, settings.id, settings.channel_id),
+            )
+
+    def delete_settings(self, guild_id: str) -> None:
+        """Delete a guild's event_settings row."""
+        with self._conn:
+            self._conn.execute("DELETE FROM event_settings WHERE guild_id = ?", (guild_id,))
+
+    def delete_settings_row(self, settings_id: int) -> None:
+        """Delete an event_settings row by its primary key."""
+        with self._conn:
+            self._conn.execute("DELETE FROM event_settings WHERE id = ?", (settings_id,))
+
+    def replace_configs(self, configs: Iterable[GuildConfig], synced_at: datetime) -> None:
+        """Replace every guild_config row."""
+        with self._conn:
+            self._conn.execute("DELETE FROM guild_config")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO guild_config (guild_id, restricted) VALUES (?, ?)",
+                [(c.guild_id, c.restricted) for c in configs],
+            )
+            self._mark_synced("guild_config", synced_at)
+
+    def put_config(self, config: GuildConfig) -> None:
+        """Insert or update a guild's guild_config row."""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO guild_config (guild_id, restricted) VALUES (?, ?)",
+                (config.guild_id, config.restricted),
+            )
+
+    def delete_config(self, guild_id: str) -> None:
+        """Delete a guild's guild_config row."""
+        with self._conn:
+            self._conn.execute("DELETE FROM guild_config WHERE guild_id = ?", (guild_id,))
+
+    # Reads
+
+    def events_by_guild(self, guild_id: str, range_type: str, now: datetime) -> list[Event]:
+        """Events of a guild before (``"past"``), from (``"future"``) or around (``"all"``) ``now``."""
+        if range_type == "past":
+            where, args = "guild_id = ? AND start_at < ?", (guild_id, _format_time(now))
+        elif range_type == "future":
+            where, args = "guild_id = ? AND start_at >= ?", (guild_id, _format_time(now))
+        else:
+            where, args = "guild_id = ?", (guild_id,)
+        return self._select_events(where, args)
+
+    def events_starting_between(self, start: datetime, end: datetime | None = None) -> list[Event]:
+        """Events whose start_at is in ``[start, end)``, or from ``start`` if ``end`` is None."""
+        if end is None:
+            return self._select_events("start_at >= ?", (_format_time(start),))
+        return self._select_events(
+            "start_at >= ? AND start_at < ?", (_format_time(start), _format_time(end))
+        )
+
+    def events_updated_since(self, since: datetime) -> list[Event]:
+        """Events with ``updated_at >= since``, oldest change first."""
+        rows = self._conn.execute(
+            "SELECT row FROM events WHERE updated_at >= ? ORDER BY updated_at",
+            (_format_time(since),),
+        ).fetchall()
+        return [Event.from_dict(json.loads(row)) for (row,) in rows]
+
+    def event_versions_between(self, start: datetime, end: datetime) -> dict[str, datetime]:
+        """``id -> updated_at`` for events whose start_at is in ``[start, end)``."""
+        rows = self._conn.execute(
+            "SELECT id, updated_at FROM events WHERE start_at >= ? AND start_at < ?",
+            (_format_time(start), _format_time(end)),
+        ).fetchall()
+        return {event_id: _parse_time(updated_at) for event_id, updated_at in rows}
+
+    def events_by_ids(self, event_ids: Iterable[str]) -> list[Event]:
+        """Events by ID; unknown IDs are skipped."""
+        ids = list(dict.fromkeys(event_ids))
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        rows = self._conn.execute(
+            f"SELECT row FROM events WHERE id IN ({placeholders})", ids
+        ).fetchall()
+        return [Event.from_dict(json.loads(row)) for (row,) in rows]
+
+    def settings(self, guild_id: str) -> EventSettings | None:
+        """A guild's event settings."""
+        row = self._conn.execute(
+            "SELECT id, guild_id, channel_id FROM event_settings WHERE guild_id = ?", (guild_id,)
+        ).fetchone()
+        return EventSettings(id=row[0], guild_id=row[1], channel_id=row[2]) if row else None
+
+    def config(self, guild_id: str) -> GuildConfig | None:
+        """A guild's configuration."""
+        row = self._conn.execute(
+            "SELECT guild_id, restricted FROM guild_config WHERE guild_id = ?", (guild_id,)
+        ).fetchone()
+        return GuildConfig(guild_id=row[0], restricted=bool(row[1])) if row else None
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
+
+    def _select_events(self, where: str, args: tuple[str, ...]) -> list[Event]:
+        rows = self._conn.execute(
+            f"SELECT row FROM events WHERE {where} ORDER BY start_at, id", args
+        ).fetchall()
+        return [Event.from_dict(json.loads(row)) for (row,) in rows]
+
+    def _insert_events(self, rows: Iterable[dict[str, Any]], synced_at: datetime) -> None:
+        synced_at_text = _format_time(synced_at)
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO events (id, guild_id, start_at, updated_at, synced_at, row) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    row["id"],
+                    row["guild_id"],
+                    _format_time(row["start_at"]),
+                    _format_time(row["updated_at"]),
+                    synced_at_text,
+                    json.dumps(row),
+                )
+                for row in rows
+            ],
+        )
+
+    def _mark_synced(self, table: str, synced_at: datetime) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sync_state (name, synced_at) VALUES (?, ?)",
+            (table, _format_time(synced_at)),
+        )
+
+
+class ReplicaSync:
+    """Keeps a LocalReplica in step with Supabase.
+
+    ``sync`` bulk-loads every table the first time and afterwards fetches
+    only events updated since the last sync. Deletes are not visible to an
+    ``updated_at`` filter, so they arrive through ``apply_change`` from the
+    change feed and, as a backstop, through the periodic ``reconcile``,
+    which also reloads the two small tables that have no ``updated_at``.
+    """
+
+    def __init__(
+        self,
+        replica: LocalReplica,
+        supabase: Client,
+        resilience: Resilience,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ):
+        self.replica = replica
+        self.supabase = supabase
+        self.resilience = resilience
+        self.page_size = page_size
+
+    async def sync(self) -> None:
+        """Load the replica if it is empty, otherwise fetch recently updated events."""
+        if not self.replica.loaded:
+            await self.load()
+            return
+
+        watermark = self.replica.synced_at("events")
+        assert watermark is not None
+        started = datetime.now(UTC)
+        since = (watermark - SYNC_OVERLAP).isoformat()
+        rows = await self._fetch_all(
+            "events.replica_sync",
+            lambda: (
+                self.supabase.table("events")
+                .select(",".join(EVENT_COLUMNS))
+                .gte("updated_at", since)
+            ),
+            key="id",
+        )
+        self.replica.upsert_events(rows, synced_at=started)
+        if rows:
+            logger.debug("Synced local replica", events=len(rows))
+
+    async def load(self) -> None:
+        """Bulk-load every table."""
+        started = datetime.now(UTC)
+        events = await self._fetch_all(
+            "events.replica_load",
+            lambda: self.supabase.table("events").select(",".join(EVENT_COLUMNS)),
+            key="id",
+        )
+        settings = await self._fetch_settings()
+        configs = await self._fetch_configs()
+        self.replica.replace_events(events, started)
+        self.replica.replace_settings(settings, started)
+        self.replica.replace_configs(configs, started)
+        logger.info(
+            "Loaded local replica",
+            events=len(events),
+            settings=len(settings),
+            configs=len(configs),
+        )
+
+    async def reconcile(self) -> None:
+        """Drop events deleted in Supabase and reload settings and configs."""
+        if not self.replica.loaded:
+            return
+
+        started = datetime.now(UTC)
+        ids = await self._fetch_all(
+            "events.replica_ids", lambda: self.supabase.table("events").select("id"), key="id"
+        )
+        removed = self.replica.retain_events((row["id"] for row in ids), synced_before=started)
+        self.replica.replace_settings(await self._fetch_settings(), started)
+        self.replica.replace_configs(await self._fetch_configs(), started)
+        if removed:
+            logger.info("Removed deleted events from local replica", count=removed)
+
+    def apply_change(self, change: RowChange) -> None:
+        """Apply a pushed row change to the replica."""
+        if change.table == "events":
+            if change.type == "DELETE":
+                event_id = change.old_record.get("id")
+                if event_id is not None:
+                    self.replica.delete_events([str(event_id)])
+            else:
+                self.replica.upsert_events([change.record])
+        elif change.table == "event_settings":
+            if change.type == "DELETE":
+                settings_id = change.old_record.get("id")
+                if settings_id is not None:
+                    self.replica.delete_settings_row(int(settings_id))
+            else:
+                self.replica.put_settings(EventSettings.from_dict(change.record))
+        elif change.table == "guild_config":
+            if change.type == "DELETE":
+                guild_id = change.old_record.get("guild_id")
+                if guild_id is not None:
+                    self.replica.delete_config(str(guild_id))
+            else:
+                self.replica.put_config(GuildConfig.from_dict(change.record))
+
+    async def _fetch_settings(self) -> list[EventSettings]:
+        rows = await self._fetch_all(
+            "event_settings.replica_load",
+            lambda: self.supabase.table("event_settings").select("id,guild_id,channel_id"),
+            key="id",
+        )
+        return [EventSettings.from_dict(row) for row in rows]
+
+    async def _fetch_configs(self) -> list[GuildConfig]:
+        rows = await self._fetch_all(
+            "guild_config.replica_load",
+            lambda: self.supabase.table("guild_config").select("guild_id,restricted"),
+            key="guild_id",
+        )
+        return [GuildConfig.from_dict(row) for row in rows]
+
+    async def _fetch_all(
+        self, endpoint: str, build: Callable[[], Any], key: str
+    ) -> list[dict[str, Any]]:
+        """Fetch every row of ``build()`` in pages, with a keyset cursor on ``key``."""
+        rows: list[dict[str, Any]] = []
+        last: Any = None
+        while True:
+            query = build()
+            if last is not None:
+                query = query.gt(key, last)
+            query = query.order(key).limit(self.page_size)
+            response = await self.resilience.run(endpoint, query.execute)
+            page = cast(list[dict[str, Any]], response.data)
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows
+            last = page[-1][key]
@@ -0,0 +1,108 @@
+"""Storage interfaces implemented by each backend's services."""
+
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import datetime
+from typing import Protocol
+
+from src.models import (
+    EVENT_COLUMNS,
+    Event,
+    EventCreate,
+    EventSettings,
+    Guild,
+    GuildConfig,
+    GuildCreate,
+)
+from src.services.change_feed import RowChange
+
+
+class EventRepository(Protocol):
+    """Event and event settings storage used by commands and tasks."""
+
+    def iter_by_guild_id(
+        self, guild_id: str, range_type: str = "future", page_size: int | None = None
+    ) -> AsyncIterator[Event]: ...
+
+    def iter_future_events(
+        self, from_time: datetime, page_size: int | None = None
+    ) -> AsyncIterator[Event]: ...
+
+    def iter_events_starting_between(
+        self,
+        start: datetime,
+        end: datetime,
+        page_size: int | None = None,
+        columns: Sequence[str] = EVENT_COLUMNS,
+    ) -> AsyncIterator[Event]: ...
+
+    async def find_by_guild_id(self, guild_id: str, range_type: str = "future") -> list[Event]: ...
+
+    async def find_all_future_events(self, from_time: datetime) -> list[Event]: ...
+
+    async def find_events_starting_between(
+        self, start: datetime, end: datetime, columns: Sequence[str] = EVENT_COLUMNS
+    ) -> list[Event]: ...
+
+    async def find_events_updated_since(
+        self, since: datetime, columns: Sequence[str] = EVENT_COLUMNS
+    ) -> list[Event]: ...
+
+    async def find_event_versions_between(
+        self, start: datetime, end: datetime
+    ) -> dict[str, datetime]: ...
+
+    async def find_by_ids(
+        self, event_ids: Iterable[str], columns: Sequence[str] = EVENT_COLUMNS
+    ) -> list[Event]: ...
+
+    async def find_due_events(
+        self, now: datetime, columns: Sequence[str] = EVENT_COLUMNS
+    ) -> list[Event]: ...
+
+    async def advance_next_notify_at(self, event_ids: Iterable[str], after: datetime) -> None: ...
+
+    async def load_details(self, events: Iterable[Event]) -> dict[str, Event]: ...
+
+    async def create(self, data: EventCreate) -> Event: ...
+
+    async def get_settings(self, guild_id: str) -> EventSettings | None: ...
+
+    async def get_settings_many(self, guild_ids: Iterable[str]) -> dict[str, EventSettings]: ...
+
+    async def create_settings(self, guild_id: str, channel_id: str) -> EventSettings: ...
+
+    async def update_settings(self, guild_id: str, channel_id: str) -> EventSettings: ...
+
+    def forget_settings(self, guild_id: str) -> None: ...
+
+    def apply_settings_change(self, change: RowChange) -> None: ...
+
+    async def load_channels(self) -> None: ...
+
+    async def reconcile_channels(self) -> bool: ...
+
+
+class GuildRepository(Protocol):
+    """Guild and guild config storage used by commands and event handlers."""
+
+    async def find_by_guild_id(self, guild_id: str) -> Guild | None: ...
+
+    async def find_all(self) -> list[GuildCreate]: ...
+
+    async def create(self, data: GuildCreate) -> Guild: ...
+
+    async def upsert(self, data: GuildCreate) -> Guild: ...
+
+    async def upsert_many(self, guilds: Iterable[GuildCreate]) -> None: ...
+
+    async def update(self, guild_id: str, data: GuildCreate) -> Guild: ...
+
+    async def delete(self, guild_id: str) -> None: ...
+
+    async def delete_many(self, guild_ids: Iterable[str]) -> None: ...
+
+    async def get_config(self, guild_id: str) -> GuildConfig | None: ...
+
+    def invalidate_config(self, guild_id: str) -> None: ...
+
+    async def upsert_config(self, guild_id: str, restricted: bool) -> GuildConfig: ...
@@ -0,0 +1,219 @@
+"""Retries, circuit breaking and error metrics for Supabase calls."""
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+import httpx
+import structlog
+from postgrest.exceptions import APIError
+
+from src.services.executor import QueryExecutor
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+# SQLSTATEs worth retrying: serialization failure, deadlock, statement
+# timeout and admin shutdown. Class 08 (connection exception) is checked
+# by prefix.
+TRANSIENT_SQLSTATES = frozenset({"40001", "40P01", "57014", "57P01"})
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether ``error`` is likely to succeed on retry.
+
+    Timeouts and connection errors are transient, as are gateway 5xx
+    responses, PostgREST's ``PGRST00x`` database connection errors and a
+    few SQLSTATEs. Client errors such as a bad filter or a constraint
+    violation are not.
+    """
+    if isinstance(error, httpx.TransportError):
+        return True
+    if not isinstance(error, APIError):
+        return False
+    code = str(error.code or "")
+    if len(code) == 3 and code.isdigit():
+        # Non-JSON error body; postgrest-py puts the HTTP status in ``code``
+        return int(code) >= 500 or int(code) in (408, 429)
+    return code.startswith(("PGRST00", "08")) or code in TRANSIENT_SQLSTATES
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling Supabase while the circuit is open."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Jittered exponential backoff for idempotent reads."""
+
+    attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 2.0
+
+    def backoff(self, retry: int) -> float:
+        """Delay before retry number ``retry`` (0-based), with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+
+class CircuitBreaker:
+    """Fails fast after ``failure_threshold`` consecutive transient failures.
+
+    While open, calls are rejected until ``reset_timeout`` has passed. Then a
+    single probe call is let through (half-open): success closes the
+    circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """``"closed"``, ``"open"`` or ``"half_open"``."""
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or self._clock() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may be made now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self._probing or self._clock() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError("Supabase circuit is open")
+            self._probing = True
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Supabase circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release_probe(self) -> None:
+        """Let the next call probe again after the current probe was abandoned."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a transient failure, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    logger.warning("Supabase circuit opened", failures=self._failures)
+                self._opened_at = self._clock()
+                self._probing = False
+
+
+@dataclass(frozen=True)
+class EndpointStats:
+    """Call outcomes of one endpoint."""
+
+    calls: int
+    failures: int
+    retries: int
+    rejected: int
+
+    @property
+    def error_rate(self) -> float:
+        """Share of calls that ended in an error, including rejections."""
+        return (self.failures + self.rejected) / self.calls if self.calls else 0.0
+
+
+class Resilience:
+    """Runs Supabase calls on the executor with retries and a circuit breaker.
+
+    Idempotent calls (selects, updates, upserts, deletes) are retried on
+    transient failures with jittered backoff; inserts are attempted once.
+    All calls fail fast with CircuitOpenError while the breaker is open, so
+    they do not pile up on the executor while Supabase is down. Outcomes are
+    counted per ``endpoint`` label.
+    """
+
+    def __init__(
+        self,
+        executor: QueryExecutor,
+        retry: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        sleep: Callable[[float], Awaitable[object]] = asyncio.sleep,
+    ):
+        self.executor = executor
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self._sleep = sleep
+        # endpoint -> [calls, failures, retries, rejected]
+        self._stats: dict[str, list[int]] = {}
+
+    async def run(self, endpoint: str, fn: Callable[[], T], idempotent: bool = True) -> T:
+        """Run ``fn`` on the executor, retrying transient failures if ``idempotent``."""
+        return await self._call(endpoint, fn, self.retry.attempts if idempotent else 1)
+
+    def stats(self) -> dict[str, EndpointStats]:
+        """Get per-endpoint statistics."""
+        return {
+            endpoint: EndpointStats(
+                calls=calls, failures=failures, retries=retries, rejected=rejected
+            )
+            for endpoint, (calls, failures, retries, rejected) in self._stats.items()
+        }
+
+    async def _call(self, endpoint: str, fn: Callable[[], T], attempts: int) -> T:
+        counters = self._stats.setdefault(endpoint, [0, 0, 0, 0])
+        counters[0] += 1
+        retry = 0
+        while True:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                counters[3] += 1
+                raise
+            try:
+                result = await self.executor.run(fn)
+            except Exception as e:
+                if not is_transient(e):
+                    # Supabase answered; the request itself was wrong
+                    self.breaker.record_success()
+                    counters[1] += 1
+                    raise
+                self.breaker.record_failure()
+                if retry + 1 >= attempts:
+                    counters[1] += 1
+                    raise
+                counters[2] += 1
+                delay = self.retry.backoff(retry)
+                logger.warning(
+                    "Retrying Supabase call",
+                    endpoint=endpoint,
+                    retry=retry + 1,
+                    delay=round(delay, 3),
+                    error=str(e),
+                )
+                await self._sleep(delay)
+                retry += 1
+            except BaseException:
+                # Cancelled without an outcome; do not leave the breaker half-open
+                self.breaker.release_probe()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
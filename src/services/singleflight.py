@@ -0,0 +1,74 @@
+"""Coalescing of identical concurrent reads."""
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class FlightStats:
+    """Calls made for one key and how many of them actually executed."""
+
+    calls: int
+    executions: int
+
+    @property
+    def shared(self) -> int:
+        """Calls served by joining an in-flight execution."""
+        return self.calls - self.executions
+
+
+class SingleFlight:
+    """Runs at most one in-flight call per key; concurrent callers share its result.
+
+    The call runs in its own task, so a caller being cancelled does not
+    cancel the work other callers are waiting on. Per-key counters are kept
+    for the ``max_tracked_keys`` most recently used keys.
+    """
+
+    def __init__(self, max_tracked_keys: int = 1024):
+        self.max_tracked_keys = max_tracked_keys
+        self._inflight: dict[Hashable, asyncio.Task[Any]] = {}
+        self._stats: OrderedDict[Hashable, list[int]] = OrderedDict()
+
+    @property
+    def inflight(self) -> int:
+        """Number of keys with a call in flight."""
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await ``fn()``, or the in-flight call already running for ``key``."""
+        counters = self._count(key)
+        task = self._inflight.get(key)
+        if task is None:
+            counters[1] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[Hashable, FlightStats]:
+        """Get per-key statistics."""
+        return {
+            key: FlightStats(calls=calls, executions=executions)
+            for key, (calls, executions) in self._stats.items()
+        }
+
+    def _forget(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def _count(self, key: Hashable) -> list[int]:
+        counters = self._stats.get(key)
+        if counters is None:
+            counters = self._stats[key] = [0, 0]
+            while len(self._stats) > self.max_tracked_keys:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(key)
+        counters[0] += 1
+        return counters
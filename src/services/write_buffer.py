@@ -0,0 +1,114 @@
+"""Debounced write-behind buffer for guild metadata."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+import structlog
+
+from src.models import GuildCreate
+from src.services.repository import GuildRepository
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class WriteBufferStats:
+    """Snapshot of GuildWriteBuffer activity."""
+
+    pending: int
+    queued: int
+    written: int
+    flushes: int
+    failures: int
+    total_flush_time: float
+    last_flush_time: float
+
+    @property
+    def coalesced(self) -> int:
+        """Updates replaced by a newer one or discarded before being written."""
+        return self.queued - self.written - self.pending
+
+    @property
+    def average_flush_time(self) -> float:
+        """Average duration of a successful flush, in seconds."""
+        return self.total_flush_time / self.flushes if self.flushes else 0.0
+
+
+class GuildWriteBuffer:
+    """Collects guild name and icon changes and writes them in batches.
+
+    Updates are keyed by guild ID, so a burst of changes to one guild costs a
+    single row in the next flush. ``flush`` is called on an interval and on
+    shutdown. A failed flush keeps its rows for the next attempt unless they
+    have been superseded or discarded in the meantime.
+    """
+
+    def __init__(self, guilds: GuildRepository):
+        self.guilds = guilds
+        self._pending: dict[str, GuildCreate] = {}
+        # Guilds discarded while the current flush is in flight
+        self._discarded: set[str] = set()
+        self._lock = asyncio.Lock()
+        self._queued = 0
+        self._written = 0
+        self._flushes = 0
+        self._failures = 0
+        self._total_flush_time = 0.0
+        self._last_flush_time = 0.0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, data: GuildCreate) -> None:
+        """Queue the latest state of a guild, replacing any queued one."""
+        self._pending[data.guild_id] = data
+        self._queued += 1
+
+    async def discard(self, guild_id: str) -> None:
+        """Drop a queued update, e.g. because the guild was deleted.
+
+        Waits for an in-flight flush, so that a write issued afterwards is
+        ordered after it, and keeps that flush from re-queuing the guild if
+        it fails.
+        """
+        self._pending.pop(guild_id, None)
+        self._discarded.add(guild_id)
+        async with self._lock:
+            self._discarded.discard(guild_id)
+
+    async def flush(self) -> int:
+        """Write every queued update with one bulk upsert. Returns the rows written."""
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            self._discarded.clear()
+            started = time.perf_counter()
+            try:
+                await self.guilds.upsert_many(batch.values())
+            except Exception:
+                self._failures += 1
+                for guild_id, data in batch.items():
+                    if guild_id not in self._discarded:
+                        self._pending.setdefault(guild_id, data)
+                raise
+            elapsed = time.perf_counter() - started
+            self._written += len(batch)
+            self._flushes += 1
+            self._total_flush_time += elapsed
+            self._last_flush_time = elapsed
+            logger.debug("Flushed guild updates", count=len(batch), elapsed=round(elapsed, 3))
+            return len(batch)
+
+    def stats(self) -> WriteBufferStats:
+        """Get a snapshot of buffer statistics."""
+        return WriteBufferStats(
+            pending=len(self._pending),
+            queued=self._queued,
+            written=self._written,
+            flushes=self._flushes,
+            failures=self._failures,
+            total_flush_time=self._total_flush_time,
+            last_flush_time=self._last_flush_time,
+        )
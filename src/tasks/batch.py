@@ -0,0 +1,124 @@
+"""Columnar notification fire times for vectorized due checks.
+
+Requires the optional ``vector`` extra (``numpy``). Times are stored as
+int64 minutes since the Unix epoch, so finding every notification due in a
+minute is one comparison over the whole batch instead of per-event
+``astimezone`` and ``timedelta`` arithmetic.
+"""
+
+import math
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import numpy.typing as npt
+
+from src.models import Event, NotificationPayload
+from src.tasks.schedule import (
+    DUE_WINDOW,
+    DueNotification,
+    get_event_notifications,
+    get_notification_range,
+)
+
+MINUTES_PER_DAY = 24 * 60
+
+# All-day events are anchored at midnight JST, nine hours before midnight UTC
+JST_OFFSET_MINUTES = 9 * 60
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def epoch_minutes(value: datetime, is_all_day: bool = False) -> int:
+    """Minutes since the epoch of the time notifications are computed from.
+
+    Times are rounded up to the minute, which keeps due checks against a
+    minute-truncated ``now`` exact. All-day events use midnight JST of their
+    date, as ``get_notification_range`` does.
+    """
+    if is_all_day:
+        return (value.toordinal() - _EPOCH_ORDINAL) * MINUTES_PER_DAY - JST_OFFSET_MINUTES
+    return math.ceil(value.timestamp() / 60)
+
+
+class EventBatch:
+    """A fixed set of events with their notifications in flat arrays.
+
+    ``start`` and ``end`` hold one epoch minute per event and ``all_day`` the
+    all-day mask. Lead times are ragged: the notifications of event ``i`` are
+    ``leads[offsets[i]:offsets[i + 1]]`` with matching ``keys``, including
+    the implicit "at event start" notification. ``fire_at`` is precomputed
+    per notification.
+    """
+
+    def __init__(self, events: Iterable[Event]):
+        self.events = list(events)
+        self.notifications: list[NotificationPayload] = []
+        count = len(self.events)
+        start = np.empty(count, dtype=np.int64)
+        end = np.empty(count, dtype=np.int64)
+        all_day = np.empty(count, dtype=np.bool_)
+        counts = np.empty(count, dtype=np.int64)
+        for i, event in enumerate(self.events):
+            start[i] = epoch_minutes(event.start_at, event.is_all_day)
+            end[i] = epoch_minutes(event.end_at, event.is_all_day)
+            all_day[i] = event.is_all_day
+            notifications = get_event_notifications(event)
+            counts[i] = len(notifications)
+            self.notifications.extend(notifications)
+
+        self.start = start
+        self.end = end
+        self.all_day = all_day
+        self.offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+        self.leads = np.fromiter(
+            (n.minutes for n in self.notifications), dtype=np.int64, count=len(self.notifications)
+        )
+        self.keys = np.fromiter(
+            (n.key for n in self.notifications), dtype=np.int64, count=len(self.notifications)
+        )
+        self.event_index = np.repeat(np.arange(count, dtype=np.int64), counts)
+        self.fire_at = start[self.event_index] - self.leads
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def due_positions(self, now: datetime, grace: timedelta = DUE_WINDOW) -> npt.NDArray[np.int64]:
+        """Positions in ``notifications`` that are due at ``now``.
+
+        Matches ``NotificationSchedule.pop_due``: an entry is due once its
+        fire time is reached and until ``grace`` has passed. ``now`` is
+        expected to be truncated to the minute.
+        """
+        minute = epoch_minutes(now)
+        window = grace // timedelta(minutes=1)
+        return np.flatnonzero((self.fire_at <= minute) & (self.fire_at > minute - window))
+
+    def due_pairs(self, now: datetime, grace: timedelta = DUE_WINDOW) -> list[tuple[str, int]]:
+        """The ``(event_id, key)`` pairs due at ``now``."""
+        positions = self.due_positions(now, grace)
+        return [
+            (self.events[i].id, key)
+            for i, key in zip(
+                self.event_index[positions].tolist(), self.keys[positions].tolist(), strict=True
+            )
+        ]
+
+    def due(self, now: datetime, grace: timedelta = DUE_WINDOW) -> list[DueNotification]:
+        """Build DueNotifications for everything due at ``now``."""
+        due: list[DueNotification] = []
+        for position in self.due_positions(now, grace).tolist():
+            event = self.events[self.event_index[position]]
+            notification = self.notifications[position]
+            start, end = get_notification_range(event)
+            due.append(
+                DueNotification(
+                    event=event,
+                    notification=notification,
+                    fire_at=start - timedelta(minutes=notification.minutes),
+                    start=start,
+                    end=end,
+                )
+            )
+        return due
@@ -0,0 +1,110 @@
+"""Concurrent notification dispatch."""
+
+import asyncio
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+import structlog
+
+from src.utils.datetime import get_jst_now
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class DispatchJob:
+    """A message carrying ``size`` notifications to send to a channel.
+
+    ``send`` returns how many of the notifications were delivered.
+    """
+
+    channel_id: int
+    fire_at: datetime
+    send: Callable[[], Awaitable[int]]
+    size: int = 1
+
+
+@dataclass(frozen=True)
+class DispatchReport:
+    """Outcome of one dispatch round."""
+
+    sent: int
+    failed: int
+    messages: int
+    channels: int
+    elapsed: float
+    max_lateness: float
+
+    @property
+    def throughput(self) -> float:
+        """Notifications sent per second."""
+        return self.sent / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class NotificationDispatcher:
+    """Sends jobs with one queue per channel and a bounded worker pool.
+
+    Jobs for the same channel are sent in order by a single worker, so each
+    channel only ever has one request in flight on its Discord route bucket
+    and a slow or rate-limited channel does not hold up the others.
+    """
+
+    def __init__(self, max_workers: int = 16):
+        self.max_workers = max_workers
+        self.last_report: DispatchReport | None = None
+
+    async def dispatch(self, jobs: list[DispatchJob]) -> DispatchReport:
+        """Send all jobs and report throughput and lateness."""
+        queues: dict[int, list[DispatchJob]] = defaultdict(list)
+        for job in jobs:
+            queues[job.channel_id].append(job)
+
+        semaphore = asyncio.Semaphore(self.max_workers)
+        sent = failed = 0
+        max_lateness = 0.0
+
+        async def drain(queue: list[DispatchJob]) -> None:
+            nonlocal sent, failed, max_lateness
+            async with semaphore:
+                for job in queue:
+                    try:
+                        delivered = await job.send()
+                    except Exception as e:
+                        logger.error(
+                            "Notification dispatch failed",
+                            channel_id=job.channel_id,
+                            error=str(e),
+                        )
+                        delivered = 0
+                    sent += delivered
+                    failed += job.size - delivered
+                    lateness = (get_jst_now() - job.fire_at).total_seconds()
+                    max_lateness = max(max_lateness, lateness)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(drain(queue) for queue in queues.values()))
+        report = DispatchReport(
+            sent=sent,
+            failed=failed,
+            messages=len(jobs),
+            channels=len(queues),
+            elapsed=time.perf_counter() - started,
+            max_lateness=max_lateness,
+        )
+        self.last_report = report
+
+        if jobs:
+            logger.info(
+                "Dispatched notifications",
+                sent=report.sent,
+                failed=report.failed,
+                messages=report.messages,
+                channels=report.channels,
+                elapsed_seconds=round(report.elapsed, 3),
+                per_second=round(report.throughput, 1),
+                max_lateness_seconds=round(report.max_lateness, 3),
+            )
+        return report
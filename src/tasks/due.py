@@ -0,0 +1,46 @@
+"""Due notifications read through the precomputed ``next_notify_at`` column."""
+
+from datetime import datetime, timedelta
+
+import structlog
+
+from src.models import SCHEDULE_COLUMNS
+from src.services import EventRepository
+from src.tasks.schedule import DUE_WINDOW, DueNotification, get_due_notifications
+
+logger = structlog.get_logger()
+
+
+class DueEventQuery:
+    """Finds due notifications with one indexed query per tick.
+
+    Replaces the in-memory schedule when the ``next_notify_at`` migration
+    has been applied (NOTIFY_NEXT_AT). ``pop_due`` returns what is due
+    within ``grace`` of the fetched events; once they have been delivered,
+    ``advance`` moves every fetched event to its next fire time, including
+    events whose notifications were too late or had nowhere to go.
+    """
+
+    def __init__(self, event_service: EventRepository, grace: timedelta = DUE_WINDOW):
+        self.event_service = event_service
+        self.grace = grace
+        self._fetched: list[str] = []
+
+    async def pop_due(self, now: datetime, grace: timedelta | None = None) -> list[DueNotification]:
+        """Fetch the events whose next notification is due at ``now``.
+
+        ``grace`` narrows the catch-up window of this tick, defaulting to the
+        query's own.
+        """
+        grace = self.grace if grace is None else min(grace, self.grace)
+        events = await self.event_service.find_due_events(now, columns=SCHEDULE_COLUMNS)
+        self._fetched = [event.id for event in events]
+        return [due for event in events for due in get_due_notifications(event, now, grace)]
+
+    async def advance(self, now: datetime) -> None:
+        """Move the events fetched by the last ``pop_due`` past ``now``."""
+        if not self._fetched:
+            return
+        fetched, self._fetched = self._fetched, []
+        await self.event_service.advance_next_notify_at(fetched, now)
+        logger.debug("Advanced next notification times", count=len(fetched))
@@ -0,0 +1,111 @@
+"""Durable record of delivered notifications."""
+
+import sqlite3
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from pathlib import Path
+
+from src.tasks.schedule import DueNotification
+
+# Stored in UTC with a fixed width so text comparison orders by time
+_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS deliveries (
+    event_id TEXT NOT NULL,
+    key INTEGER NOT NULL,
+    fire_at TEXT NOT NULL,
+    delivered_at TEXT NOT NULL,
+    PRIMARY KEY (event_id, key, fire_at)
+);
+CREATE INDEX IF NOT EXISTS deliveries_fire_at ON deliveries (fire_at);
+CREATE TABLE IF NOT EXISTS last_tick (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    at TEXT NOT NULL
+);
+"""
+
+DeliveryKey = tuple[str, int, str]
+
+
+def _format_time(value: datetime) -> str:
+    return value.astimezone(UTC).strftime(_TIME_FORMAT)
+
+
+def delivery_key(due: DueNotification) -> DeliveryKey:
+    """Identify a notification occurrence by ``(event_id, key, fire_at)``."""
+    return (due.event.id, due.notification.key, _format_time(due.fire_at))
+
+
+class DeliveryLedger:
+    """SQLite table of delivered ``(event_id, notification key, fire_at)`` tuples.
+
+    Lets the scheduler catch up on notifications it missed while stopped or
+    stalled without resending the ones that already went out. Rows are only
+    needed while their fire time is within the catch-up grace window, so the
+    table stays small and the synchronous queries are sub-millisecond.
+
+    The time of the last finished tick is kept too, so that only minutes
+    the loop actually missed are caught up.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM deliveries").fetchone()[0]
+
+    def exclude_delivered(self, dues: list[DueNotification]) -> list[DueNotification]:
+        """Drop the notifications that were already delivered."""
+        if not dues:
+            return []
+        fire_times = sorted({_format_time(due.fire_at) for due in dues})
+        placeholders = ",".join("?" * len(fire_times))
+        rows = self._conn.execute(
+            f"SELECT event_id, key, fire_at FROM deliveries WHERE fire_at IN ({placeholders})",
+            fire_times,
+        ).fetchall()
+        delivered = set(rows)
+        return [due for due in dues if delivery_key(due) not in delivered]
+
+    def record(self, dues: Iterable[DueNotification], delivered_at: datetime | None = None) -> None:
+        """Mark notifications as delivered."""
+        delivered_at_text = _format_time(delivered_at or datetime.now(UTC))
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO deliveries (event_id, key, fire_at, delivered_at) "
+            "VALUES (?, ?, ?, ?)",
+            [(*delivery_key(due), delivered_at_text) for due in dues],
+        )
+        self._conn.commit()
+
+    def last_tick(self) -> datetime | None:
+        """The time of the last finished tick, if any."""
+        row = self._conn.execute("SELECT at FROM last_tick WHERE id = 0").fetchone()
+        return datetime.strptime(row[0], _TIME_FORMAT).replace(tzinfo=UTC) if row else None
+
+    def record_tick(self, at: datetime) -> None:
+        """Remember ``at`` as the last finished tick."""
+        self._conn.execute(
+            "INSERT INTO last_tick (id, at) VALUES (0, ?) "
+            "ON CONFLICT (id) DO UPDATE SET at = excluded.at",
+            (_format_time(at),),
+        )
+        self._conn.commit()
+
+    def prune(self, before: datetime) -> int:
+        """Forget deliveries that fired before ``before``. Returns the number removed."""
+        cursor = self._conn.execute(
+            "DELETE FROM deliveries WHERE fire_at < ?", (_format_time(before),)
+        )
+        self._conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
@@ -0,0 +1,192 @@
+"""Sliding-horizon loader for the notification schedule."""
+
+from datetime import UTC, datetime, timedelta
+
+import structlog
+
+from src.models import SCHEDULE_COLUMNS, Event
+from src.services import EventService
+from src.services.change_feed import ChangeFeed, RowChange
+from src.tasks.schedule import DUE_WINDOW, NotificationSchedule
+
+logger = structlog.get_logger()
+
+# All-day events are anchored at midnight JST of their (UTC) start date, which
+# can be up to ~33 hours before start_at, so the fetch window reaches further.
+ALL_DAY_SLACK = timedelta(days=2)
+
+# Change syncs re-read this much before the watermark to tolerate clock skew
+# and transactions that commit after a later updated_at was already seen.
+WATERMARK_OVERLAP = timedelta(minutes=2)
+
+
+class ScheduleLoader:
+    """Keeps a NotificationSchedule filled with events that can fire soon.
+
+    Only events starting within ``lookahead`` of now are loaded, and only
+    their SCHEDULE_COLUMNS; details are fetched when a notification fires.
+    After the initial load, each tick fetches the slice of time that entered
+    the horizon plus the rows whose ``updated_at`` passed the watermark. Every
+    ``reconcile_interval`` the ``(id, updated_at)`` pairs of the window are
+    compared against the schedule to detect hard deletes.
+
+    While ``change_feed`` is connected, changes are pushed through
+    ``apply_change`` and the watermark poll is skipped. The tick on which
+    the feed (re)connects still polls from the old watermark, covering rows
+    written before the subscription was established.
+
+    The window starts ``grace`` before now so that notifications missed
+    during a restart or stall can still be caught up.
+    """
+
+    def __init__(
+        self,
+        event_service: EventService,
+        schedule: NotificationSchedule,
+        lookahead: timedelta = timedelta(days=7),
+        reconcile_interval: timedelta = timedelta(minutes=10),
+        change_feed: ChangeFeed | None = None,
+        grace: timedelta = timedelta(0),
+    ):
+        self.event_service = event_service
+        self.schedule = schedule
+        self.lookahead = lookahead
+        self.reconcile_interval = reconcile_interval
+        self.change_feed = change_feed
+        self.grace = grace
+        self.loaded_until: datetime | None = None
+        self.watermark: datetime | None = None
+        self.last_reconcile_at: datetime | None = None
+        # Whether the feed was connected when the watermark was last polled
+        self.feed_was_connected = False
+
+    def window_start(self, now: datetime) -> datetime:
+        """Earliest start_at that can still produce a notification due at ``now``."""
+        return now - self.grace
+
+    def horizon(self, now: datetime) -> datetime:
+        """Latest start_at that can produce a notification due at ``now``."""
+        return now + self.lookahead + DUE_WINDOW + ALL_DAY_SLACK
+
+    async def advance(self, now: datetime) -> None:
+        """Bring the schedule up to date for ``now``."""
+        horizon = self.horizon(now)
+
+        feed_connected = self.change_feed is not None and self.change_feed.connected
+        if self.loaded_until is None or self.watermark is None:
+            await self._load_window(now, horizon)
+        else:
+            if feed_connected and self.feed_was_connected:
+                # Changes are being pushed; keep the watermark current for fallback
+                self.watermark = datetime.now(UTC)
+            else:
+                await self._sync_changes(self.watermark, now, horizon)
+            if horizon > self.loaded_until:
+                await self._load_slice(self.loaded_until, horizon)
+            if (
+                self.last_reconcile_at is None
+                or now - self.last_reconcile_at >= self.reconcile_interval
+            ):
+                await self._reconcile(now, horizon)
+
+        self.loaded_until = horizon
+        self.feed_was_connected = feed_connected
+
+    def apply_change(self, change: RowChange, now: datetime) -> None:
+        """Apply a pushed change of the ``events`` table to the schedule."""
+        if self.loaded_until is None:
+            # Not loaded yet; the initial window load will include the change
+            return
+
+        if change.type == "DELETE":
+            event_id = change.old_record.get("id")
+            if event_id is not None:
+                self.schedule.remove(event_id)
+            return
+
+        event = Event.from_dict(change.record)
+        if self.window_start(now) <= event.start_at < self.loaded_until:
+            self.schedule.merge([event])
+        else:
+            self.schedule.remove(event.id)
+
+    async def _load_window(self, now: datetime, horizon: datetime) -> None:
+        """Replace the schedule with every event in the window."""
+        synced_at = datetime.now(UTC)
+        events = await self.event_service.find_events_starting_between(
+            self.window_start(now), horizon, columns=SCHEDULE_COLUMNS
+        )
+        self.schedule.sync(events)
+        self.watermark = synced_at
+        self.last_reconcile_at = now
+        logger.info("Loaded notification window", fetched=len(events), count=len(self.schedule))
+
+    async def _load_slice(self, start: datetime, end: datetime) -> None:
+        """Add events that entered the horizon."""
+        events = await self.event_service.find_events_starting_between(
+            start, end, columns=SCHEDULE_COLUMNS
+        )
+        added, updated = self.schedule.merge(events)
+        logger.debug(
+            "Loaded notification horizon slice",
+            fetched=len(events),
+            added=added,
+            updated=updated,
+        )
+
+    async def _sync_changes(self, watermark: datetime, now: datetime, horizon: datetime) -> None:
+        """Apply rows changed since ``watermark`` to the schedule."""
+        synced_at = datetime.now(UTC)
+        changed = await self.event_service.find_events_updated_since(
+            watermark - WATERMARK_OVERLAP, columns=SCHEDULE_COLUMNS
+        )
+
+        start = self.window_start(now)
+        in_window = [event for event in changed if start <= event.start_at < horizon]
+        added, updated = self.schedule.merge(in_window)
+
+        # Events moved outside the window no longer belong in the schedule
+        moved_out = [
+            event.id
+            for event in changed
+            if not start <= event.start_at < horizon and event.id in self.schedule
+        ]
+        for event_id in moved_out:
+            self.schedule.remove(event_id)
+
+        self.watermark = synced_at
+        if added or updated or moved_out:
+            logger.debug(
+                "Synced changed events",
+                fetched=len(changed),
+                added=added,
+                updated=updated,
+                removed=len(moved_out),
+            )
+
+    async def _reconcile(self, now: datetime, horizon: datetime) -> None:
+        """Compare ``(id, updated_at)`` of the window with the schedule."""
+        remote = await self.event_service.find_event_versions_between(
+            self.window_start(now), horizon
+        )
+        local = self.schedule.versions()
+
+        gone = [event_id for event_id in local if event_id not in remote]
+        for event_id in gone:
+            self.schedule.remove(event_id)
+
+        stale = [
+            event_id for event_id, updated_at in remote.items() if local.get(event_id) != updated_at
+        ]
+        refreshed = (
+            await self.event_service.find_by_ids(stale, columns=SCHEDULE_COLUMNS) if stale else []
+        )
+        self.schedule.merge(refreshed)
+
+        self.last_reconcile_at = now
+        logger.debug(
+            "Reconciled notification schedule",
+            remote=len(remote),
+            removed=len(gone),
+            refreshed=len(refreshed),
+        )
@@ -0,0 +1,73 @@
+"""Periodic logging of connection pool and executor statistics."""
+
+from dataclasses import asdict
+from typing import TYPE_CHECKING
+
+import structlog
+from discord.ext import commands, tasks
+
+if TYPE_CHECKING:
+    from src.bot import DisCalendarBot
+
+logger = structlog.get_logger()
+
+
+class MetricsTask(commands.Cog):
+    """Cog that logs pool statistics for monitoring."""
+
+    def __init__(self, bot: "DisCalendarBot"):
+        self.bot = bot
+        interval = bot.config.metrics_interval_seconds
+        if interval > 0:
+            self.metrics_loop.change_interval(seconds=interval)
+            self.metrics_loop.start()
+
+    async def cog_unload(self) -> None:
+        """Called when cog is unloaded."""
+        self.metrics_loop.cancel()
+
+    @tasks.loop(seconds=60)
+    async def metrics_loop(self) -> None:
+        """Log a snapshot of pool statistics."""
+        self.log_stats()
+
+    def log_stats(self) -> None:
+        """Log pool, write buffer, per-endpoint error and response size statistics."""
+        http = self.bot.http_pool.stats()
+        executor = self.bot.query_executor.stats()
+        logger.info(
+            "Pool statistics",
+            http_pool={**asdict(http), "active": http.active},
+            query_executor={**asdict(executor), "average_wait": executor.average_wait},
+        )
+        writes = self.bot.guild_writes.stats()
+        if writes.queued:
+            logger.info(
+                "Guild write buffer statistics",
+                guild_writes={
+                    **asdict(writes),
+                    "coalesced": writes.coalesced,
+                    "average_flush_time": writes.average_flush_time,
+                },
+            )
+        endpoints = self.bot.resilience.stats()
+        if endpoints:
+            logger.info(
+                "Supabase endpoint statistics",
+                circuit=self.bot.resilience.breaker.state,
+                endpoints={
+                    name: {**asdict(stats), "error_rate": stats.error_rate}
+                    for name, stats in endpoints.items()
+                },
+            )
+        responses = self.bot.http_pool.response_stats()
+        if responses:
+            logger.info(
+                "Response sizes",
+                queries={key: asdict(stats) for key, stats in responses.items()},
+            )
+
+
+async def setup(bot: "DisCalendarBot") -> None:
+    """Setup function for loading the cog."""
+    await bot.add_cog(MetricsTask(bot))
@@ -1,13 +1,26 @@
 """Notification task for sending event reminders."""
 
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
 import discord
 import structlog
 from discord.ext import commands, tasks
 
-from src.models import Event, NotificationPayload
+from src.models import EventSettings, NotificationPayload
+from src.services.change_feed import RowChange
+from src.tasks.dispatch import DispatchJob, NotificationDispatcher
+from src.tasks.due import DueEventQuery
+from src.tasks.ledger import DeliveryLedger
+from src.tasks.loader import ScheduleLoader
+from src.tasks.schedule import (
+    DUE_WINDOW,
+    EVENT_START_KEY,
+    DueNotification,
+    NotificationSchedule,
+)
 from src.utils.embeds import create_notification_embed
 
 if TYPE_CHECKING:
@@ -18,17 +31,66 @@ logger = structlog.get_logger()
 # JST timezone
 JST = timezone(timedelta(hours=9))
 
+# Discord message limits
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_TOTAL_LENGTH = 6000
+MAX_CONTENT_LENGTH = 2000
+
 
 class NotifyTask(commands.Cog):
     """Cog for sending event notifications."""
 
     def __init__(self, bot: "DisCalendarBot"):
         self.bot = bot
+        self.grace = max(timedelta(minutes=bot.config.notify_grace_minutes), DUE_WINDOW)
+        self.schedule = NotificationSchedule()
+        self.ledger = DeliveryLedger(bot.config.notify_ledger_path)
+        self.loader = ScheduleLoader(
+            bot.event_service,
+            self.schedule,
+            lookahead=timedelta(days=bot.config.notify_lookahead_days),
+            reconcile_interval=timedelta(minutes=bot.config.notify_reconcile_minutes),
+            change_feed=bot.change_feed,
+            grace=self.grace,
+        )
+        # With the next_notify_at column, each tick queries due rows instead
+        self.due_query = (
+            DueEventQuery(bot.event_service, self.grace) if bot.config.notify_next_at else None
+        )
+        self.dispatcher = NotificationDispatcher(max_workers=bot.config.notify_max_concurrency)
         self.notify_loop.start()
+        self.channel_sync_loop.change_interval(minutes=bot.config.notify_reconcile_minutes)
+        self.channel_sync_loop.start()
 
     async def cog_unload(self) -> None:
         """Called when cog is unloaded."""
         self.notify_loop.cancel()
+        self.channel_sync_loop.cancel()
+        self.ledger.close()
+
+    @commands.Cog.listener()
+    async def on_events_change(self, change: RowChange) -> None:
+        """Apply an ``events`` row change pushed by the change feed."""
+        jst_now = datetime.now(JST).replace(second=0, microsecond=0)
+        self.loader.apply_change(change, jst_now)
+
+    @commands.Cog.listener()
+    async def on_event_settings_change(self, change: RowChange) -> None:
+        """Apply an ``event_settings`` row change pushed by the change feed."""
+        self.bot.event_service.apply_settings_change(change)
+
+    @tasks.loop(minutes=10)
+    async def channel_sync_loop(self) -> None:
+        """Load the notification channel map, then keep it in sync with the table."""
+        try:
+            await self.bot.event_service.reconcile_channels()
+        except Exception as e:
+            logger.warning("Failed to sync notification channels", error=str(e))
+
+    @channel_sync_loop.before_loop
+    async def before_channel_sync_loop(self) -> None:
+        """Wait for bot to be ready before starting loop."""
+        await self.bot.wait_until_ready()
 
     @tasks.loop(seconds=60)
     async def notify_loop(self) -> None:
@@ -44,103 +106,218 @@ class NotifyTask(commands.Cog):
         """Process all pending notifications."""
         # Get current time in JST (zero out seconds)
         jst_now = datetime.now(JST).replace(second=0, microsecond=0)
+        window = self._catch_up_window(jst_now)
 
-        # Fetch all future events
-        events = await self.bot.event_service.find_all_future_events(jst_now)
-        logger.debug("Fetched events for notification", count=len(events))
+        if self.due_query is not None:
+            try:
+                due = await self.due_query.pop_due(jst_now, window)
+            except Exception as e:
+                logger.warning("Failed to query due notifications", error=str(e))
+                return
+        else:
+            # Load events that entered the notification horizon since the last
+            # tick. If Supabase is unavailable, keep notifying from the loaded
+            # schedule.
+            try:
+                await self.loader.advance(jst_now)
+            except Exception as e:
+                logger.warning("Failed to refresh notification schedule", error=str(e))
+            due = self.schedule.pop_due(jst_now, window)
 
-        for event in events:
-            await self._check_event_notifications(event, jst_now)
+        # Catch up on the minutes missed since the last tick, skipping what
+        # was already delivered before a restart or by an earlier tick
+        self.ledger.prune(jst_now - self.grace)
+        await self._deliver(self.ledger.exclude_delivered(due))
+        self.ledger.record_tick(jst_now)
 
-    async def _check_event_notifications(
-        self, event: Event, jst_now: datetime
-    ) -> None:
-        """Check and send notifications for a single event."""
-        # Get notification settings
-        settings = await self.bot.event_service.get_settings(event.guild_id)
-        if not settings:
-            return
+        if self.due_query is not None:
+            try:
+                await self.due_query.advance(jst_now)
+            except Exception as e:
+                # The rows are fetched again next tick; the ledger skips repeats
+                logger.warning("Failed to advance next notification times", error=str(e))
 
-        # Get channel
-        channel = self.bot.get_channel(int(settings.channel_id))
-        if not channel or not isinstance(channel, discord.TextChannel):
+    def _catch_up_window(self, now: datetime) -> timedelta:
+        """How far before ``now`` this tick delivers notifications.
+
+        Only the minutes after the last finished tick are caught up, up to
+        ``grace``. Without a recorded tick only ``now`` itself is due, so an
+        event created after one of its reminder times does not get that
+        reminder late.
+        """
+        last_tick = self.ledger.last_tick()
+        if last_tick is None:
+            return DUE_WINDOW
+        return min(max(now - last_tick, DUE_WINDOW), self.grace)
+
+    async def _deliver(self, due_notifications: list[DueNotification]) -> None:
+        """Render due notifications and send them to their guilds' channels."""
+        if not due_notifications:
             return
 
-        # Build notification list (including "at event time" notification)
-        notifications = list(event.notifications)
-        notifications.append(NotificationPayload(key=-1, num=0, ty="分前"))
-        notifications.sort(key=lambda n: n.key)
+        # Resolve settings for every guild with due notifications in one query
+        settings_by_guild = await self.bot.event_service.get_settings_many(
+            due.event.guild_id for due in due_notifications
+        )
+        due_notifications = [
+            due for due in due_notifications if due.event.guild_id in settings_by_guild
+        ]
 
-        # Determine start time (for all-day events, use midnight)
-        if event.is_all_day:
-            start = event.start_at.replace(
-                hour=0, minute=0, second=0, microsecond=0, tzinfo=JST
-            )
-            end = event.end_at.replace(
-                hour=0, minute=0, second=0, microsecond=0, tzinfo=JST
+        # The schedule holds partial events; load names and descriptions only
+        # for the events that are actually firing
+        events = await self.bot.event_service.load_details(due.event for due in due_notifications)
+        due_notifications = [
+            replace(due, event=events[due.event.id])
+            for due in due_notifications
+            if due.event.id in events
+        ]
+
+        # Group by channel so each channel gets as few messages as possible
+        by_channel: dict[int, tuple[discord.TextChannel, list[RenderedNotification]]] = {}
+        for due in due_notifications:
+            channel = self._get_notification_channel(settings_by_guild[due.event.guild_id])
+            if channel is None:
+                continue
+            label = get_notification_label(due.notification)
+            rendered = RenderedNotification(
+                due=due, label=label, embed=create_notification_embed(due.event, label)
             )
-        else:
-            start = event.start_at.astimezone(JST)
-            end = event.end_at.astimezone(JST)
-
-        for notification in notifications:
-            # Calculate notification time
-            offset_minutes = notification.to_minutes()
-            notify_time = start - timedelta(minutes=offset_minutes)
-
-            # Check if this is within the current minute
-            time_diff = jst_now - notify_time
-            if timedelta(0) <= time_diff < timedelta(minutes=1):
-                await self._send_notification(
-                    channel, event, notification, start, end
-                )
-
-    async def _send_notification(
-        self,
-        channel: discord.TextChannel,
-        event: Event,
-        notification: NotificationPayload,
-        start: datetime,
-        end: datetime,
-    ) -> None:
-        """Send a notification message."""
-        # Build notification label
-        if notification.key == -1:
-            label = "以下の予定が開催されます"
-        else:
-            time_label = notification.ty.replace("前", "後")
-            label = f"{notification.num}{time_label}に以下の予定が開催されます"
+            by_channel.setdefault(channel.id, (channel, []))[1].append(rendered)
+
+        jobs = [
+            self._build_job(channel, batch)
+            for channel, rendered in by_channel.values()
+            for batch in batch_for_message(rendered)
+        ]
+        await self.dispatcher.dispatch(jobs)
+
+    def _get_notification_channel(self, settings: EventSettings) -> discord.TextChannel | None:
+        """Get the guild's notification channel if it is a reachable text channel."""
+        channel = self.bot.get_channel(int(settings.channel_id))
+        if not channel or not isinstance(channel, discord.TextChannel):
+            return None
+        return channel
 
-        embed = create_notification_embed(event, label)
+    def _build_job(
+        self, channel: discord.TextChannel, batch: list["RenderedNotification"]
+    ) -> DispatchJob:
+        """Build a dispatch job sending a batch of notifications as one message."""
+        return DispatchJob(
+            channel_id=channel.id,
+            fire_at=min(item.due.fire_at for item in batch),
+            send=lambda: self._send_notifications(channel, batch),
+            size=len(batch),
+        )
 
+    async def _send_notifications(
+        self, channel: discord.TextChannel, batch: list["RenderedNotification"]
+    ) -> int:
+        """Send a batch of notifications to a channel as a single message.
+
+        Falls back to plain text (split at Discord's content limit) if the
+        embeds are rejected. Returns the number of notifications delivered.
+        """
         try:
-            await channel.send(embed=embed)
+            await channel.send(embeds=[item.embed for item in batch])
+            self.ledger.record(item.due for item in batch)
             logger.info(
-                "Sent notification",
-                event_name=event.name,
-                guild_id=event.guild_id,
-                notification=str(notification),
+                "Sent notifications",
+                channel_id=channel.id,
+                count=len(batch),
+                events=[item.due.event.name for item in batch],
             )
+            return len(batch)
         except discord.Forbidden:
             logger.warning(
                 "Cannot send notification - no permission",
                 channel_id=channel.id,
-                guild_id=event.guild_id,
+                guild_id=batch[0].due.event.guild_id,
             )
+            return 0
         except discord.HTTPException as e:
             # Fallback to plain text if embed fails
             logger.warning("Embed failed, trying plain text", error=str(e))
             try:
-                content = (
-                    f"**🔔** {label}\n\n"
-                    f"**{event.name}**\n"
-                    f"{event.description or ''}\n\n"
-                    f"**日時**: {start.strftime('%Y/%m/%d %H:%M')} - "
-                    f"{end.strftime('%H:%M') if start.date() == end.date() else end.strftime('%Y/%m/%d %H:%M')}"
-                )
-                await channel.send(content)
+                blocks = [format_plain_text_notification(item) for item in batch]
+                for content in join_within_limit(blocks, MAX_CONTENT_LENGTH):
+                    await channel.send(content)
+                self.ledger.record(item.due for item in batch)
+                return len(batch)
             except Exception as e2:
                 logger.error("Failed to send notification", error=str(e2))
+                return 0
+
+
+@dataclass(frozen=True)
+class RenderedNotification:
+    """A due notification with its label and embed."""
+
+    due: DueNotification
+    label: str
+    embed: discord.Embed
+
+
+@lru_cache(maxsize=256)
+def get_notification_label(notification: NotificationPayload) -> str:
+    """Build the author line of a notification embed."""
+    if notification.key == EVENT_START_KEY:
+        return "以下の予定が開催されます"
+    time_label = notification.ty.replace("前", "後")
+    return f"{notification.num}{time_label}に以下の予定が開催されます"
+
+
+def format_plain_text_notification(item: RenderedNotification) -> str:
+    """Format a notification as plain text for when embeds cannot be sent."""
+    start, end = item.due.start, item.due.end
+    event = item.due.event
+    return (
+        f"**🔔** {item.label}\n\n"
+        f"**{event.name}**\n"
+        f"{event.description or ''}\n\n"
+        f"**日時**: {start.strftime('%Y/%m/%d %H:%M')} - "
+        f"{end.strftime('%H:%M') if start.date() == end.date() else end.strftime('%Y/%m/%d %H:%M')}"
+    )
+
+
+def batch_for_message(items: list[RenderedNotification]) -> list[list[RenderedNotification]]:
+    """Split notifications into batches that fit in one message.
+
+    A message holds at most 10 embeds totalling at most 6000 characters.
+    """
+    batches: list[list[RenderedNotification]] = []
+    current: list[RenderedNotification] = []
+    current_length = 0
+    for item in items:
+        length = len(item.embed)
+        if current and (
+            len(current) >= MAX_EMBEDS_PER_MESSAGE
+            or current_length + length > MAX_EMBED_TOTAL_LENGTH
+        ):
+            batches.append(current)
+            current, current_length = [], 0
+        current.append(item)
+        current_length += length
+    if current:
+        batches.append(current)
+    return batches
+
+
+def join_within_limit(blocks: list[str], limit: int) -> list[str]:
+    """Join text blocks into as few messages as fit within ``limit`` characters."""
+    separator = "\n\n"
+    messages: list[str] = []
+    current = ""
+    for block in blocks:
+        block = block[:limit]
+        candidate = f"{current}{separator}{block}" if current else block
+        if len(candidate) <= limit:
+            current = candidate
+        else:
+            messages.append(current)
+            current = block
+    if current:
+        messages.append(current)
+    return messages
 
 
 async def setup(bot: "DisCalendarBot") -> None:
@@ -0,0 +1,74 @@
+"""Background sync of the local read replica."""
+
+from typing import TYPE_CHECKING
+
+import structlog
+from discord.ext import commands, tasks
+
+from src.services.change_feed import RowChange
+from src.services.replica import ReplicaSync
+
+if TYPE_CHECKING:
+    from src.bot import DisCalendarBot
+
+logger = structlog.get_logger()
+
+
+class ReplicaTask(commands.Cog):
+    """Cog that keeps the local replica in sync with Supabase.
+
+    The loops do not wait for the gateway: a replica kept from a previous
+    run already serves reads, and catching it up early shortens the window
+    in which it is stale.
+    """
+
+    def __init__(self, bot: "DisCalendarBot", sync: ReplicaSync):
+        self.bot = bot
+        self.sync = sync
+        self.sync_loop.change_interval(seconds=bot.config.replica_sync_seconds)
+        self.sync_loop.start()
+        self.reconcile_loop.change_interval(minutes=bot.config.notify_reconcile_minutes)
+        self.reconcile_loop.start()
+
+    async def cog_unload(self) -> None:
+        """Called when cog is unloaded."""
+        self.sync_loop.cancel()
+        self.reconcile_loop.cancel()
+
+    @commands.Cog.listener()
+    async def on_events_change(self, change: RowChange) -> None:
+        """Apply an ``events`` row change pushed by the change feed."""
+        self.sync.apply_change(change)
+
+    @commands.Cog.listener()
+    async def on_event_settings_change(self, change: RowChange) -> None:
+        """Apply an ``event_settings`` row change pushed by the change feed."""
+        self.sync.apply_change(change)
+
+    @commands.Cog.listener()
+    async def on_guild_config_change(self, change: RowChange) -> None:
+        """Apply a ``guild_config`` row change pushed by the change feed."""
+        self.sync.apply_change(change)
+
+    @tasks.loop(seconds=30)
+    async def sync_loop(self) -> None:
+        """Load the replica, then fetch recently updated events."""
+        try:
+            await self.sync.sync()
+        except Exception as e:
+            logger.warning("Failed to sync local replica", error=str(e))
+
+    @tasks.loop(minutes=10)
+    async def reconcile_loop(self) -> None:
+        """Drop deleted events and reload settings and configs."""
+        try:
+            await self.sync.reconcile()
+        except Exception as e:
+            logger.warning("Failed to reconcile local replica", error=str(e))
+
+
+async def setup(bot: "DisCalendarBot") -> None:
+    """Setup function for loading the cog."""
+    if bot.replica_sync is None:
+        raise RuntimeError("The local replica is disabled; set REPLICA_PATH")
+    await bot.add_cog(ReplicaTask(bot, bot.replica_sync))
@@ -0,0 +1,218 @@
+"""In-memory fire-time index for event notifications."""
+
+import heapq
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from src.models import Event, NotificationPayload
+from src.models.notification import notification_anchor, notification_payload
+
+# Key of the implicit "at event start" notification
+EVENT_START_KEY = -1
+START_NOTIFICATION = notification_payload(EVENT_START_KEY, 0, "分前")
+
+# A notification is due during the minute following its fire time
+DUE_WINDOW = timedelta(minutes=1)
+
+
+def get_notification_range(event: Event) -> tuple[datetime, datetime]:
+    """Get the JST start/end times notifications are computed from.
+
+    All-day events are anchored at midnight JST of their start/end dates.
+    """
+    return (
+        notification_anchor(event.start_at, event.is_all_day),
+        notification_anchor(event.end_at, event.is_all_day),
+    )
+
+
+def get_event_notifications(event: Event) -> list[NotificationPayload]:
+    """Get the event's notifications plus the "at event start" notification, by key."""
+    return [START_NOTIFICATION, *event.notifications]
+
+
+@dataclass(frozen=True)
+class DueNotification:
+    """A notification whose fire time has been reached."""
+
+    event: Event
+    notification: NotificationPayload
+    fire_at: datetime
+    start: datetime
+    end: datetime
+
+
+def get_due_notifications(
+    event: Event, now: datetime, grace: timedelta = DUE_WINDOW
+) -> list[DueNotification]:
+    """Get the event's notifications that are due at ``now``, as ``pop_due`` would."""
+    start, end = get_notification_range(event)
+    due: list[DueNotification] = []
+    for notification in get_event_notifications(event):
+        fire_at = start - timedelta(minutes=notification.minutes)
+        if fire_at <= now and now - fire_at < grace:
+            due.append(
+                DueNotification(
+                    event=event, notification=notification, fire_at=fire_at, start=start, end=end
+                )
+            )
+    return due
+
+
+@dataclass
+class _ScheduledEvent:
+    """Bookkeeping for an event tracked by the schedule."""
+
+    event: Event
+    generation: int
+    start: datetime
+    end: datetime
+    notifications: dict[int, NotificationPayload]
+    pending: int
+
+
+class NotificationSchedule:
+    """Min-heap of ``(fire_at, event_id, key)`` entries.
+
+    Replacing or removing an event bumps its generation instead of searching
+    the heap; entries left behind by older generations are dropped lazily
+    when they reach the top, and the heap is compacted once they dominate.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[datetime, str, int, int]] = []
+        self._events: dict[str, _ScheduledEvent] = {}
+        self._generation = 0
+        self._live_entries = 0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __contains__(self, event_id: object) -> bool:
+        return event_id in self._events
+
+    def get(self, event_id: str) -> Event | None:
+        """Get a tracked event by ID."""
+        scheduled = self._events.get(event_id)
+        return scheduled.event if scheduled else None
+
+    def versions(self) -> dict[str, datetime]:
+        """Get ``event_id -> updated_at`` for every tracked event."""
+        return {event_id: s.event.updated_at for event_id, s in self._events.items()}
+
+    @property
+    def next_fire_at(self) -> datetime | None:
+        """Fire time of the earliest live entry, if any."""
+        self._drop_stale_head()
+        return self._heap[0][0] if self._heap else None
+
+    def upsert(self, event: Event) -> None:
+        """Add an event, or replace its entries if it is already tracked."""
+        self._discard(event.id)
+        self._generation += 1
+        start, end = get_notification_range(event)
+        notifications = get_event_notifications(event)
+        self._events[event.id] = _ScheduledEvent(
+            event=event,
+            generation=self._generation,
+            start=start,
+            end=end,
+            notifications={n.key: n for n in notifications},
+            pending=len(notifications),
+        )
+        for notification in notifications:
+            fire_at = start - timedelta(minutes=notification.to_minutes())
+            heapq.heappush(self._heap, (fire_at, event.id, notification.key, self._generation))
+        self._live_entries += len(notifications)
+
+    def remove(self, event_id: str) -> None:
+        """Stop tracking an event."""
+        self._discard(event_id)
+        self._maybe_compact()
+
+    def merge(self, events: Iterable[Event]) -> tuple[int, int]:
+        """Add new events and re-index changed ones, keeping all others.
+
+        An event counts as changed when its ``updated_at`` differs from the
+        tracked copy. Returns ``(added, updated)``.
+        """
+        added = updated = 0
+        for event in events:
+            current = self._events.get(event.id)
+            if current is None:
+                added += 1
+            elif current.event.updated_at != event.updated_at:
+                updated += 1
+            else:
+                continue
+            self.upsert(event)
+        return added, updated
+
+    def sync(self, events: Iterable[Event]) -> tuple[int, int, int]:
+        """Make the tracked set match ``events``.
+
+        Only events that are new, whose ``updated_at`` changed, or that
+        disappeared touch the heap. Returns ``(added, updated, removed)``.
+        """
+        events = list(events)
+        added, updated = self.merge(events)
+
+        seen = {event.id for event in events}
+        gone = [event_id for event_id in self._events if event_id not in seen]
+        for event_id in gone:
+            self._discard(event_id)
+        self._maybe_compact()
+        return added, updated, len(gone)
+
+    def pop_due(self, now: datetime, grace: timedelta = DUE_WINDOW) -> list[DueNotification]:
+        """Pop every entry that is due at ``now``.
+
+        ``now`` is expected to be truncated to the minute. Entries that fired
+        ``grace`` or more before ``now`` are discarded without being returned;
+        a grace longer than DUE_WINDOW lets missed minutes be caught up, so
+        it should not reach back further than the last finished tick.
+        """
+        due: list[DueNotification] = []
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, event_id, key, generation = heapq.heappop(self._heap)
+            scheduled = self._events.get(event_id)
+            if scheduled is None or scheduled.generation != generation:
+                continue
+            scheduled.pending -= 1
+            self._live_entries -= 1
+            if now - fire_at >= grace:
+                continue
+            due.append(
+                DueNotification(
+                    event=scheduled.event,
+                    notification=scheduled.notifications[key],
+                    fire_at=fire_at,
+                    start=scheduled.start,
+                    end=scheduled.end,
+                )
+            )
+        return due
+
+    def _discard(self, event_id: str) -> None:
+        scheduled = self._events.pop(event_id, None)
+        if scheduled is not None:
+            self._live_entries -= scheduled.pending
+
+    def _drop_stale_head(self) -> None:
+        while self._heap:
+            _, event_id, _, generation = self._heap[0]
+            scheduled = self._events.get(event_id)
+            if scheduled is not None and scheduled.generation == generation:
+                return
+            heapq.heappop(self._heap)
+
+    def _maybe_compact(self) -> None:
+        if len(self._heap) > 2 * self._live_entries + 64:
+            self._heap = [
+                entry
+                for entry in self._heap
+                if (scheduled := self._events.get(entry[1])) is not None
+                and scheduled.generation == entry[3]
+            ]
+            heapq.heapify(self._heap)
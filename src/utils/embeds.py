@@ -58,11 +58,10 @@ __**🌟他のサーバーにも導入する場合🌟**__
 
 def create_event_embed(event: Event) -> discord.Embed:
     """Create event embed."""
-    color_int = int(event.color.lstrip("#"), 16)
     embed = discord.Embed(
         title=event.name,
         description=event.description or "",
-        color=color_int,
+        color=event.color_int,
     )
 
     if event.is_all_day:
@@ -76,8 +75,7 @@ def create_event_embed(event: Event) -> discord.Embed:
     embed.add_field(name="終了時間", value=end_str, inline=True)
 
     if event.notifications:
-        notif_str = ", ".join(str(n) for n in event.notifications)
-        embed.add_field(name="通知", value=notif_str, inline=True)
+        embed.add_field(name="通知", value=str(event.notifications), inline=True)
 
     embed.timestamp = datetime.utcnow()
 
@@ -95,12 +93,10 @@ def create_error_embed(title: str, description: str) -> discord.Embed:
 
 def create_notification_embed(event: Event, notification_label: str) -> discord.Embed:
     """Create notification embed for event alerts."""
-    color_int = int(event.color.lstrip("#"), 16)
-
     embed = discord.Embed(
         title=event.name,
         description=event.description or "",
-        color=color_int,
+        color=event.color_int,
     )
     embed.set_author(name=notification_label)
 
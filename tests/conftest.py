@@ -6,7 +6,8 @@ import pytest
 from supabase import Client
 
 from src.bot import DisCalendarBot
-from src.services import EventService, GuildService
+from src.config import Config
+from src.services import EventService, GuildService, GuildWriteBuffer
 
 
 @pytest.fixture
@@ -15,10 +16,25 @@ def mock_supabase_client() -> MagicMock:
     return MagicMock(spec=Client)
 
 
+@pytest.fixture
+def test_config() -> Config:
+    """Create a configuration with test values."""
+    return Config(
+        bot_token="test_token",
+        application_id="123456789",
+        invitation_url="https://example.com/invite",
+        supabase_url="https://example.supabase.co",
+        supabase_key="test_key",
+        notify_ledger_path=":memory:",
+    )
+
+
 @pytest.fixture
 def mock_event_service(mock_supabase_client: MagicMock) -> MagicMock:
     """Create a mock EventService."""
-    return MagicMock(spec=EventService, supabase=mock_supabase_client)
+    service = MagicMock(spec=EventService, supabase=mock_supabase_client)
+    service.load_details = AsyncMock(side_effect=lambda events: {e.id: e for e in events})
+    return service
 
 
 @pytest.fixture
@@ -29,15 +45,19 @@ def mock_guild_service(mock_supabase_client: MagicMock) -> MagicMock:
 
 @pytest.fixture
 def mock_bot(
+    test_config: Config,
     mock_supabase_client: MagicMock,
     mock_event_service: MagicMock,
     mock_guild_service: MagicMock,
 ) -> MagicMock:
     """Create a mock DisCalendarBot."""
     bot = MagicMock(spec=DisCalendarBot)
+    bot.config = test_config
     bot.supabase = mock_supabase_client
     bot.event_service = mock_event_service
     bot.guild_service = mock_guild_service
+    bot.guild_writes = GuildWriteBuffer(mock_guild_service)
+    bot.change_feed = None
     bot.user = MagicMock()
     bot.user.id = 123456789
     bot.user.avatar = MagicMock()
@@ -90,7 +110,9 @@ def mock_channel() -> MagicMock:
 
 
 @pytest.fixture
-def mock_interaction(mock_guild: MagicMock, mock_member: MagicMock, mock_channel: MagicMock) -> MagicMock:
+def mock_interaction(
+    mock_guild: MagicMock, mock_member: MagicMock, mock_channel: MagicMock
+) -> MagicMock:
     """Create a mock discord.Interaction."""
     interaction = MagicMock()
     interaction.id = 444555666
@@ -6,18 +6,18 @@ import pytest
 
 from src.events.guild import GuildEvents
 from src.models import Guild, GuildCreate
+from src.services.change_feed import RowChange
 
 
 class TestGuildEvents:
     """Tests for GuildEvents."""
 
     @pytest.mark.asyncio
-    async def test_on_guild_join_creates_new_guild(
+    async def test_on_guild_join_upserts_guild(
         self, mock_bot: MagicMock, mock_guild: MagicMock
     ) -> None:
-        """Test that on_guild_join creates a new guild when it doesn't exist."""
-        mock_bot.guild_service.find_by_guild_id = AsyncMock(return_value=None)
-        mock_bot.guild_service.create = AsyncMock(
+        """Test that on_guild_join writes the guild with a single upsert."""
+        mock_bot.guild_service.upsert = AsyncMock(
             return_value=Guild(
                 id=1,
                 guild_id="987654321",
@@ -30,32 +30,13 @@ class TestGuildEvents:
         cog = GuildEvents(mock_bot)
         await cog.on_guild_join(mock_guild)
 
-        mock_bot.guild_service.find_by_guild_id.assert_called_once_with("987654321")
-        mock_bot.guild_service.create.assert_called_once()
-        create_call_args = mock_bot.guild_service.create.call_args[0][0]
-        assert isinstance(create_call_args, GuildCreate)
-        assert create_call_args.guild_id == "987654321"
-        assert create_call_args.name == "Test Guild"
-        assert create_call_args.avatar_url == "https://example.com/guild_icon.png"
-
-    @pytest.mark.asyncio
-    async def test_on_guild_join_skips_existing_guild(
-        self, mock_bot: MagicMock, mock_guild: MagicMock
-    ) -> None:
-        """Test that on_guild_join skips creation when guild already exists."""
-        existing_guild = Guild(
-            id=1,
-            guild_id="987654321",
-            name="Existing Guild",
-            avatar_url=None,
-            locale="ja",
-        )
-        mock_bot.guild_service.find_by_guild_id = AsyncMock(return_value=existing_guild)
-
-        cog = GuildEvents(mock_bot)
-        await cog.on_guild_join(mock_guild)
-
-        mock_bot.guild_service.find_by_guild_id.assert_called_once_with("987654321")
+        mock_bot.guild_service.upsert.assert_called_once()
+        upsert_call_args = mock_bot.guild_service.upsert.call_args[0][0]
+        assert isinstance(upsert_call_args, GuildCreate)
+        assert upsert_call_args.guild_id == "987654321"
+        assert upsert_call_args.name == "Test Guild"
+        assert upsert_call_args.avatar_url == "https://example.com/guild_icon.png"
+        mock_bot.guild_service.find_by_guild_id.assert_not_called()
         mock_bot.guild_service.create.assert_not_called()
 
     @pytest.mark.asyncio
@@ -64,8 +45,7 @@ class TestGuildEvents:
     ) -> None:
         """Test that on_guild_join handles guild without icon."""
         mock_guild.icon = None
-        mock_bot.guild_service.find_by_guild_id = AsyncMock(return_value=None)
-        mock_bot.guild_service.create = AsyncMock(
+        mock_bot.guild_service.upsert = AsyncMock(
             return_value=Guild(
                 id=1, guild_id="987654321", name="Test Guild", avatar_url=None, locale="ja"
             )
@@ -74,8 +54,8 @@ class TestGuildEvents:
         cog = GuildEvents(mock_bot)
         await cog.on_guild_join(mock_guild)
 
-        create_call_args = mock_bot.guild_service.create.call_args[0][0]
-        assert create_call_args.avatar_url is None
+        upsert_call_args = mock_bot.guild_service.upsert.call_args[0][0]
+        assert upsert_call_args.avatar_url is None
 
     @pytest.mark.asyncio
     async def test_on_guild_remove_deletes_guild(
@@ -88,6 +68,18 @@ class TestGuildEvents:
         await cog.on_guild_remove(mock_guild)
 
         mock_bot.guild_service.delete.assert_called_once_with("987654321")
+        mock_bot.guild_service.invalidate_config.assert_called_once_with("987654321")
+        mock_bot.event_service.forget_settings.assert_called_once_with("987654321")
+
+    @pytest.mark.asyncio
+    async def test_on_guild_config_change_invalidates_cache(self, mock_bot: MagicMock) -> None:
+        """Test that a pushed guild_config change drops the cached config."""
+        cog = GuildEvents(mock_bot)
+        await cog.on_guild_config_change(
+            RowChange(table="guild_config", type="DELETE", old_record={"guild_id": "42"})
+        )
+
+        mock_bot.guild_service.invalidate_config.assert_called_once_with("42")
 
     @pytest.mark.asyncio
     async def test_on_guild_update_updates_name(
@@ -104,20 +96,17 @@ class TestGuildEvents:
         after_guild.name = "New Name"
         after_guild.icon = None
 
-        mock_bot.guild_service.update = AsyncMock(
-            return_value=Guild(
-                id=1, guild_id="987654321", name="New Name", avatar_url=None, locale="ja"
-            )
-        )
-
         cog = GuildEvents(mock_bot)
         await cog.on_guild_update(before_guild, after_guild)
 
-        mock_bot.guild_service.update.assert_called_once()
-        update_call_args = mock_bot.guild_service.update.call_args
-        assert update_call_args[0][0] == "987654321"
-        assert isinstance(update_call_args[0][1], GuildCreate)
-        assert update_call_args[0][1].name == "New Name"
+        mock_bot.guild_service.update.assert_not_called()
+        assert len(mock_bot.guild_writes) == 1
+        mock_bot.guild_service.upsert_many = AsyncMock()
+        await mock_bot.guild_writes.flush()
+        (queued,) = mock_bot.guild_service.upsert_many.call_args.args[0]
+        assert isinstance(queued, GuildCreate)
+        assert queued.guild_id == "987654321"
+        assert queued.name == "New Name"
 
     @pytest.mark.asyncio
     async def test_on_guild_update_updates_icon(
@@ -135,22 +124,13 @@ class TestGuildEvents:
         after_guild.icon = MagicMock()
         after_guild.icon.url = "https://example.com/new_icon.png"
 
-        mock_bot.guild_service.update = AsyncMock(
-            return_value=Guild(
-                id=1,
-                guild_id="987654321",
-                name="Test Guild",
-                avatar_url="https://example.com/new_icon.png",
-                locale="ja",
-            )
-        )
-
         cog = GuildEvents(mock_bot)
         await cog.on_guild_update(before_guild, after_guild)
 
-        mock_bot.guild_service.update.assert_called_once()
-        update_call_args = mock_bot.guild_service.update.call_args[0][1]
-        assert update_call_args.avatar_url == "https://example.com/new_icon.png"
+        mock_bot.guild_service.upsert_many = AsyncMock()
+        await mock_bot.guild_writes.flush()
+        (queued,) = mock_bot.guild_service.upsert_many.call_args.args[0]
+        assert queued.avatar_url == "https://example.com/new_icon.png"
 
     @pytest.mark.asyncio
     async def test_on_guild_update_skips_when_no_changes(
@@ -171,3 +151,70 @@ class TestGuildEvents:
         await cog.on_guild_update(before_guild, after_guild)
 
         mock_bot.guild_service.update.assert_not_called()
+        assert len(mock_bot.guild_writes) == 0
+
+
+def make_guild(guild_id: int, name: str, unavailable: bool = False) -> MagicMock:
+    """Create a mock discord.Guild without an icon."""
+    guild = MagicMock(id=guild_id, icon=None, unavailable=unavailable)
+    guild.name = name
+    return guild
+
+
+def make_row(guild_id: str, name: str) -> GuildCreate:
+    """Create a guilds row as read by find_all."""
+    return GuildCreate(guild_id=guild_id, name=name)
+
+
+class TestReconcileGuilds:
+    """Tests for GuildEvents.reconcile_guilds."""
+
+    @pytest.mark.asyncio
+    async def test_writes_only_differences(self, mock_bot: MagicMock) -> None:
+        """Test that joins and renames are upserted and departures deleted in bulk."""
+        mock_bot.guilds = [
+            make_guild(1, "Same"),
+            make_guild(2, "Renamed"),
+            make_guild(3, "Joined"),
+            make_guild(4, "Unavailable", unavailable=True),
+        ]
+        mock_bot.guild_service.find_all = AsyncMock(
+            return_value=[
+                make_row("1", "Same"),
+                make_row("2", "Old"),
+                make_row("4", "Unavailable"),
+                make_row("5", "Left"),
+            ]
+        )
+        mock_bot.guild_service.upsert_many = AsyncMock()
+        mock_bot.guild_service.delete_many = AsyncMock()
+
+        await GuildEvents(mock_bot).reconcile_guilds()
+
+        upserted = mock_bot.guild_service.upsert_many.call_args.args[0]
+        assert [(g.guild_id, g.name) for g in upserted] == [("2", "Renamed"), ("3", "Joined")]
+        mock_bot.guild_service.delete_many.assert_called_once_with(["5"])
+        mock_bot.guild_service.invalidate_config.assert_called_once_with("5")
+        mock_bot.event_service.forget_settings.assert_called_once_with("5")
+
+    @pytest.mark.asyncio
+    async def test_skips_mass_deletes(self, mock_bot: MagicMock) -> None:
+        """Test that an apparently incomplete guild list does not wipe the table."""
+        mock_bot.guilds = [make_guild(1, "One")]
+        mock_bot.guild_service.find_all = AsyncMock(
+            return_value=[make_row(str(i), "One" if i == 1 else "Other") for i in range(1, 5)]
+        )
+        mock_bot.guild_service.upsert_many = AsyncMock()
+        mock_bot.guild_service.delete_many = AsyncMock()
+
+        await GuildEvents(mock_bot).reconcile_guilds()
+
+        mock_bot.guild_service.upsert_many.assert_not_called()
+        mock_bot.guild_service.delete_many.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_on_ready_survives_failures(self, mock_bot: MagicMock) -> None:
+        """Test that a failed reconciliation is logged instead of raised."""
+        mock_bot.guild_service.find_all = AsyncMock(side_effect=RuntimeError("down"))
+
+        await GuildEvents(mock_bot).on_ready()
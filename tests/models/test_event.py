@@ -0,0 +1,86 @@
+"""Tests for event models."""
+
+import json
+
+from src.models import Event, EventSettings, NotificationPayload
+
+
+def make_row(**overrides: object) -> dict:
+    """Create an events row as PostgREST returns it."""
+    return {
+        "id": "1",
+        "guild_id": "900000000000000000",
+        "name": "Event",
+        "description": None,
+        "color": "#FF0000",
+        "is_all_day": False,
+        "start_at": "2024-01-15T10:00:00Z",
+        "end_at": "2024-01-15T11:00:00Z",
+        "location": None,
+        "channel_id": "800000000000000000",
+        "channel_name": None,
+        "notifications": [{"key": 0, "num": 2, "type": "時間前"}],
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+        **overrides,
+    }
+
+
+def decoded(row: dict) -> dict:
+    """Round-trip a row through JSON so that its strings are fresh objects."""
+    return json.loads(json.dumps(row))
+
+
+class TestEvent:
+    """Tests for Event."""
+
+    def test_is_slotted(self) -> None:
+        """Test that events carry no per-instance __dict__."""
+        event = Event.from_dict(make_row())
+
+        assert not hasattr(event, "__dict__")
+
+    def test_shares_repeated_values(self) -> None:
+        """Test that snowflakes, colors and notifications are shared between events."""
+        first = Event.from_dict(decoded(make_row(id="1")))
+        second = Event.from_dict(decoded(make_row(id="2")))
+
+        assert first.guild_id is second.guild_id
+        assert first.channel_id is second.channel_id
+        assert first.color is second.color
+        assert first.notifications[0] is second.notifications[0]
+
+    def test_parses_color_once(self) -> None:
+        """Test that color_int is derived from color, with a fallback for bad values."""
+        assert Event.from_dict(make_row(color="#FF0000")).color_int == 0xFF0000
+        assert Event.from_dict(make_row(color="red")).color_int == 0x3B82F6
+
+    def test_with_details_recomputes_color(self) -> None:
+        """Test that completing a partial event parses its real color."""
+        partial = Event.from_dict({k: v for k, v in make_row().items() if k != "name"})
+
+        event = partial.with_details({"id": "1", "name": "Event", "color": "#00FF00"})
+
+        assert event.color_int == 0x00FF00
+
+
+class TestNotificationPayload:
+    """Tests for NotificationPayload."""
+
+    def test_precomputes_minutes(self) -> None:
+        """Test that the lead time is computed at construction."""
+        assert NotificationPayload(key=0, num=2, ty="時間前").minutes == 120
+        assert NotificationPayload(key=0, num=1, ty="週間前").to_minutes() == 60 * 24 * 7
+        assert NotificationPayload(key=0, num=5, ty="分前").to_minutes() == 5
+
+
+class TestEventSettings:
+    """Tests for EventSettings."""
+
+    def test_interns_snowflakes(self) -> None:
+        """Test that guild and channel IDs are interned."""
+        settings = EventSettings.from_dict(
+            decoded({"id": 1, "guild_id": "900000000000000000", "channel_id": "1"})
+        )
+
+        assert settings.guild_id is Event.from_dict(decoded(make_row())).guild_id
@@ -0,0 +1,97 @@
+"""Tests for notification models."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from src.models import NotificationPayload, NotificationSet, notification_set
+from src.models.notification import (
+    CUSTOM_KEY_BASE,
+    JST,
+    NOTIFICATION_PRESETS,
+    next_notify_at,
+)
+
+
+class TestNotificationSet:
+    """Tests for NotificationSet."""
+
+    def test_encodes_presets_as_bits(self) -> None:
+        """Test that preset rows become mask bits and the rest custom pairs."""
+        notifications = NotificationSet.from_rows(
+            [
+                {"key": 0, "num": 1, "type": "時間前"},
+                {"key": 1, "num": 30, "type": "分前"},
+                {"key": 2, "num": 45, "type": "分前"},
+                "not a row",
+            ]
+        )
+
+        assert notifications.mask == 1 << 3 | 1 << 4
+        assert notifications.custom == ((45, "分前"),)
+        assert [n.key for n in notifications] == [3, 4, CUSTOM_KEY_BASE]
+        assert [n.minutes for n in notifications] == [30, 60, 45]
+        assert str(notifications) == "30分前, 1時間前, 45分前"
+
+    def test_round_trips_rows(self) -> None:
+        """Test that to_rows writes every lead time back, keyed in order."""
+        rows = [
+            {"key": i, "num": num, "type": ty} for i, (num, ty) in enumerate(NOTIFICATION_PRESETS)
+        ]
+
+        notifications = NotificationSet.from_rows(rows)
+
+        assert notifications.mask == (1 << len(NOTIFICATION_PRESETS)) - 1
+        assert notifications.to_rows() == rows
+
+    def test_drops_duplicates(self) -> None:
+        """Test that the same lead time is only notified once."""
+        notifications = NotificationSet.from_pairs(
+            [(5, "分前"), (5, "分前"), (4, "日前"), (4, "日前")]
+        )
+
+        assert [str(n) for n in notifications] == ["5分前", "4日前"]
+
+    def test_is_shared(self) -> None:
+        """Test that equal sets and their payloads are shared instances."""
+        first = NotificationSet.from_rows([{"key": 0, "num": 10, "type": "分前"}])
+        second = NotificationSet.of([NotificationPayload(key=3, num=10, ty="分前")])
+
+        assert first is second
+        assert first[0] is notification_set(first.mask)[0]
+        assert not notification_set()
+
+    def test_rejects_unknown_bits(self) -> None:
+        """Test that masks outside the presets are invalid."""
+        with pytest.raises(ValueError):
+            NotificationSet(mask=1 << len(NOTIFICATION_PRESETS))
+
+
+class TestNextNotifyAt:
+    """Tests for next_notify_at."""
+
+    def test_returns_first_fire_time_after(self) -> None:
+        """Test that fire times are visited in order, ending at the event start."""
+        start_at = datetime(2024, 1, 15, 1, 0, tzinfo=UTC)
+        notifications = NotificationSet.from_pairs([(1, "日前"), (30, "分前")])
+        anchor = start_at.astimezone(JST)
+
+        before = datetime(2024, 1, 1, tzinfo=UTC)
+        assert next_notify_at(start_at, False, notifications, before) == anchor - timedelta(days=1)
+        after_first = anchor - timedelta(days=1)
+        assert next_notify_at(start_at, False, notifications, after_first) == anchor - timedelta(
+            minutes=30
+        )
+        assert next_notify_at(start_at, False, notifications, anchor - timedelta(minutes=1)) == (
+            anchor
+        )
+        assert next_notify_at(start_at, False, notifications, anchor) is None
+
+    def test_all_day_is_anchored_at_midnight_jst(self) -> None:
+        """Test that all-day events count back from midnight JST of their date."""
+        start_at = datetime(2024, 1, 15, tzinfo=UTC)
+        notifications = NotificationSet.from_pairs([(1, "時間前")])
+
+        fire_at = next_notify_at(start_at, True, notifications, datetime(2024, 1, 1, tzinfo=UTC))
+
+        assert fire_at == datetime(2024, 1, 14, 23, 0, tzinfo=JST)
@@ -0,0 +1,68 @@
+"""Tests for TTLCache."""
+
+from src.services.cache import MISSING, TTLCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_expires_entries_after_ttl(self) -> None:
+        """Test that entries are served until their TTL passes."""
+        clock = FakeClock()
+        cache: TTLCache[str, int] = TTLCache(ttl=10, clock=clock)
+        cache.put("a", 1)
+
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10.0
+        assert cache.get("a") is MISSING
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test that the least recently read entry is evicted first."""
+        cache: TTLCache[str, int] = TTLCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+        assert cache.stats().evictions == 1
+
+    def test_none_is_a_cached_value(self) -> None:
+        """Test that None can be cached and counts as a hit."""
+        cache: TTLCache[str, None] = TTLCache()
+        cache.put("a", None)
+
+        assert cache.get("a") is None
+        assert cache.get("b") is MISSING
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.hit_rate) == (1, 1, 0.5)
+
+    def test_put_skips_values_read_before_invalidation(self) -> None:
+        """Test that a load started before invalidate does not store its result."""
+        cache: TTLCache[str, int] = TTLCache()
+        version = cache.version("a")
+        cache.invalidate("a")
+
+        cache.put("a", 1, version=version)
+        assert cache.get("a") is MISSING
+
+        cache.put("a", 2, version=cache.version("a"))
+        assert cache.get("a") == 2
+
+        version = cache.version("a")
+        cache.clear()
+        cache.put("a", 3, version=version)
+        assert cache.get("a") is MISSING
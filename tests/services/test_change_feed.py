@@ -0,0 +1,84 @@
+"""Tests for change feeds."""
+
+import asyncio
+
+import pytest
+
+from src.services.change_feed import LocalChangeFeedServer, RowChange, WebSocketChangeFeed
+
+
+class TestRowChange:
+    """Tests for RowChange."""
+
+    def test_from_dict_parses_realtime_payload(self) -> None:
+        """Test that a Realtime postgres_changes data dict is parsed."""
+        change = RowChange.from_dict(
+            {
+                "schema": "public",
+                "table": "events",
+                "type": "DELETE",
+                "record": None,
+                "old_record": {"id": "1"},
+                "commit_timestamp": "2024-01-01T00:00:00Z",
+            }
+        )
+
+        assert change.table == "events"
+        assert change.type == "DELETE"
+        assert change.record == {}
+        assert change.old_record == {"id": "1"}
+
+
+class TestWebSocketChangeFeed:
+    """Tests for WebSocketChangeFeed against LocalChangeFeedServer."""
+
+    @pytest.mark.asyncio
+    async def test_receives_published_changes(self) -> None:
+        """Test that changes published by the local server reach the callback."""
+        server = LocalChangeFeedServer()
+        await server.start()
+        received: list[RowChange] = []
+        got_change = asyncio.Event()
+
+        def on_change(change: RowChange) -> None:
+            received.append(change)
+            got_change.set()
+
+        feed = WebSocketChangeFeed(server.url, on_change, reconnect_delay=0.05)
+        await feed.start()
+        try:
+            await asyncio.wait_for(feed.wait_connected(), timeout=5)
+            while server.client_count == 0:
+                await asyncio.sleep(0.01)
+
+            # Unwatched tables are dropped by the feed
+            server.publish(RowChange(table="guilds", type="INSERT", record={"guild_id": "1"}))
+            server.publish(RowChange(table="events", type="INSERT", record={"id": "1"}))
+            await asyncio.wait_for(got_change.wait(), timeout=5)
+
+            assert received == [RowChange(table="events", type="INSERT", record={"id": "1"})]
+            assert feed.received == 1
+        finally:
+            await feed.stop()
+            await server.stop()
+
+    @pytest.mark.asyncio
+    async def test_reports_disconnect(self) -> None:
+        """Test that connected turns false when the server goes away."""
+        server = LocalChangeFeedServer()
+        await server.start()
+        feed = WebSocketChangeFeed(server.url, lambda change: None, reconnect_delay=0.05)
+        await feed.start()
+        try:
+            await asyncio.wait_for(feed.wait_connected(), timeout=5)
+            assert feed.connected
+
+            await server.stop()
+            for _ in range(100):
+                if not feed.connected:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert not feed.connected
+        finally:
+            await feed.stop()
@@ -0,0 +1,44 @@
+"""Tests for NotificationChannelMap."""
+
+import hashlib
+
+from src.models import EventSettings
+from src.services.channel_map import NotificationChannelMap
+
+
+class TestNotificationChannelMap:
+    """Tests for NotificationChannelMap."""
+
+    def test_get_returns_settings_and_none_for_unknown_guilds(self) -> None:
+        """Test lookups of known and unknown guilds."""
+        channels = NotificationChannelMap()
+        channels.replace([EventSettings(id=1, guild_id="123", channel_id="456")])
+
+        assert channels.loaded
+        assert channels.get("123") == EventSettings(id=1, guild_id="123", channel_id="456")
+        assert channels.get("999") is None
+
+    def test_set_replaces_and_discard_row_removes(self) -> None:
+        """Test that updates replace a guild's row and deletes by row ID remove it."""
+        channels = NotificationChannelMap()
+        channels.set(EventSettings(id=1, guild_id="123", channel_id="456"))
+        channels.set(EventSettings(id=1, guild_id="123", channel_id="789"))
+
+        assert channels.get("123") == EventSettings(id=1, guild_id="123", channel_id="789")
+
+        channels.discard_row(1)
+        assert channels.get("123") is None
+        assert len(channels) == 0
+
+    def test_checksum_matches_sql_definition(self) -> None:
+        """Test that the checksum joins id:guild_id:channel_id in guild_id text order."""
+        channels = NotificationChannelMap()
+        channels.replace(
+            [
+                EventSettings(id=2, guild_id="9", channel_id="20"),
+                EventSettings(id=1, guild_id="10", channel_id="30"),
+            ]
+        )
+
+        assert channels.checksum() == hashlib.md5(b"1:10:30,2:9:20").hexdigest()
+        assert NotificationChannelMap().checksum() == hashlib.md5(b"").hexdigest()
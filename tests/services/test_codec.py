@@ -0,0 +1,167 @@
+"""Tests for the msgspec event codec."""
+
+import json
+from datetime import UTC, datetime
+from typing import Any
+
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+from supabase import ClientOptions, create_client
+
+pytest.importorskip("msgspec")
+
+from src.models import SCHEDULE_COLUMNS, Event, EventCreate, NotificationPayload  # noqa: E402
+from src.services import EventService, QueryExecutor  # noqa: E402
+from src.services.codec import EventCodec  # noqa: E402
+from src.services.http import execute_raw  # noqa: E402
+from src.services.resilience import Resilience, is_transient  # noqa: E402
+
+
+def event_row(event_id: str = "a", **overrides: Any) -> dict[str, Any]:
+    """Create an events row as PostgREST returns it."""
+    return {
+        "id": event_id,
+        "guild_id": "123",
+        "name": "Meeting",
+        "description": "Weekly",
+        "color": "#FF0000",
+        "is_all_day": False,
+        "start_at": "2024-01-15T10:00:00+00:00",
+        "end_at": "2024-01-15T11:00:00+00:00",
+        "location": None,
+        "channel_id": "555",
+        "channel_name": "general",
+        "notifications": [{"key": 1, "num": 10, "type": "分前"}],
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "updated_at": "2024-01-02T00:00:00+00:00",
+        **overrides,
+    }
+
+
+def encode(*rows: dict[str, Any]) -> bytes:
+    """Encode rows as a PostgREST response body."""
+    return json.dumps(list(rows)).encode()
+
+
+class FakePostgrest:
+    """Local stand-in for PostgREST that always returns one response."""
+
+    def __init__(self, response: httpx.Response):
+        self.response = response
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return self.response
+
+    def service(self) -> EventService:
+        """Create an EventService with a codec whose traffic goes to this fake."""
+        http = httpx.Client(transport=httpx.MockTransport(self))
+        supabase = create_client(
+            "http://fake.supabase.local", "test_key", options=ClientOptions(httpx_client=http)
+        )
+        resilience = Resilience(QueryExecutor(max_workers=1))
+        return EventService(supabase, resilience=resilience, codec=EventCodec())
+
+
+class TestEventCodec:
+    """Tests for EventCodec."""
+
+    def test_decodes_like_from_dict(self) -> None:
+        """Test that full rows decode to the same Events as Event.from_dict."""
+        rows = [event_row("a"), event_row("b", notifications=[], description=None)]
+
+        events = EventCodec().decode_events(encode(*rows))
+
+        assert events == [Event.from_dict(row) for row in rows]
+        assert events[0].start_at == datetime(2024, 1, 15, 10, 0, tzinfo=UTC)
+        assert events[0].notifications[0] is NotificationPayload.from_dict(
+            {"key": 1, "num": 10, "type": "分前"}
+        )
+
+    def test_decodes_partial_rows(self) -> None:
+        """Test that a SCHEDULE_COLUMNS projection yields partial Events."""
+        row = {column: event_row()[column] for column in SCHEDULE_COLUMNS}
+
+        (event,) = EventCodec().decode_events(encode(row))
+
+        assert event.partial
+        assert event == Event.from_dict(row)
+
+    def test_falls_back_on_rows_outside_the_schema(self) -> None:
+        """Test that malformed notifications are decoded the slow way."""
+        row = event_row(notifications=[{"key": 1, "num": "10"}])
+
+        (event,) = EventCodec().decode_events(encode(row))
+
+        assert event == Event.from_dict(row)
+
+    def test_encodes_create_payload(self) -> None:
+        """Test that encode_create matches the JSON of EventCreate.to_dict."""
+        data = EventCreate(
+            guild_id="123",
+            name="Meeting",
+            start_at=datetime(2024, 1, 15, 10, 0, tzinfo=UTC),
+            end_at=datetime(2024, 1, 15, 11, 0, tzinfo=UTC),
+            notifications=[{"key": 1, "num": 10, "type": "分前"}],
+        )
+
+        decoded = json.loads(EventCodec().encode_create(data))
+        expected = data.to_dict()
+
+        assert decoded.keys() == expected.keys()
+        for key in ("start_at", "end_at"):
+            assert datetime.fromisoformat(decoded.pop(key)) == datetime.fromisoformat(
+                expected.pop(key)
+            )
+        assert decoded == expected
+
+
+class TestEventServiceWithCodec:
+    """Tests for EventService decoding raw responses."""
+
+    @pytest.mark.asyncio
+    async def test_reads_decode_response_bytes(self) -> None:
+        """Test that selects are sent as usual and decoded by the codec."""
+        fake = FakePostgrest(httpx.Response(200, content=encode(event_row("a"))))
+
+        events = await fake.service().find_by_ids(["a"])
+
+        assert [e.id for e in events] == ["a"]
+        assert fake.requests[0].url.path == "/rest/v1/events"
+        assert "id=in.%28a%29" in str(fake.requests[0].url)
+
+    @pytest.mark.asyncio
+    async def test_create_sends_encoded_payload(self) -> None:
+        """Test that inserts send the codec's bytes and return the created row."""
+        fake = FakePostgrest(httpx.Response(201, content=encode(event_row("new"))))
+        data = EventCreate(
+            guild_id="123",
+            name="Meeting",
+            start_at=datetime(2024, 1, 15, 10, 0, tzinfo=UTC),
+            end_at=datetime(2024, 1, 15, 11, 0, tzinfo=UTC),
+        )
+
+        event = await fake.service().create(data)
+
+        request = fake.requests[0]
+        assert request.method == "POST"
+        assert request.headers["Content-Type"] == "application/json"
+        assert json.loads(request.content)["name"] == "Meeting"
+        assert event.id == "new"
+
+    def test_errors_are_raised_like_execute(self) -> None:
+        """Test that error responses become APIError with the same codes."""
+        fake = FakePostgrest(httpx.Response(400, json={"code": "22P02", "message": "bad"}))
+        query = fake.service().supabase.table("events").select("id")
+
+        with pytest.raises(APIError) as client_error:
+            execute_raw(query)
+        assert client_error.value.code == "22P02"
+        assert not is_transient(client_error.value)
+
+        fake.response = httpx.Response(502, text="<html>Bad Gateway</html>")
+        with pytest.raises(APIError) as gateway_error:
+            execute_raw(query)
+        assert is_transient(gateway_error.value)
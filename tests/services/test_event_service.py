@@ -1,11 +1,19 @@
 """Tests for EventService."""
 
-from datetime import UTC, datetime
-from unittest.mock import MagicMock
+import asyncio
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-
-from src.models import Event, EventCreate, EventSettings, NotificationPayload
+from postgrest.exceptions import APIError
+
+from src.models import (
+    SCHEDULE_COLUMNS,
+    Event,
+    EventCreate,
+    EventSettings,
+    NotificationPayload,
+)
 from src.services import EventService
 
 
@@ -43,6 +51,7 @@ class TestEventServiceFindByGuildId:
         mock_query.eq.return_value = mock_query
         mock_query.gte.return_value = mock_query
         mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
         mock_query.execute.return_value = mock_response
         mock_supabase.table.return_value = mock_query
 
@@ -83,6 +92,7 @@ class TestEventServiceFindByGuildId:
         mock_query.eq.return_value = mock_query
         mock_query.lt.return_value = mock_query
         mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
         mock_query.execute.return_value = mock_response
         mock_supabase.table.return_value = mock_query
 
@@ -138,6 +148,7 @@ class TestEventServiceFindByGuildId:
         mock_query.select.return_value = mock_query
         mock_query.eq.return_value = mock_query
         mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
         mock_query.execute.return_value = mock_response
         mock_supabase.table.return_value = mock_query
 
@@ -162,6 +173,7 @@ class TestEventServiceFindByGuildId:
         mock_query.eq.return_value = mock_query
         mock_query.gte.return_value = mock_query
         mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
         mock_query.execute.return_value = mock_response
         mock_supabase.table.return_value = mock_query
 
@@ -170,6 +182,33 @@ class TestEventServiceFindByGuildId:
         assert events == []
 
 
+class TestEventServiceFindByGuildIdCoalescing:
+    """Tests for single-flight coalescing of find_by_guild_id."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_share_one_query(self) -> None:
+        """Test that concurrent identical calls issue one query and get separate lists."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase)
+
+        mock_query = MagicMock()
+        mock_query.select.return_value = mock_query
+        mock_query.eq.return_value = mock_query
+        mock_query.gte.return_value = mock_query
+        mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.execute.return_value = MagicMock(data=[])
+        mock_supabase.table.return_value = mock_query
+
+        results = await asyncio.gather(
+            *(service.find_by_guild_id("123", "future") for _ in range(10))
+        )
+
+        assert mock_query.execute.call_count == 1
+        assert results[0] == [] and results[0] is not results[1]
+        assert service.flights.stats()[("events.find_by_guild_id", "123", "future")].shared == 9
+
+
 class TestEventServiceFindAllFutureEvents:
     """Tests for EventService.find_all_future_events method."""
 
@@ -221,6 +260,7 @@ class TestEventServiceFindAllFutureEvents:
         mock_query.select.return_value = mock_query
         mock_query.gte.return_value = mock_query
         mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
         mock_query.execute.return_value = mock_response
         mock_supabase.table.return_value = mock_query
 
@@ -230,6 +270,367 @@ class TestEventServiceFindAllFutureEvents:
         mock_query.gte.assert_called_once_with("start_at", from_time.isoformat())
 
 
+class TestEventServiceIterEvents:
+    """Tests for EventService keyset-paginated streaming."""
+
+    @staticmethod
+    def make_row(event_id: str, start_at: str) -> dict:
+        """Create an events row."""
+        return {
+            "id": event_id,
+            "guild_id": "123",
+            "name": f"Event {event_id}",
+            "description": None,
+            "color": "#FF0000",
+            "is_all_day": False,
+            "start_at": start_at,
+            "end_at": start_at,
+            "location": None,
+            "channel_id": None,
+            "channel_name": None,
+            "notifications": [],
+            "created_at": "2024-01-01T00:00:00Z",
+            "updated_at": "2024-01-01T00:00:00Z",
+        }
+
+    @pytest.mark.asyncio
+    async def test_pages_with_start_at_id_cursor(self) -> None:
+        """Test that pages continue after the last (start_at, id) of the previous page."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase, page_size=2)
+
+        pages = [
+            [
+                self.make_row("a", "2024-07-01T10:00:00+00:00"),
+                self.make_row("b", "2024-07-01T10:00:00+00:00"),
+            ],
+            [self.make_row("c", "2024-07-02T10:00:00+00:00")],
+        ]
+        mock_query = MagicMock()
+        mock_query.select.return_value = mock_query
+        mock_query.gte.return_value = mock_query
+        mock_query.or_.return_value = mock_query
+        mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.execute.side_effect = [MagicMock(data=page) for page in pages]
+        mock_supabase.table.return_value = mock_query
+
+        from_time = datetime(2024, 6, 1, tzinfo=UTC)
+        events = [event async for event in service.iter_future_events(from_time)]
+
+        assert [event.id for event in events] == ["a", "b", "c"]
+        assert mock_query.execute.call_count == 2
+        mock_query.limit.assert_called_with(2)
+        mock_query.or_.assert_called_once_with(
+            'start_at.gt."2024-07-01T10:00:00+00:00",'
+            'and(start_at.eq."2024-07-01T10:00:00+00:00",id.gt."b")'
+        )
+
+    @pytest.mark.asyncio
+    async def test_stops_after_full_last_page(self) -> None:
+        """Test that an exactly full last page costs one extra empty query."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase, page_size=1)
+
+        mock_query = MagicMock()
+        mock_query.select.return_value = mock_query
+        mock_query.eq.return_value = mock_query
+        mock_query.gte.return_value = mock_query
+        mock_query.or_.return_value = mock_query
+        mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.execute.side_effect = [
+            MagicMock(data=[self.make_row("a", "2024-07-01T10:00:00+00:00")]),
+            MagicMock(data=[]),
+        ]
+        mock_supabase.table.return_value = mock_query
+
+        events = [event async for event in service.iter_by_guild_id("123")]
+
+        assert [event.id for event in events] == ["a"]
+        assert mock_query.execute.call_count == 2
+
+
+class TestEventServiceFindEventsStartingBetween:
+    """Tests for EventService.find_events_starting_between method."""
+
+    @pytest.mark.asyncio
+    async def test_filters_by_half_open_window(self) -> None:
+        """Test that find_events_starting_between bounds start_at on both sides."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase)
+
+        mock_response = MagicMock()
+        mock_response.data = []
+
+        mock_query = MagicMock()
+        mock_query.select.return_value = mock_query
+        mock_query.gte.return_value = mock_query
+        mock_query.lt.return_value = mock_query
+        mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.execute.return_value = mock_response
+        mock_supabase.table.return_value = mock_query
+
+        start = datetime(2024, 1, 1, tzinfo=UTC)
+        end = datetime(2024, 1, 8, tzinfo=UTC)
+        events = await service.find_events_starting_between(start, end)
+
+        assert events == []
+        mock_query.gte.assert_called_once_with("start_at", start.isoformat())
+        mock_query.lt.assert_called_once_with("start_at", end.isoformat())
+
+    @pytest.mark.asyncio
+    async def test_schedule_projection_returns_partial_events(self) -> None:
+        """Test that SCHEDULE_COLUMNS are selected and yield partial events."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase)
+
+        mock_response = MagicMock()
+        mock_response.data = [
+            {
+                "id": "1",
+                "guild_id": "123",
+                "is_all_day": False,
+                "start_at": "2024-01-02T10:00:00Z",
+                "end_at": "2024-01-02T11:00:00Z",
+                "notifications": [{"key": 1, "num": 10, "type": "分前"}],
+                "updated_at": "2024-01-01T00:00:00Z",
+            }
+        ]
+
+        mock_query = MagicMock()
+        mock_query.select.return_value = mock_query
+        mock_query.gte.return_value = mock_query
+        mock_query.lt.return_value = mock_query
+        mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.execute.return_value = mock_response
+        mock_supabase.table.return_value = mock_query
+
+        events = await service.find_events_starting_between(
+            datetime(2024, 1, 1, tzinfo=UTC),
+            datetime(2024, 1, 8, tzinfo=UTC),
+            columns=SCHEDULE_COLUMNS,
+        )
+
+        mock_query.select.assert_called_once_with(
+            "id,guild_id,is_all_day,start_at,end_at,notifications,updated_at"
+        )
+        assert events[0].partial
+        assert events[0].created_at is None
+        assert events[0].notifications[0].to_minutes() == 10
+
+
+class TestEventServiceFindEventsUpdatedSince:
+    """Tests for EventService.find_events_updated_since method."""
+
+    @pytest.mark.asyncio
+    async def test_pages_with_updated_at_id_cursor(self) -> None:
+        """Test that changed rows are paged by (updated_at, id) instead of truncated."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase, page_size=2)
+
+        first = TestEventServiceIterEvents.make_row("a", "2024-07-01T10:00:00+00:00")
+        second = {**first, "id": "b", "updated_at": "2024-01-02T00:00:00+00:00"}
+        third = {**first, "id": "c", "updated_at": "2024-01-03T00:00:00+00:00"}
+
+        mock_query = MagicMock()
+        mock_query.select.return_value = mock_query
+        mock_query.gte.return_value = mock_query
+        mock_query.or_.return_value = mock_query
+        mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.execute.side_effect = [
+            MagicMock(data=[first, second]),
+            MagicMock(data=[third]),
+        ]
+        mock_supabase.table.return_value = mock_query
+
+        since = datetime(2024, 1, 1, tzinfo=UTC)
+        events = await service.find_events_updated_since(since)
+
+        assert [event.id for event in events] == ["a", "b", "c"]
+        mock_query.gte.assert_called_with("updated_at", since.isoformat())
+        mock_query.order.assert_any_call("updated_at")
+        mock_query.or_.assert_called_once_with(
+            'updated_at.gt."2024-01-02T00:00:00+00:00",'
+            'and(updated_at.eq."2024-01-02T00:00:00+00:00",id.gt."b")'
+        )
+
+
+class TestEventServiceFindEventVersionsBetween:
+    """Tests for EventService.find_event_versions_between method."""
+
+    @pytest.mark.asyncio
+    async def test_pages_id_and_updated_at_by_id(self) -> None:
+        """Test that (id, updated_at) is paged by id so no event looks deleted."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase, page_size=1)
+
+        mock_query = MagicMock()
+        mock_query.select.return_value = mock_query
+        mock_query.gte.return_value = mock_query
+        mock_query.lt.return_value = mock_query
+        mock_query.gt.return_value = mock_query
+        mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.execute.side_effect = [
+            MagicMock(data=[{"id": "1", "updated_at": "2024-01-02T00:00:00Z"}]),
+            MagicMock(data=[{"id": "2", "updated_at": "2024-01-03T00:00:00Z"}]),
+            MagicMock(data=[]),
+        ]
+        mock_supabase.table.return_value = mock_query
+
+        versions = await service.find_event_versions_between(
+            datetime(2024, 1, 1, tzinfo=UTC), datetime(2024, 1, 8, tzinfo=UTC)
+        )
+
+        assert versions == {
+            "1": datetime(2024, 1, 2, tzinfo=UTC),
+            "2": datetime(2024, 1, 3, tzinfo=UTC),
+        }
+        mock_query.select.assert_called_with("id,updated_at")
+        assert [c.args for c in mock_query.gt.call_args_list] == [("id", "1"), ("id", "2")]
+
+
+class TestEventServiceNextNotifyAt:
+    """Tests for EventService next_notify_at queries."""
+
+    @pytest.mark.asyncio
+    async def test_find_due_events_scans_next_notify_at(self) -> None:
+        """Test that due events are found by next_notify_at, earliest first."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase, page_size=50)
+
+        mock_query = MagicMock()
+        mock_query.select.return_value = mock_query
+        mock_query.lte.return_value = mock_query
+        mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.execute.return_value = MagicMock(data=[])
+        mock_supabase.table.return_value = mock_query
+
+        now = datetime(2024, 1, 1, tzinfo=UTC)
+        assert await service.find_due_events(now) == []
+
+        mock_query.lte.assert_called_once_with("next_notify_at", now.isoformat())
+        mock_query.order.assert_called_once_with("next_notify_at")
+        mock_query.limit.assert_called_once_with(50)
+
+    @pytest.mark.asyncio
+    async def test_advance_calls_rpc_once_per_batch(self) -> None:
+        """Test that advance_next_notify_at dedups IDs and skips empty batches."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase)
+        after = datetime(2024, 1, 1, tzinfo=UTC)
+
+        await service.advance_next_notify_at([], after)
+        mock_supabase.rpc.assert_not_called()
+
+        await service.advance_next_notify_at(["1", "2", "1"], after)
+        mock_supabase.rpc.assert_called_once_with(
+            "advance_next_notify_at", {"event_ids": ["1", "2"], "after": after.isoformat()}
+        )
+        mock_supabase.rpc.return_value.execute.assert_called_once()
+
+
+class TestEventServiceFindByIds:
+    """Tests for EventService.find_by_ids method."""
+
+    @pytest.mark.asyncio
+    async def test_skips_query_for_no_ids(self) -> None:
+        """Test that find_by_ids does not query with an empty ID list."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase)
+
+        assert await service.find_by_ids([]) == []
+        mock_supabase.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_queries_one_page_of_ids_at_a_time(self) -> None:
+        """Test that long ID lists are split into page_size queries."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase, page_size=2)
+
+        mock_query = MagicMock()
+        mock_query.select.return_value = mock_query
+        mock_query.in_.return_value = mock_query
+        mock_query.execute.return_value = MagicMock(data=[])
+        mock_supabase.table.return_value = mock_query
+
+        await service.find_by_ids(["1", "2", "3"])
+
+        assert [c.args for c in mock_query.in_.call_args_list] == [
+            ("id", ["1", "2"]),
+            ("id", ["3"]),
+        ]
+
+
+class TestEventServiceLoadDetails:
+    """Tests for EventService.load_details method."""
+
+    @staticmethod
+    def make_partial(event_id: str) -> Event:
+        """Create a partial event as loaded with SCHEDULE_COLUMNS."""
+        return Event.from_dict(
+            {
+                "id": event_id,
+                "guild_id": "123",
+                "is_all_day": False,
+                "start_at": "2024-01-02T10:00:00Z",
+                "end_at": "2024-01-02T11:00:00Z",
+                "notifications": [],
+                "updated_at": "2024-01-01T00:00:00Z",
+            }
+        )
+
+    @pytest.mark.asyncio
+    async def test_completes_partial_events_and_drops_deleted(self) -> None:
+        """Test that details are fetched in one query and merged into the events."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase)
+
+        mock_response = MagicMock()
+        mock_response.data = [
+            {
+                "id": "1",
+                "name": "Meeting",
+                "description": "Agenda",
+                "color": "#FF0000",
+                "location": None,
+                "channel_id": None,
+                "channel_name": None,
+                "created_at": "2023-12-31T00:00:00Z",
+            }
+        ]
+
+        mock_query = MagicMock()
+        mock_query.select.return_value = mock_query
+        mock_query.in_.return_value = mock_query
+        mock_query.execute.return_value = mock_response
+        mock_supabase.table.return_value = mock_query
+
+        events = await service.load_details([self.make_partial("1"), self.make_partial("2")])
+
+        mock_query.in_.assert_called_once_with("id", ["1", "2"])
+        assert list(events) == ["1"]
+        assert events["1"].name == "Meeting"
+        assert events["1"].description == "Agenda"
+        assert events["1"].start_at == datetime(2024, 1, 2, 10, tzinfo=UTC)
+        assert not events["1"].partial
+
+    @pytest.mark.asyncio
+    async def test_skips_query_for_complete_events(self) -> None:
+        """Test that complete events are returned without a query."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase)
+        event = self.make_partial("1").with_details({"id": "1", "name": "Meeting"})
+
+        assert await service.load_details([event]) == {"1": event}
+        mock_supabase.table.assert_not_called()
+
+
 class TestEventServiceCreate:
     """Tests for EventService.create method."""
 
@@ -280,6 +681,43 @@ class TestEventServiceCreate:
         assert event.name == "New Event"
         assert event.guild_id == "123"
         mock_query.insert.assert_called_once_with(event_data.to_dict())
+        assert "next_notify_at" not in mock_query.insert.call_args[0][0]
+
+    @pytest.mark.asyncio
+    async def test_sets_next_notify_at_when_tracked(self) -> None:
+        """Test that tracked creates write the first fire time still ahead."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase, track_next_notify=True)
+        start_at = datetime.now(UTC).replace(microsecond=0) + timedelta(days=2)
+
+        event_data = EventCreate(
+            guild_id="123",
+            name="New Event",
+            start_at=start_at,
+            end_at=start_at + timedelta(hours=1),
+            notifications=[{"key": 0, "num": 1, "type": "日前"}],
+        )
+
+        mock_response = MagicMock()
+        mock_response.data = [
+            {
+                **event_data.to_dict(),
+                "id": "1",
+                "created_at": "2024-01-01T00:00:00Z",
+                "updated_at": "2024-01-01T00:00:00Z",
+            }
+        ]
+
+        mock_query = MagicMock()
+        mock_query.insert.return_value = mock_query
+        mock_query.execute.return_value = mock_response
+        mock_supabase.table.return_value = mock_query
+
+        event = await service.create(event_data)
+
+        row = mock_query.insert.call_args[0][0]
+        assert datetime.fromisoformat(row["next_notify_at"]) == start_at - timedelta(days=1)
+        assert event.id == "1"
 
 
 class TestEventServiceGetSettings:
@@ -326,6 +764,46 @@ class TestEventServiceGetSettings:
         assert settings is None
 
 
+class TestEventServiceGetSettingsMany:
+    """Tests for EventService.get_settings_many method."""
+
+    @pytest.mark.asyncio
+    async def test_returns_settings_keyed_by_guild_id(self) -> None:
+        """Test that get_settings_many issues one in_ query for distinct guild IDs."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase)
+
+        mock_response = MagicMock()
+        mock_response.data = [
+            {"id": 1, "guild_id": "123", "channel_id": "456"},
+            {"id": 2, "guild_id": "789", "channel_id": "012"},
+        ]
+
+        mock_query = MagicMock()
+        mock_query.select.return_value = mock_query
+        mock_query.in_.return_value = mock_query
+        mock_query.execute.return_value = mock_response
+        mock_supabase.table.return_value = mock_query
+
+        settings = await service.get_settings_many(["123", "789", "123", "555"])
+
+        assert set(settings) == {"123", "789"}
+        assert settings["789"].channel_id == "012"
+        mock_query.in_.assert_called_once_with("guild_id", ["123", "789", "555"])
+        mock_query.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_skips_query_for_no_guilds(self) -> None:
+        """Test that get_settings_many does not query with an empty ID list."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase)
+
+        settings = await service.get_settings_many([])
+
+        assert settings == {}
+        mock_supabase.table.assert_not_called()
+
+
 class TestEventServiceCreateSettings:
     """Tests for EventService.create_settings method."""
 
@@ -374,3 +852,97 @@ class TestEventServiceUpdateSettings:
         assert settings.channel_id == "999"
         mock_query.update.assert_called_once_with({"channel_id": "999"})
         mock_query.eq.assert_called_once_with("guild_id", "123")
+
+
+class TestEventServiceChannelMap:
+    """Tests for the EventService notification channel map."""
+
+    @pytest.mark.asyncio
+    async def test_load_channels_pages_by_id(self) -> None:
+        """Test that load_channels pages through event_settings by id."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase, page_size=1)
+
+        mock_query = MagicMock()
+        mock_query.select.return_value = mock_query
+        mock_query.gt.return_value = mock_query
+        mock_query.order.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.execute.side_effect = [
+            MagicMock(data=[{"id": 1, "guild_id": "123", "channel_id": "456"}]),
+            MagicMock(data=[]),
+        ]
+        mock_supabase.table.return_value = mock_query
+
+        await service.load_channels()
+
+        mock_query.gt.assert_called_once_with("id", 1)
+        assert service.channels.loaded
+        assert len(service.channels) == 1
+
+    @pytest.mark.asyncio
+    async def test_settings_are_served_from_loaded_map(self) -> None:
+        """Test that lookups, including misses, cost no query once loaded."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase)
+        service.channels.replace([EventSettings(id=1, guild_id="123", channel_id="456")])
+
+        assert await service.get_settings("999") is None
+        settings = await service.get_settings_many(["123", "999"])
+
+        assert list(settings) == ["123"]
+        mock_supabase.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_settings_writes_update_map(self) -> None:
+        """Test that create_settings and update_settings keep the map current."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase)
+        service.channels.replace([])
+
+        mock_query = MagicMock()
+        mock_query.insert.return_value = mock_query
+        mock_query.execute.return_value = MagicMock(
+            data=[{"id": 1, "guild_id": "123", "channel_id": "456"}]
+        )
+        mock_supabase.table.return_value = mock_query
+
+        await service.create_settings("123", "456")
+
+        settings = await service.get_settings("123")
+        assert settings is not None
+        assert settings.channel_id == "456"
+
+    @pytest.mark.asyncio
+    async def test_reconcile_skips_reload_when_checksum_matches(self) -> None:
+        """Test that a matching checksum does not reload the table."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase)
+        service.channels.replace([EventSettings(id=1, guild_id="123", channel_id="456")])
+
+        mock_rpc = MagicMock()
+        mock_rpc.execute.return_value = MagicMock(
+            data=[{"row_count": 1, "checksum": service.channels.checksum()}]
+        )
+        mock_supabase.rpc.return_value = mock_rpc
+
+        assert await service.reconcile_channels() is False
+        mock_supabase.rpc.assert_called_once_with("event_settings_checksum")
+        mock_supabase.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reconcile_reloads_on_mismatch_or_missing_function(self) -> None:
+        """Test that a checksum mismatch or a missing function reloads the map."""
+        mock_supabase = MagicMock()
+        service = EventService(mock_supabase)
+        service.channels.replace([EventSettings(id=1, guild_id="123", channel_id="456")])
+        service.load_channels = AsyncMock()  # type: ignore[method-assign]
+
+        mock_rpc = MagicMock()
+        mock_rpc.execute.return_value = MagicMock(data=[{"row_count": 1, "checksum": "stale"}])
+        mock_supabase.rpc.return_value = mock_rpc
+        assert await service.reconcile_channels() is True
+
+        mock_rpc.execute.side_effect = APIError({"message": "function not found"})
+        assert await service.reconcile_channels() is True
+        assert service.load_channels.call_count == 2
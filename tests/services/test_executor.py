@@ -0,0 +1,63 @@
+"""Tests for QueryExecutor."""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.services import QueryExecutor
+
+
+class TestQueryExecutor:
+    """Tests for QueryExecutor."""
+
+    @pytest.mark.asyncio
+    async def test_runs_call_off_the_event_loop(self) -> None:
+        """Test that calls run on a worker thread and return their result."""
+        executor = QueryExecutor(max_workers=2)
+        loop_thread = threading.get_ident()
+
+        result = await executor.run(threading.get_ident)
+
+        assert result != loop_thread
+        stats = executor.stats()
+        assert stats.completed == 1
+        assert stats.queue_depth == 0
+        assert stats.running == 0
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_reports_queue_depth_when_saturated(self) -> None:
+        """Test that calls beyond max_workers are counted as queued."""
+        executor = QueryExecutor(max_workers=1)
+        release = threading.Event()
+
+        blocked = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: "done"))
+        await asyncio.sleep(0.05)
+
+        assert executor.queue_depth == 1
+        assert executor.stats().running == 1
+
+        release.set()
+        assert await queued == "done"
+        await blocked
+
+        stats = executor.stats()
+        assert stats.completed == 2
+        assert stats.max_wait > 0
+        assert stats.average_wait > 0
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_propagates_exceptions(self) -> None:
+        """Test that exceptions raised by the call reach the awaiting caller."""
+        executor = QueryExecutor(max_workers=1)
+
+        def fail() -> None:
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await executor.run(fail)
+        assert executor.stats().running == 0
+        executor.shutdown()
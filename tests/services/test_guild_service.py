@@ -1,5 +1,6 @@
 """Tests for GuildService."""
 
+import asyncio
 from unittest.mock import MagicMock
 
 import pytest
@@ -208,6 +209,91 @@ class TestGuildServiceGetConfig:
         assert config is None
 
 
+class TestGuildServiceConfigCache:
+    """Tests for the GuildService config cache."""
+
+    @staticmethod
+    def make_supabase(data: list[dict]) -> tuple[MagicMock, MagicMock]:
+        """Create a Supabase mock whose queries return ``data``."""
+        mock_supabase = MagicMock()
+        mock_query = MagicMock()
+        mock_query.select.return_value = mock_query
+        mock_query.eq.return_value = mock_query
+        mock_query.upsert.return_value = mock_query
+        mock_query.execute.return_value = MagicMock(data=data)
+        mock_supabase.table.return_value = mock_query
+        return mock_supabase, mock_query
+
+    @pytest.mark.asyncio
+    async def test_serves_repeated_lookups_from_cache(self) -> None:
+        """Test that a second get_config does not query."""
+        mock_supabase, mock_query = self.make_supabase([{"guild_id": "123", "restricted": True}])
+        service = GuildService(mock_supabase)
+
+        first = await service.get_config("123")
+        second = await service.get_config("123")
+
+        assert first == second
+        assert mock_query.execute.call_count == 1
+        stats = service.config_cache.stats()
+        assert (stats.hits, stats.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_caches_missing_config(self) -> None:
+        """Test that guilds without a config row are negatively cached."""
+        mock_supabase, mock_query = self.make_supabase([])
+        service = GuildService(mock_supabase)
+
+        assert await service.get_config("123") is None
+        assert await service.get_config("123") is None
+        assert mock_query.execute.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_upsert_invalidates_cached_config(self) -> None:
+        """Test that upsert_config makes the next get_config query again."""
+        mock_supabase, mock_query = self.make_supabase([{"guild_id": "123", "restricted": True}])
+        service = GuildService(mock_supabase)
+
+        await service.get_config("123")
+        await service.upsert_config("123", True)
+        await service.get_config("123")
+
+        assert mock_query.execute.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_invalidation_discards_in_flight_fetch(self) -> None:
+        """Test that a fetch racing an invalidation neither caches nor shares its old row."""
+        mock_supabase, _ = self.make_supabase([])
+        service = GuildService(mock_supabase)
+        entered = asyncio.Event()
+        release = asyncio.Event()
+        rows = [
+            [{"guild_id": "123", "restricted": False}],
+            [{"guild_id": "123", "restricted": True}],
+        ]
+
+        async def run(endpoint: str, fn: object, idempotent: bool = True) -> MagicMock:
+            data = rows.pop(0)
+            if not entered.is_set():
+                entered.set()
+                await release.wait()
+            return MagicMock(data=data)
+
+        service.resilience.run = run  # type: ignore[method-assign]
+        stale = asyncio.create_task(service.get_config("123"))
+        await entered.wait()
+        service.invalidate_config("123")
+
+        # Joining the stale fetch would wait for release forever
+        fresh = await asyncio.wait_for(service.get_config("123"), timeout=5)
+        release.set()
+
+        assert fresh is not None and fresh.restricted
+        assert (await stale) is not None and not (await stale).restricted
+        cached = await service.get_config("123")
+        assert cached is not None and cached.restricted
+
+
 class TestGuildServiceUpsertConfig:
     """Tests for GuildService.upsert_config method."""
 
@@ -250,3 +336,62 @@ class TestGuildServiceUpsertConfig:
         assert config.guild_id == "123"
         assert config.restricted is True
         mock_query.upsert.assert_called_once_with({"guild_id": "123", "restricted": True})
+
+
+class TestGuildServiceBulk:
+    """Tests for GuildService bulk methods."""
+
+    @pytest.mark.asyncio
+    async def test_upsert_leaves_locale_to_the_table(self) -> None:
+        """Test that upsert conflicts on guild_id and does not overwrite locale."""
+        mock_supabase = MagicMock()
+        mock_query = MagicMock()
+        mock_query.upsert.return_value = mock_query
+        mock_query.execute.return_value = MagicMock(
+            data=[{"id": 1, "guild_id": "123", "name": "Test", "avatar_url": None, "locale": "en"}]
+        )
+        mock_supabase.table.return_value = mock_query
+        service = GuildService(mock_supabase)
+
+        guild = await service.upsert(GuildCreate(guild_id="123", name="Test"))
+
+        row = mock_query.upsert.call_args.args[0]
+        assert row == {"guild_id": "123", "name": "Test", "avatar_url": None}
+        assert mock_query.upsert.call_args.kwargs["on_conflict"] == "guild_id"
+        assert guild.locale == "en"
+
+    @pytest.mark.asyncio
+    async def test_upsert_many_and_delete_many_are_chunked(self) -> None:
+        """Test that bulk writes are split into BULK_CHUNK_SIZE requests."""
+        mock_supabase = MagicMock()
+        mock_query = MagicMock()
+        mock_query.upsert.return_value = mock_query
+        mock_query.delete.return_value = mock_query
+        mock_query.in_.return_value = mock_query
+        mock_supabase.table.return_value = mock_query
+        service = GuildService(mock_supabase)
+
+        await service.upsert_many(GuildCreate(guild_id=str(i), name="G") for i in range(450))
+        await service.delete_many(str(i) for i in range(250))
+
+        assert [len(c.args[0]) for c in mock_query.upsert.call_args_list] == [200, 200, 50]
+        assert [len(c.args[1]) for c in mock_query.in_.call_args_list] == [200, 50]
+        assert mock_query.execute.call_count == 5
+
+    @pytest.mark.asyncio
+    async def test_find_all_pages_by_guild_id(self) -> None:
+        """Test that find_all follows a guild_id keyset cursor across pages."""
+        mock_supabase = MagicMock()
+        mock_query = MagicMock()
+        for method in ("select", "gt", "order", "limit"):
+            getattr(mock_query, method).return_value = mock_query
+        rows = [{"guild_id": f"{i:04d}", "name": "G", "avatar_url": None} for i in range(1001)]
+        mock_query.execute.side_effect = [MagicMock(data=rows[:1000]), MagicMock(data=rows[1000:])]
+        mock_supabase.table.return_value = mock_query
+        service = GuildService(mock_supabase)
+
+        guilds = await service.find_all()
+
+        assert len(guilds) == 1001
+        mock_query.select.assert_called_with("guild_id,name,avatar_url")
+        mock_query.gt.assert_called_once_with("guild_id", "0999")
@@ -0,0 +1,98 @@
+"""Tests for HttpPool."""
+
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from supabase import ClientOptions, create_client
+
+from src.services import HttpPool
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    """Serve ``[]`` over keep-alive HTTP/1.1 on a local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestHttpPool:
+    """Tests for HttpPool."""
+
+    def test_reuses_keep_alive_connection(self, server_url: str) -> None:
+        """Test that sequential requests share one pooled connection."""
+        pool = HttpPool(max_connections=4)
+
+        for _ in range(3):
+            pool.client.get(f"{server_url}/rest/v1/events").raise_for_status()
+
+        stats = pool.stats()
+        assert stats.requests == 3
+        assert stats.connections == 1
+        assert stats.idle == 1
+        assert stats.active == 0
+        assert stats.max_connections == 4
+        pool.close()
+
+    def test_records_response_bytes_per_query(self, server_url: str) -> None:
+        """Test that response sizes are grouped by table and projection."""
+        pool = HttpPool()
+
+        pool.client.get(f"{server_url}/rest/v1/events", params={"select": "id", "id": "eq.1"})
+        pool.client.get(f"{server_url}/rest/v1/events", params={"select": "id", "id": "eq.2"})
+        pool.client.get(f"{server_url}/rest/v1/guilds")
+
+        stats = pool.response_stats()
+        assert set(stats) == {"GET events?select=id", "GET guilds"}
+        assert stats["GET events?select=id"].responses == 2
+        assert stats["GET events?select=id"].bytes == 4
+        assert stats["GET events?select=id"].average_bytes == 2
+        assert stats["GET guilds"].wire_bytes == 2
+        pool.close()
+
+    def test_applies_timeouts(self) -> None:
+        """Test that connect and read timeouts are set on the client."""
+        pool = HttpPool(connect_timeout=2.0, read_timeout=15.0)
+
+        assert pool.client.timeout.connect == 2.0
+        assert pool.client.timeout.read == 15.0
+        pool.close()
+
+    def test_http2_can_be_disabled(self) -> None:
+        """Test that HTTP/2 negotiation follows the flag."""
+        assert HttpPool(http2=False).http2 is False
+
+    def test_supabase_uses_shared_client(self, server_url: str) -> None:
+        """Test that PostgREST queries go through the shared pool."""
+        pool = HttpPool()
+        supabase = create_client(
+            server_url, "test_key", options=ClientOptions(httpx_client=pool.client)
+        )
+
+        supabase.table("events").select("*").execute()
+        supabase.table("guilds").select("*").execute()
+
+        assert supabase.postgrest.session is pool.client
+        assert pool.stats().requests == 2
+        assert pool.stats().connections == 1
+        pool.close()
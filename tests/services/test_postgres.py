@@ -0,0 +1,163 @@
+"""Tests for the asyncpg storage backend."""
+
+import uuid
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("asyncpg")
+
+from src.models import EventCreate, EventSettings  # noqa: E402
+from src.services.postgres import (  # noqa: E402
+    PostgresEventService,
+    PostgresGuildService,
+    event_from_record,
+)
+
+START = datetime(2024, 7, 1, 10, 0, tzinfo=UTC)
+
+
+def make_row(start_at: datetime = START) -> dict:
+    """Create an events row as asyncpg decodes it."""
+    return {
+        "id": uuid.uuid4(),
+        "guild_id": "123",
+        "name": "Event",
+        "description": None,
+        "color": "#FF0000",
+        "is_all_day": False,
+        "start_at": start_at,
+        "end_at": start_at + timedelta(hours=1),
+        "location": None,
+        "channel_id": None,
+        "channel_name": None,
+        "notifications": [{"key": 0, "num": 10, "type": "分前"}],
+        "created_at": START,
+        "updated_at": START,
+    }
+
+
+def make_pool() -> MagicMock:
+    """Create an asyncpg pool mock."""
+    pool = MagicMock()
+    pool.fetch = AsyncMock(return_value=[])
+    pool.fetchrow = AsyncMock(return_value=None)
+    pool.execute = AsyncMock()
+    return pool
+
+
+class TestEventFromRecord:
+    """Tests for event_from_record."""
+
+    def test_builds_event_from_decoded_row(self) -> None:
+        """Test that native values are used without string parsing."""
+        row = make_row()
+
+        event = event_from_record(row)  # type: ignore[arg-type]
+
+        assert event.id == str(row["id"])
+        assert event.start_at == START
+        assert event.notifications[0].to_minutes() == 10
+
+
+class TestPostgresEventService:
+    """Tests for PostgresEventService."""
+
+    @pytest.mark.asyncio
+    async def test_pages_with_row_comparison_cursor(self) -> None:
+        """Test that later pages continue after the last (start_at, id)."""
+        pool = make_pool()
+        first, second = make_row(), make_row(START + timedelta(hours=1))
+        pool.fetch.side_effect = [[first], [second], []]
+        service = PostgresEventService(pool, page_size=1)
+
+        events = [event async for event in service.iter_future_events(START)]
+
+        assert len(events) == 2
+        assert pool.fetch.call_count == 3
+        sql, *args = pool.fetch.call_args_list[1].args
+        assert "(start_at, id) > ($2, $3::uuid)" in sql
+        assert args == [START, first["start_at"], first["id"], 1]
+
+    @pytest.mark.asyncio
+    async def test_pages_updated_since_with_updated_at_cursor(self) -> None:
+        """Test that changed rows are paged by (updated_at, id)."""
+        pool = make_pool()
+        first = make_row()
+        pool.fetch.side_effect = [[first], []]
+        service = PostgresEventService(pool, page_size=1)
+
+        events = await service.find_events_updated_since(START)
+
+        assert len(events) == 1
+        sql, *args = pool.fetch.call_args_list[1].args
+        assert "(updated_at, id) > ($2, $3::uuid) ORDER BY updated_at, id" in sql
+        assert args == [START, first["updated_at"], first["id"], 1]
+
+    @pytest.mark.asyncio
+    async def test_reconcile_compares_checksum_in_sql(self) -> None:
+        """Test that a matching checksum skips the reload."""
+        pool = make_pool()
+        service = PostgresEventService(pool)
+        service.channels.replace([EventSettings(id=1, guild_id="123", channel_id="456")])
+        pool.fetchrow.return_value = {"row_count": 1, "checksum": service.channels.checksum()}
+
+        assert await service.reconcile_channels() is False
+        pool.fetch.assert_not_called()
+
+        pool.fetchrow.return_value = {"row_count": 2, "checksum": "stale"}
+        assert await service.reconcile_channels() is True
+        pool.fetch.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_create_writes_next_notify_at_only_when_tracked(self) -> None:
+        """Test that next_notify_at is inserted once the column is tracked."""
+        data = EventCreate(
+            guild_id="123",
+            name="Event",
+            start_at=datetime.now(UTC) + timedelta(days=1),
+            end_at=datetime.now(UTC) + timedelta(days=1, hours=1),
+        )
+        for tracked in (False, True):
+            pool = make_pool()
+            pool.fetchrow.return_value = make_row()
+            await PostgresEventService(pool, track_next_notify=tracked).create(data)
+
+            sql, *args = pool.fetchrow.call_args.args
+            assert ("next_notify_at" in sql) is tracked
+            assert len(args) == sql.count("$")
+        assert args[-1] == data.start_at.astimezone(args[-1].tzinfo)
+
+    @pytest.mark.asyncio
+    async def test_find_due_events_uses_next_notify_at(self) -> None:
+        """Test that due events are read by next_notify_at with the page size."""
+        pool = make_pool()
+        pool.fetch.return_value = [make_row()]
+        service = PostgresEventService(pool, page_size=50)
+
+        events = await service.find_due_events(START)
+
+        assert len(events) == 1
+        sql, *args = pool.fetch.call_args.args
+        assert "WHERE next_notify_at <= $1 ORDER BY next_notify_at" in sql
+        assert args == [START, 50]
+
+
+class TestPostgresGuildService:
+    """Tests for PostgresGuildService."""
+
+    @pytest.mark.asyncio
+    async def test_config_is_cached_and_invalidated_by_upsert(self) -> None:
+        """Test that get_config is cached until upsert_config."""
+        pool = make_pool()
+        pool.fetchrow.return_value = {"guild_id": "123", "restricted": True}
+        service = PostgresGuildService(pool)
+
+        await service.get_config("123")
+        await service.get_config("123")
+        assert pool.fetchrow.call_count == 1
+
+        await service.upsert_config("123", False)
+        await service.get_config("123")
+        assert pool.fetchrow.call_count == 3
@@ -0,0 +1,231 @@
+"""Tests for the local read replica."""
+
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.models import SCHEDULE_COLUMNS, EventSettings, GuildConfig
+from src.services import EventService, GuildService, LocalReplica, QueryExecutor, ReplicaSync
+from src.services.change_feed import RowChange
+from src.services.resilience import Resilience
+
+SYNCED_AT = datetime(2024, 1, 10, tzinfo=UTC)
+
+
+def event_row(
+    event_id: str, guild_id: str = "123", start_at: str = "2024-01-15T10:00:00Z", **overrides: Any
+) -> dict[str, Any]:
+    """Create an events row as PostgREST returns it."""
+    return {
+        "id": event_id,
+        "guild_id": guild_id,
+        "name": f"Event {event_id}",
+        "description": None,
+        "color": "#FF0000",
+        "is_all_day": False,
+        "start_at": start_at,
+        "end_at": start_at,
+        "location": None,
+        "channel_id": None,
+        "channel_name": None,
+        "notifications": [{"key": 1, "num": 10, "type": "分前"}],
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+        **overrides,
+    }
+
+
+def loaded_replica(*rows: dict[str, Any]) -> LocalReplica:
+    """Create an in-memory replica with every table loaded."""
+    replica = LocalReplica()
+    replica.replace_events(rows, SYNCED_AT)
+    replica.replace_settings([EventSettings(id=1, guild_id="123", channel_id="555")], SYNCED_AT)
+    replica.replace_configs([GuildConfig(guild_id="123", restricted=True)], SYNCED_AT)
+    return replica
+
+
+def mock_supabase(tables: dict[str, list[dict[str, Any]]]) -> MagicMock:
+    """Create a mock Supabase client that returns ``tables[name]`` for any query."""
+    supabase = MagicMock()
+    queries: dict[str, MagicMock] = {}
+
+    def table(name: str) -> MagicMock:
+        if name not in queries:
+            query = MagicMock()
+            for method in ("select", "insert", "eq", "gt", "gte", "lt", "in_", "order", "limit"):
+                getattr(query, method).return_value = query
+            query.execute.side_effect = lambda name=name: MagicMock(data=tables[name])
+            queries[name] = query
+        return queries[name]
+
+    supabase.table.side_effect = table
+    return supabase
+
+
+class TestLocalReplica:
+    """Tests for LocalReplica."""
+
+    def test_is_not_loaded_until_every_table_is(self) -> None:
+        """Test that reads are not served from a partially loaded replica."""
+        replica = LocalReplica()
+        replica.replace_events([event_row("a")], SYNCED_AT)
+        replica.replace_settings([], SYNCED_AT)
+
+        assert not replica.loaded
+        replica.replace_configs([], SYNCED_AT)
+        assert replica.loaded
+        assert replica.synced_at("events") == SYNCED_AT
+
+    def test_range_reads_are_ordered_by_start(self) -> None:
+        """Test guild and start_at range reads across time zones."""
+        replica = loaded_replica(
+            event_row("late", start_at="2024-01-15T12:00:00+00:00"),
+            event_row("early", start_at="2024-01-15T20:00:00+09:00"),
+            event_row("other", guild_id="999", start_at="2024-01-15T11:00:00Z"),
+        )
+        now = datetime(2024, 1, 15, 10, 0, tzinfo=UTC)
+
+        assert [e.id for e in replica.events_by_guild("123", "future", now)] == ["early", "late"]
+        assert replica.events_by_guild("123", "past", now) == []
+        assert [e.id for e in replica.events_starting_between(now, now + timedelta(hours=2))] == [
+            "early",
+            "other",
+        ]
+        assert replica.events_by_ids(["late", "missing"])[0].name == "Event late"
+
+    def test_range_reads_use_indexes(self) -> None:
+        """Test that guild and start_at reads are index range scans."""
+        replica = LocalReplica()
+        plan = replica._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT row FROM events WHERE guild_id = ? AND start_at >= ? "
+            "ORDER BY start_at, id",
+            ("123", "2024"),
+        ).fetchall()
+
+        assert "events_guild_start" in str(plan)
+
+    def test_retain_events_keeps_rows_synced_later(self) -> None:
+        """Test that reconciling does not delete events written after the ID scan."""
+        replica = loaded_replica(event_row("kept"), event_row("deleted"))
+        replica.upsert_events([event_row("new")], synced_at=SYNCED_AT + timedelta(minutes=5))
+
+        removed = replica.retain_events(["kept"], synced_before=SYNCED_AT + timedelta(minutes=1))
+
+        assert removed == 1
+        assert {e.id for e in replica.events_by_ids(["kept", "deleted", "new"])} == {"kept", "new"}
+
+    def test_survives_restart(self, tmp_path: Path) -> None:
+        """Test that a reopened replica serves reads without reloading."""
+        path = str(tmp_path / "replica.db")
+        replica = LocalReplica(path)
+        replica.replace_events([event_row("a")], SYNCED_AT)
+        replica.replace_settings([], SYNCED_AT)
+        replica.replace_configs([GuildConfig(guild_id="123", restricted=True)], SYNCED_AT)
+        replica.close()
+
+        reopened = LocalReplica(path)
+        assert reopened.loaded
+        assert len(reopened) == 1
+        assert reopened.config("123") == GuildConfig(guild_id="123", restricted=True)
+        reopened.close()
+
+
+class TestReplicaSync:
+    """Tests for ReplicaSync."""
+
+    @pytest.mark.asyncio
+    async def test_first_sync_loads_every_table(self) -> None:
+        """Test the bulk initial load."""
+        supabase = mock_supabase(
+            {
+                "events": [event_row("a")],
+                "event_settings": [{"id": 1, "guild_id": "123", "channel_id": "555"}],
+                "guild_config": [{"guild_id": "123", "restricted": True}],
+            }
+        )
+        replica = LocalReplica()
+        sync = ReplicaSync(replica, supabase, Resilience(QueryExecutor(max_workers=1)))
+
+        await sync.sync()
+
+        assert replica.loaded
+        assert len(replica) == 1
+        assert replica.settings("123") == EventSettings(id=1, guild_id="123", channel_id="555")
+
+    @pytest.mark.asyncio
+    async def test_later_syncs_fetch_updated_events(self) -> None:
+        """Test that incremental syncs filter on updated_at and advance the watermark."""
+        supabase = mock_supabase({"events": [event_row("a", name="Renamed")]})
+        replica = loaded_replica(event_row("a"))
+        sync = ReplicaSync(replica, supabase, Resilience(QueryExecutor(max_workers=1)))
+
+        await sync.sync()
+
+        query = supabase.table("events")
+        column, since = query.gte.call_args.args
+        assert column == "updated_at"
+        assert datetime.fromisoformat(since) < SYNCED_AT
+        assert replica.events_by_ids(["a"])[0].name == "Renamed"
+        watermark = replica.synced_at("events")
+        assert watermark is not None and watermark > SYNCED_AT
+
+    def test_applies_pushed_changes(self) -> None:
+        """Test that change feed rows update and delete replica rows."""
+        replica = loaded_replica(event_row("a"))
+        sync = ReplicaSync(replica, MagicMock(), Resilience(QueryExecutor(max_workers=1)))
+
+        sync.apply_change(RowChange("events", "INSERT", record=event_row("b")))
+        sync.apply_change(RowChange("events", "DELETE", old_record={"id": "a"}))
+        sync.apply_change(RowChange("guild_config", "DELETE", old_record={"guild_id": "123"}))
+        sync.apply_change(RowChange("event_settings", "DELETE", old_record={"id": 1}))
+
+        assert [e.id for e in replica.events_by_ids(["a", "b"])] == ["b"]
+        assert replica.config("123") is None
+        assert replica.settings("123") is None
+
+
+class TestServicesWithReplica:
+    """Tests for services reading from a loaded replica."""
+
+    @pytest.mark.asyncio
+    async def test_event_reads_do_not_query_supabase(self) -> None:
+        """Test that event and settings reads are served locally."""
+        supabase = MagicMock()
+        service = EventService(supabase, replica=loaded_replica(event_row("a")))
+        start = datetime(2024, 1, 15, tzinfo=UTC)
+
+        events = await service.find_events_starting_between(
+            start, start + timedelta(days=1), columns=SCHEDULE_COLUMNS
+        )
+        settings = await service.get_settings_many(["123", "999"])
+
+        assert [e.id for e in events] == ["a"]
+        assert list(settings) == ["123"]
+        supabase.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_writes_go_to_supabase_and_replica(self) -> None:
+        """Test that created events are visible locally without a sync."""
+        supabase = mock_supabase({"events": [event_row("new")]})
+        replica = loaded_replica()
+        service = EventService(supabase, replica=replica)
+
+        await service.create(MagicMock(to_dict=MagicMock(return_value={})))
+
+        supabase.table("events").insert.assert_called_once()
+        assert [e.id for e in await service.find_by_ids(["new"])] == ["new"]
+
+    @pytest.mark.asyncio
+    async def test_config_read_falls_back_until_loaded(self) -> None:
+        """Test that an unloaded replica does not answer config reads."""
+        supabase = mock_supabase({"guild_config": [{"guild_id": "123", "restricted": False}]})
+        replica = LocalReplica()
+        service = GuildService(supabase, replica=replica)
+
+        assert await service.get_config("123") == GuildConfig(guild_id="123", restricted=False)
+
+        service = GuildService(supabase, replica=loaded_replica())
+        assert await service.get_config("123") == GuildConfig(guild_id="123", restricted=True)
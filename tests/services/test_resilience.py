@@ -0,0 +1,250 @@
+"""Tests for the Supabase resilience layer."""
+
+import asyncio
+import json
+import time
+from collections.abc import Callable
+
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+from supabase import Client, ClientOptions, create_client
+
+from src.models import GuildCreate
+from src.services import (
+    CircuitBreaker,
+    CircuitOpenError,
+    EventService,
+    GuildService,
+    QueryExecutor,
+    Resilience,
+    RetryPolicy,
+)
+from src.services.resilience import is_transient
+
+
+class FakePostgrest:
+    """Local stand-in for PostgREST that replays scripted responses."""
+
+    def __init__(self, *responses: httpx.Response | Exception):
+        self.responses = list(responses)
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def client(self) -> Client:
+        """Create a Supabase client whose HTTP traffic goes to this fake."""
+        http = httpx.Client(transport=httpx.MockTransport(self))
+        return create_client(
+            "http://fake.supabase.local", "test_key", options=ClientOptions(httpx_client=http)
+        )
+
+
+def ok(rows: list[dict]) -> httpx.Response:
+    """A successful PostgREST response."""
+    return httpx.Response(200, json=rows)
+
+
+def gateway_error(status: int = 502) -> httpx.Response:
+    """A non-JSON error page from the gateway in front of PostgREST."""
+    return httpx.Response(status, text="<html>Bad Gateway</html>")
+
+
+async def no_sleep(delay: float) -> None:
+    """Skip backoff delays in tests."""
+
+
+def make_resilience(
+    attempts: int = 3, threshold: int = 5, clock: Callable[[], float] | None = None
+) -> Resilience:
+    """Create a Resilience that does not sleep between retries."""
+    return Resilience(
+        QueryExecutor(max_workers=2),
+        retry=RetryPolicy(attempts=attempts),
+        breaker=CircuitBreaker(
+            failure_threshold=threshold, reset_timeout=30.0, clock=clock or time.monotonic
+        ),
+        sleep=no_sleep,
+    )
+
+
+GUILD_ROW = {"id": 1, "guild_id": "123", "name": "Test", "avatar_url": None, "locale": "ja"}
+
+
+class TestIsTransient:
+    """Tests for is_transient."""
+
+    def test_classifies_errors(self) -> None:
+        """Test that outages are transient and request errors are not."""
+        assert is_transient(httpx.ReadTimeout("timed out"))
+        assert is_transient(httpx.ConnectError("refused"))
+        assert is_transient(APIError({"code": 503, "message": "JSON could not be generated"}))
+        assert is_transient(APIError({"code": "PGRST001", "message": "no connection"}))
+        assert is_transient(APIError({"code": "57014", "message": "statement timeout"}))
+        assert not is_transient(APIError({"code": "23505", "message": "duplicate key"}))
+        assert not is_transient(APIError({"code": "PGRST202", "message": "no function"}))
+        assert not is_transient(ValueError("bad"))
+
+
+class TestRetryPolicy:
+    """Tests for RetryPolicy."""
+
+    def test_backoff_is_jittered_and_capped(self) -> None:
+        """Test that delays stay within the exponential envelope and max_delay."""
+        policy = RetryPolicy(base_delay=0.1, max_delay=0.5)
+
+        assert all(0 <= policy.backoff(0) <= 0.1 for _ in range(100))
+        assert all(0 <= policy.backoff(2) <= 0.4 for _ in range(100))
+        assert all(0 <= policy.backoff(10) <= 0.5 for _ in range(100))
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker."""
+
+    def test_opens_after_threshold_and_probes_after_timeout(self) -> None:
+        """Test closed -> open -> half-open -> closed transitions."""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=lambda: now[0])
+
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        now[0] = 10.0
+        breaker.before_call()  # the probe
+        assert breaker.state == "half_open"
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()  # only one probe at a time
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+        breaker.before_call()
+
+    def test_failed_probe_reopens(self) -> None:
+        """Test that a failing probe opens the circuit for another timeout."""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0, clock=lambda: now[0])
+        breaker.record_failure()
+
+        now[0] = 10.0
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        now[0] = 15.0
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+
+class TestResilienceCancellation:
+    """Tests for cancelled calls."""
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_releases_half_open(self) -> None:
+        """Test that a cancelled probe lets the next call probe instead of failing fast."""
+        now = [0.0]
+        resilience = make_resilience(attempts=1, threshold=1, clock=lambda: now[0])
+        resilience.breaker.record_failure()
+        now[0] = 30.0
+
+        async def cancelled(fn: Callable[[], object]) -> object:
+            raise asyncio.CancelledError
+
+        resilience.executor.run = cancelled  # type: ignore[method-assign]
+        with pytest.raises(asyncio.CancelledError):
+            await resilience.run("guilds.get", lambda: None)
+        assert resilience.breaker.state == "half_open"
+
+        now[0] = 500.0
+        resilience.executor = QueryExecutor(max_workers=1)
+        assert await resilience.run("guilds.get", lambda: "ok") == "ok"
+        assert resilience.breaker.state == "closed"
+
+
+class TestResilienceAgainstFakePostgrest:
+    """Tests for services using Resilience against a fake PostgREST."""
+
+    @pytest.mark.asyncio
+    async def test_read_retries_transient_failures(self) -> None:
+        """Test that a read succeeds after a gateway error and a timeout."""
+        fake = FakePostgrest(gateway_error(), httpx.ReadTimeout("timed out"), ok([GUILD_ROW]))
+        resilience = make_resilience()
+        service = GuildService(fake.client(), resilience=resilience)
+
+        guild = await service.find_by_guild_id("123")
+
+        assert guild is not None and guild.name == "Test"
+        assert len(fake.requests) == 3
+        stats = resilience.stats()["guilds.get"]
+        assert (stats.calls, stats.retries, stats.failures) == (1, 2, 0)
+
+    @pytest.mark.asyncio
+    async def test_read_gives_up_after_attempts(self) -> None:
+        """Test that the last transient error is raised once attempts are used up."""
+        fake = FakePostgrest(gateway_error(500))
+        resilience = make_resilience(attempts=2)
+        service = EventService(fake.client(), resilience=resilience)
+
+        with pytest.raises(APIError):
+            await service.find_by_ids(["00000000-0000-0000-0000-000000000001"])
+
+        assert len(fake.requests) == 2
+        assert resilience.stats()["events.by_ids"].failures == 1
+
+    @pytest.mark.asyncio
+    async def test_inserts_are_not_retried(self) -> None:
+        """Test that non-idempotent inserts are attempted once."""
+        fake = FakePostgrest(gateway_error())
+        resilience = make_resilience()
+        service = GuildService(fake.client(), resilience=resilience)
+
+        with pytest.raises(APIError):
+            await service.create(GuildCreate(guild_id="123", name="Test"))
+
+        assert len(fake.requests) == 1
+        assert fake.requests[0].method == "POST"
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self) -> None:
+        """Test that a PostgREST error about the request fails immediately."""
+        body = {"code": "22P02", "message": "invalid input syntax", "hint": None, "details": None}
+        fake = FakePostgrest(httpx.Response(400, content=json.dumps(body)))
+        resilience = make_resilience(threshold=1)
+        service = EventService(fake.client(), resilience=resilience)
+
+        with pytest.raises(APIError):
+            await service.find_by_ids(["not-a-uuid"])
+
+        assert len(fake.requests) == 1
+        assert resilience.breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self) -> None:
+        """Test that calls are rejected without a request while the circuit is open."""
+        now = [0.0]
+        fake = FakePostgrest(httpx.ConnectError("refused"))
+        resilience = make_resilience(attempts=3, threshold=3, clock=lambda: now[0])
+        events = EventService(fake.client(), resilience=resilience)
+        guilds = GuildService(fake.client(), resilience=resilience)
+
+        with pytest.raises(httpx.ConnectError):
+            await events.get_settings("123")
+        assert resilience.breaker.state == "open"
+
+        with pytest.raises(CircuitOpenError):
+            await guilds.find_by_guild_id("123")
+        assert len(fake.requests) == 3
+        assert resilience.stats()["guilds.get"].rejected == 1
+
+        now[0] = 30.0
+        fake.responses = [ok([GUILD_ROW])]
+        assert await guilds.find_by_guild_id("123") is not None
+        assert resilience.breaker.state == "closed"
@@ -0,0 +1,81 @@
+"""Tests for SingleFlight."""
+
+import asyncio
+
+import pytest
+
+from src.services.singleflight import FlightStats, SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self) -> None:
+        """Test that concurrent callers of one key await a single call."""
+        flights = SingleFlight()
+        release = asyncio.Event()
+        executions = 0
+
+        async def fetch() -> str:
+            nonlocal executions
+            executions += 1
+            await release.wait()
+            return "result"
+
+        callers = [asyncio.ensure_future(flights.do("key", fetch)) for _ in range(10)]
+        await asyncio.sleep(0)
+        assert flights.inflight == 1
+        release.set()
+
+        assert await asyncio.gather(*callers) == ["result"] * 10
+        assert executions == 1
+        assert flights.inflight == 0
+        assert flights.stats() == {"key": FlightStats(calls=10, executions=1)}
+        assert flights.stats()["key"].shared == 9
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_execute_again(self) -> None:
+        """Test that a finished call is not reused by later callers."""
+        flights = SingleFlight()
+        results = iter([1, 2])
+
+        async def fetch() -> int:
+            return next(results)
+
+        assert await flights.do("key", fetch) == 1
+        assert await flights.do("key", fetch) == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_every_caller(self) -> None:
+        """Test that all waiting callers receive the call's exception."""
+        flights = SingleFlight()
+
+        async def fetch() -> None:
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            flights.do("key", fetch), flights.do("key", fetch), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flights.stats()["key"].executions == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self) -> None:
+        """Test that cancelling one caller leaves the shared call running."""
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch() -> str:
+            await release.wait()
+            return "result"
+
+        first = asyncio.ensure_future(flights.do("key", fetch))
+        second = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "result"
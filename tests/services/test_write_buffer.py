@@ -0,0 +1,94 @@
+"""Tests for GuildWriteBuffer."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.models import GuildCreate
+from src.services import GuildWriteBuffer
+
+
+class TestGuildWriteBuffer:
+    """Tests for GuildWriteBuffer."""
+
+    @pytest.mark.asyncio
+    async def test_collapses_updates_per_guild(self) -> None:
+        """Test that only the latest state of each guild is written, in one batch."""
+        guilds = MagicMock(upsert_many=AsyncMock())
+        buffer = GuildWriteBuffer(guilds)
+
+        buffer.put(GuildCreate(guild_id="1", name="A"))
+        buffer.put(GuildCreate(guild_id="1", name="B"))
+        buffer.put(GuildCreate(guild_id="2", name="C"))
+        buffer.put(GuildCreate(guild_id="3", name="Gone"))
+        await buffer.discard("3")
+
+        assert await buffer.flush() == 2
+        written = list(guilds.upsert_many.call_args.args[0])
+        assert [(g.guild_id, g.name) for g in written] == [("1", "B"), ("2", "C")]
+        stats = buffer.stats()
+        assert (stats.pending, stats.queued, stats.written, stats.coalesced) == (0, 4, 2, 2)
+        assert stats.flushes == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_flush_does_not_write(self) -> None:
+        """Test that an empty buffer makes no request."""
+        guilds = MagicMock(upsert_many=AsyncMock())
+
+        assert await GuildWriteBuffer(guilds).flush() == 0
+        guilds.upsert_many.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_rows_unless_superseded(self) -> None:
+        """Test that rows of a failed flush are retried without overwriting newer ones."""
+        buffer = GuildWriteBuffer(MagicMock())
+
+        async def fail(rows: object) -> None:
+            buffer.put(GuildCreate(guild_id="1", name="Newer"))
+            raise RuntimeError("down")
+
+        buffer.guilds.upsert_many = AsyncMock(side_effect=fail)
+        buffer.put(GuildCreate(guild_id="1", name="Old"))
+        buffer.put(GuildCreate(guild_id="2", name="Kept"))
+
+        with pytest.raises(RuntimeError):
+            await buffer.flush()
+
+        buffer.guilds.upsert_many = AsyncMock()
+        await buffer.flush()
+        written = list(buffer.guilds.upsert_many.call_args.args[0])
+        assert sorted((g.guild_id, g.name) for g in written) == [("1", "Newer"), ("2", "Kept")]
+        assert buffer.stats().failures == 1
+
+    @pytest.mark.asyncio
+    async def test_discard_during_failed_flush_is_not_requeued(self) -> None:
+        """Test that a guild removed mid-flush is neither re-queued nor deleted too early."""
+        buffer = GuildWriteBuffer(MagicMock())
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def fail(rows: object) -> None:
+            started.set()
+            await release.wait()
+            raise RuntimeError("down")
+
+        buffer.guilds.upsert_many = AsyncMock(side_effect=fail)
+        buffer.put(GuildCreate(guild_id="1", name="Gone"))
+        buffer.put(GuildCreate(guild_id="2", name="Kept"))
+        flush = asyncio.create_task(buffer.flush())
+        await started.wait()
+
+        discard = asyncio.create_task(buffer.discard("1"))
+        await asyncio.sleep(0)
+        # The caller's delete must wait for the in-flight upsert
+        assert not discard.done()
+        release.set()
+        with pytest.raises(RuntimeError):
+            await flush
+        await discard
+
+        buffer.guilds.upsert_many = AsyncMock()
+        await buffer.flush()
+        written = list(buffer.guilds.upsert_many.call_args.args[0])
+        assert [g.guild_id for g in written] == ["2"]
@@ -0,0 +1,81 @@
+"""Tests for the columnar event batch."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.models import NotificationPayload  # noqa: E402
+from src.tasks.batch import EventBatch, epoch_minutes  # noqa: E402
+from src.tasks.schedule import NotificationSchedule  # noqa: E402
+from tests.tasks.test_schedule import JST, NOW, make_event  # noqa: E402
+
+
+def mixed_events() -> list:
+    """Events covering timed, all-day, second-offset and multi-notification cases."""
+    return [
+        make_event("timed", notifications=[NotificationPayload(key=0, num=1, ty="時間前")]),
+        make_event(
+            "seconds",
+            start_at=NOW + timedelta(minutes=30, seconds=30),
+            notifications=[NotificationPayload(key=0, num=10, ty="分前")],
+        ),
+        make_event(
+            "all_day",
+            start_at=datetime(2024, 1, 16, tzinfo=UTC),
+            is_all_day=True,
+            notifications=[
+                NotificationPayload(key=0, num=14, ty="時間前"),
+                NotificationPayload(key=1, num=1, ty="日前"),
+            ],
+        ),
+        make_event("utc", start_at=datetime(2024, 1, 15, 1, 0, tzinfo=UTC)),
+    ]
+
+
+class TestEventBatch:
+    """Tests for EventBatch."""
+
+    def test_layout(self) -> None:
+        """Test the per-event and ragged per-notification arrays."""
+        batch = EventBatch(mixed_events())
+
+        assert len(batch) == 4
+        assert batch.all_day.tolist() == [False, False, True, False]
+        assert batch.offsets.tolist() == [0, 2, 4, 7, 8]
+        assert batch.keys.tolist() == [-1, 4, -1, 1, -1, 9, 16, -1]
+        assert batch.leads.tolist() == [0, 60, 0, 10, 0, 1440, 840, 0]
+        assert batch.start[0] == epoch_minutes(NOW + timedelta(hours=1))
+
+    def test_all_day_anchor_is_midnight_jst(self) -> None:
+        """Test that all-day events use midnight JST of their date."""
+        start = datetime(2024, 1, 16, 15, 0, tzinfo=UTC)
+
+        assert epoch_minutes(start, is_all_day=True) == epoch_minutes(
+            datetime(2024, 1, 16, tzinfo=JST)
+        )
+
+    def test_due_pairs(self) -> None:
+        """Test the due (event, key) pairs at one minute."""
+        batch = EventBatch(mixed_events())
+
+        assert sorted(batch.due_pairs(NOW)) == [("all_day", 16), ("timed", 4), ("utc", -1)]
+        assert batch.due_pairs(NOW - timedelta(minutes=1)) == []
+
+    @pytest.mark.parametrize("grace_minutes", [1, 10])
+    def test_matches_schedule(self, grace_minutes: int) -> None:
+        """Test that every minute yields what NotificationSchedule.pop_due does."""
+        events = mixed_events()
+        batch = EventBatch(events)
+        grace = timedelta(minutes=grace_minutes)
+
+        for minute in range(-24 * 60, 3 * 60):
+            now = NOW + timedelta(minutes=minute)
+            # pop_due removes what it returns, so each minute gets a fresh schedule
+            schedule = NotificationSchedule()
+            schedule.sync(events)
+            expected = schedule.pop_due(now, grace)
+            assert sorted(batch.due(now, grace), key=lambda d: (d.event.id, d.fire_at)) == sorted(
+                expected, key=lambda d: (d.event.id, d.fire_at)
+            )
@@ -0,0 +1,89 @@
+"""Tests for the notification dispatcher."""
+
+import asyncio
+
+import pytest
+
+from src.tasks.dispatch import DispatchJob, NotificationDispatcher
+from src.utils.datetime import get_jst_now
+
+
+class TestNotificationDispatcher:
+    """Tests for NotificationDispatcher."""
+
+    @pytest.mark.asyncio
+    async def test_preserves_order_within_channel(self) -> None:
+        """Test that jobs for one channel are sent sequentially in order."""
+        sent: list[int] = []
+
+        def job(channel_id: int, index: int) -> DispatchJob:
+            async def send() -> int:
+                await asyncio.sleep(0)
+                sent.append(index)
+                return 1
+
+            return DispatchJob(channel_id=channel_id, fire_at=get_jst_now(), send=send)
+
+        dispatcher = NotificationDispatcher(max_workers=4)
+        report = await dispatcher.dispatch([job(1, i) for i in range(5)])
+
+        assert sent == [0, 1, 2, 3, 4]
+        assert report.sent == 5
+        assert report.channels == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_channel_does_not_block_others(self) -> None:
+        """Test that channels are drained concurrently."""
+        release = asyncio.Event()
+        fast_done = asyncio.Event()
+
+        async def slow() -> int:
+            await release.wait()
+            return 1
+
+        async def fast() -> int:
+            fast_done.set()
+            return 1
+
+        dispatcher = NotificationDispatcher(max_workers=2)
+        task = asyncio.ensure_future(
+            dispatcher.dispatch(
+                [
+                    DispatchJob(channel_id=1, fire_at=get_jst_now(), send=slow),
+                    DispatchJob(channel_id=2, fire_at=get_jst_now(), send=fast),
+                ]
+            )
+        )
+
+        await asyncio.wait_for(fast_done.wait(), timeout=5)
+        release.set()
+        report = await task
+
+        assert report.sent == 2
+        assert report.channels == 2
+
+    @pytest.mark.asyncio
+    async def test_counts_failures(self) -> None:
+        """Test that failed and raising jobs are reported without aborting the round."""
+
+        async def refused() -> int:
+            return 0
+
+        async def broken() -> int:
+            raise RuntimeError("boom")
+
+        async def ok() -> int:
+            return 3
+
+        dispatcher = NotificationDispatcher()
+        report = await dispatcher.dispatch(
+            [
+                DispatchJob(channel_id=1, fire_at=get_jst_now(), send=refused),
+                DispatchJob(channel_id=1, fire_at=get_jst_now(), send=broken, size=2),
+                DispatchJob(channel_id=1, fire_at=get_jst_now(), send=ok, size=3),
+            ]
+        )
+
+        assert (report.sent, report.failed, report.messages) == (3, 3, 3)
+        assert report.max_lateness >= 0
+        assert dispatcher.last_report == report
@@ -0,0 +1,59 @@
+"""Tests for due notifications read through next_notify_at."""
+
+from datetime import UTC, datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.models import SCHEDULE_COLUMNS, Event, NotificationPayload
+from src.services import EventService
+from src.tasks.due import DueEventQuery
+
+JST = timezone(timedelta(hours=9))
+
+NOW = datetime(2024, 1, 15, 10, 0, tzinfo=JST)
+
+
+def make_event(event_id: str, start_at: datetime) -> Event:
+    """Create an event notified an hour before its start."""
+    return Event(
+        id=event_id,
+        guild_id="123",
+        name=f"Event {event_id}",
+        description=None,
+        color="#FF0000",
+        is_all_day=False,
+        start_at=start_at,
+        end_at=start_at + timedelta(hours=1),
+        location=None,
+        channel_id=None,
+        channel_name=None,
+        notifications=[NotificationPayload(key=0, num=1, ty="時間前")],
+        created_at=datetime(2024, 1, 1, tzinfo=UTC),
+        updated_at=datetime(2024, 1, 1, tzinfo=UTC),
+    )
+
+
+class TestDueEventQuery:
+    """Tests for DueEventQuery."""
+
+    @pytest.mark.asyncio
+    async def test_pop_due_then_advance_fetched_events(self) -> None:
+        """Test that every fetched event is advanced, even when nothing was due."""
+        service = MagicMock(spec=EventService)
+        due = make_event("1", NOW + timedelta(hours=1))
+        # Fetched after its fire time passed the grace window
+        late = make_event("2", NOW + timedelta(minutes=30))
+        service.find_due_events = AsyncMock(return_value=[due, late])
+        service.advance_next_notify_at = AsyncMock()
+        query = DueEventQuery(service, grace=timedelta(minutes=5))
+
+        notifications = await query.pop_due(NOW)
+
+        service.find_due_events.assert_called_once_with(NOW, columns=SCHEDULE_COLUMNS)
+        assert [(d.event.id, str(d.notification)) for d in notifications] == [("1", "1時間前")]
+
+        await query.advance(NOW)
+        await query.advance(NOW)
+
+        service.advance_next_notify_at.assert_called_once_with(["1", "2"], NOW)
@@ -0,0 +1,103 @@
+"""Tests for the delivery ledger."""
+
+from datetime import UTC, datetime, timedelta, timezone
+from pathlib import Path
+
+from src.models import Event, NotificationPayload
+from src.tasks.ledger import DeliveryLedger
+from src.tasks.schedule import DueNotification
+
+JST = timezone(timedelta(hours=9))
+
+NOW = datetime(2024, 1, 15, 10, 0, tzinfo=JST)
+
+
+def make_due(event_id: str, key: int = -1, fire_at: datetime = NOW) -> DueNotification:
+    """Create a due notification for ledger tests."""
+    event = Event(
+        id=event_id,
+        guild_id="123",
+        name=f"Event {event_id}",
+        description=None,
+        color="#FF0000",
+        is_all_day=False,
+        start_at=fire_at,
+        end_at=fire_at + timedelta(hours=1),
+        location=None,
+        channel_id=None,
+        channel_name=None,
+        notifications=[],
+        created_at=datetime(2024, 1, 1, tzinfo=UTC),
+        updated_at=datetime(2024, 1, 1, tzinfo=UTC),
+    )
+    return DueNotification(
+        event=event,
+        notification=NotificationPayload(key=key, num=0, ty="分前"),
+        fire_at=fire_at,
+        start=fire_at,
+        end=fire_at + timedelta(hours=1),
+    )
+
+
+class TestDeliveryLedger:
+    """Tests for DeliveryLedger."""
+
+    def test_excludes_recorded_deliveries(self) -> None:
+        """Test that only the exact (event, key, fire time) recorded is excluded."""
+        ledger = DeliveryLedger()
+        ledger.record([make_due("1")])
+
+        remaining = ledger.exclude_delivered(
+            [
+                make_due("1"),
+                make_due("1", key=0),
+                make_due("1", fire_at=NOW + timedelta(days=1)),
+                make_due("2"),
+            ]
+        )
+
+        assert [(d.event.id, d.notification.key) for d in remaining] == [
+            ("1", 0),
+            ("1", -1),
+            ("2", -1),
+        ]
+        assert remaining[1].fire_at == NOW + timedelta(days=1)
+
+    def test_fire_time_timezone_does_not_matter(self) -> None:
+        """Test that the same instant in another timezone matches."""
+        ledger = DeliveryLedger()
+        ledger.record([make_due("1")])
+
+        assert ledger.exclude_delivered([make_due("1", fire_at=NOW.astimezone(UTC))]) == []
+
+    def test_survives_reopen(self, tmp_path: Path) -> None:
+        """Test that deliveries persist across restarts."""
+        path = str(tmp_path / "ledger" / "notify.db")
+        ledger = DeliveryLedger(path)
+        ledger.record([make_due("1")])
+        ledger.close()
+
+        reopened = DeliveryLedger(path)
+        assert reopened.exclude_delivered([make_due("1")]) == []
+        reopened.close()
+
+    def test_last_tick_persists_and_advances(self, tmp_path: Path) -> None:
+        """Test that only the latest finished tick is kept across restarts."""
+        path = str(tmp_path / "notify.db")
+        ledger = DeliveryLedger(path)
+        assert ledger.last_tick() is None
+        ledger.record_tick(NOW)
+        ledger.record_tick(NOW + timedelta(minutes=1))
+        ledger.close()
+
+        reopened = DeliveryLedger(path)
+        assert reopened.last_tick() == NOW + timedelta(minutes=1)
+        reopened.close()
+
+    def test_prune_removes_old_rows(self) -> None:
+        """Test that prune forgets deliveries fired before the cutoff."""
+        ledger = DeliveryLedger()
+        ledger.record([make_due("1", fire_at=NOW - timedelta(minutes=30)), make_due("2")])
+
+        assert ledger.prune(NOW - timedelta(minutes=10)) == 1
+        assert len(ledger) == 1
@@ -0,0 +1,217 @@
+"""Tests for the schedule loader."""
+
+from datetime import UTC, datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.models import SCHEDULE_COLUMNS, Event
+from src.services.change_feed import RowChange
+from src.tasks.loader import WATERMARK_OVERLAP, ScheduleLoader
+from src.tasks.schedule import NotificationSchedule
+
+JST = timezone(timedelta(hours=9))
+
+NOW = datetime(2024, 1, 15, 10, 0, tzinfo=JST)
+
+
+def make_event(
+    event_id: str,
+    start_at: datetime,
+    updated_at: datetime = datetime(2024, 1, 1, tzinfo=UTC),
+) -> Event:
+    """Create an event for loader tests."""
+    return Event(
+        id=event_id,
+        guild_id="123",
+        name=f"Event {event_id}",
+        description=None,
+        color="#FF0000",
+        is_all_day=False,
+        start_at=start_at,
+        end_at=start_at + timedelta(hours=1),
+        location=None,
+        channel_id=None,
+        channel_name=None,
+        notifications=[],
+        created_at=datetime(2024, 1, 1, tzinfo=UTC),
+        updated_at=updated_at,
+    )
+
+
+def make_service() -> MagicMock:
+    """Create an EventService mock returning no rows."""
+    service = MagicMock()
+    service.find_events_starting_between = AsyncMock(return_value=[])
+    service.find_events_updated_since = AsyncMock(return_value=[])
+    service.find_event_versions_between = AsyncMock(return_value={})
+    service.find_by_ids = AsyncMock(return_value=[])
+    return service
+
+
+class TestScheduleLoader:
+    """Tests for ScheduleLoader."""
+
+    @pytest.mark.asyncio
+    async def test_first_advance_loads_whole_window(self) -> None:
+        """Test that the first advance fetches [now, horizon)."""
+        service = make_service()
+        service.find_events_starting_between.return_value = [
+            make_event("1", NOW + timedelta(hours=1))
+        ]
+        schedule = NotificationSchedule()
+        loader = ScheduleLoader(service, schedule, lookahead=timedelta(days=7))
+
+        await loader.advance(NOW)
+
+        service.find_events_starting_between.assert_called_once_with(
+            NOW, loader.horizon(NOW), columns=SCHEDULE_COLUMNS
+        )
+        service.find_events_updated_since.assert_not_called()
+        assert "1" in schedule
+
+    @pytest.mark.asyncio
+    async def test_grace_extends_window_into_the_past(self) -> None:
+        """Test that events within the grace window are loaded for catch-up."""
+        service = make_service()
+        schedule = NotificationSchedule()
+        loader = ScheduleLoader(service, schedule, grace=timedelta(minutes=10))
+
+        await loader.advance(NOW)
+
+        service.find_events_starting_between.assert_called_once_with(
+            NOW - timedelta(minutes=10), loader.horizon(NOW), columns=SCHEDULE_COLUMNS
+        )
+
+    @pytest.mark.asyncio
+    async def test_later_advances_fetch_only_new_slice_and_changes(self) -> None:
+        """Test that subsequent ticks fetch the new slice and rows past the watermark."""
+        service = make_service()
+        schedule = NotificationSchedule()
+        loader = ScheduleLoader(service, schedule, lookahead=timedelta(days=7))
+
+        await loader.advance(NOW)
+        watermark = loader.watermark
+        later = NOW + timedelta(minutes=1)
+        service.find_events_starting_between.return_value = [
+            make_event("2", loader.horizon(later) - timedelta(seconds=1))
+        ]
+        await loader.advance(later)
+
+        service.find_events_starting_between.assert_called_with(
+            loader.horizon(NOW), loader.horizon(later), columns=SCHEDULE_COLUMNS
+        )
+        service.find_events_updated_since.assert_called_once()
+        since = service.find_events_updated_since.call_args[0][0]
+        assert watermark is not None and since < watermark
+        assert loader.watermark is not None and loader.watermark >= watermark
+        assert "2" in schedule
+
+    @pytest.mark.asyncio
+    async def test_change_sync_applies_edits_and_moves(self) -> None:
+        """Test that changed rows are re-indexed or dropped when moved out of the window."""
+        service = make_service()
+        service.find_events_starting_between.return_value = [
+            make_event("1", NOW + timedelta(hours=1)),
+            make_event("2", NOW + timedelta(hours=2)),
+        ]
+        schedule = NotificationSchedule()
+        loader = ScheduleLoader(service, schedule, lookahead=timedelta(days=7))
+        await loader.advance(NOW)
+
+        edited_at = datetime(2024, 1, 2, tzinfo=UTC)
+        service.find_events_starting_between.return_value = []
+        service.find_events_updated_since.return_value = [
+            make_event("1", NOW + timedelta(minutes=30), updated_at=edited_at),
+            make_event("2", NOW + timedelta(days=60), updated_at=edited_at),
+            make_event("3", NOW + timedelta(hours=3), updated_at=edited_at),
+        ]
+        await loader.advance(NOW + timedelta(minutes=1))
+
+        assert schedule.versions() == {"1": edited_at, "3": edited_at}
+        assert schedule.next_fire_at == NOW + timedelta(minutes=30)
+
+    @pytest.mark.asyncio
+    async def test_reconcile_drops_deleted_and_refreshes_stale_events(self) -> None:
+        """Test that reconciliation detects hard deletes using (id, updated_at) only."""
+        service = make_service()
+        service.find_events_starting_between.return_value = [
+            make_event("1", NOW + timedelta(hours=1)),
+            make_event("2", NOW + timedelta(hours=2)),
+        ]
+        schedule = NotificationSchedule()
+        loader = ScheduleLoader(
+            service, schedule, lookahead=timedelta(days=7), reconcile_interval=timedelta(minutes=10)
+        )
+        await loader.advance(NOW)
+
+        edited_at = datetime(2024, 1, 2, tzinfo=UTC)
+        service.find_events_starting_between.return_value = []
+        service.find_event_versions_between.return_value = {"2": edited_at}
+        service.find_by_ids.return_value = [
+            make_event("2", NOW + timedelta(hours=4), updated_at=edited_at)
+        ]
+
+        await loader.advance(NOW + timedelta(minutes=5))
+        service.find_event_versions_between.assert_not_called()
+
+        await loader.advance(NOW + timedelta(minutes=10))
+        service.find_by_ids.assert_called_once_with(["2"], columns=SCHEDULE_COLUMNS)
+        assert schedule.versions() == {"2": edited_at}
+
+    @pytest.mark.asyncio
+    async def test_pushed_changes_replace_polling_while_connected(self) -> None:
+        """Test that a connected change feed skips the watermark poll."""
+        service = make_service()
+        feed = MagicMock()
+        feed.connected = True
+        schedule = NotificationSchedule()
+        loader = ScheduleLoader(service, schedule, lookahead=timedelta(days=7), change_feed=feed)
+        await loader.advance(NOW)
+
+        loader.apply_change(
+            RowChange(
+                table="events",
+                type="INSERT",
+                record={
+                    "id": "1",
+                    "guild_id": "123",
+                    "name": "Pushed",
+                    "start_at": (NOW + timedelta(hours=1)).isoformat(),
+                    "end_at": (NOW + timedelta(hours=2)).isoformat(),
+                    "created_at": "2024-01-01T00:00:00Z",
+                    "updated_at": "2024-01-01T00:00:00Z",
+                },
+            ),
+            NOW,
+        )
+        assert "1" in schedule
+
+        await loader.advance(NOW + timedelta(minutes=1))
+        service.find_events_updated_since.assert_not_called()
+
+        loader.apply_change(RowChange(table="events", type="DELETE", old_record={"id": "1"}), NOW)
+        assert "1" not in schedule
+
+        feed.connected = False
+        await loader.advance(NOW + timedelta(minutes=2))
+        service.find_events_updated_since.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_polls_once_when_feed_connects(self) -> None:
+        """Test that rows written before the subscription are polled from the old watermark."""
+        service = make_service()
+        feed = MagicMock()
+        feed.connected = False
+        loader = ScheduleLoader(service, NotificationSchedule(), change_feed=feed)
+        await loader.advance(NOW)
+        watermark = loader.watermark
+        assert watermark is not None
+
+        feed.connected = True
+        await loader.advance(NOW + timedelta(minutes=1))
+        service.find_events_updated_since.assert_called_once()
+        assert service.find_events_updated_since.call_args[0][0] == watermark - WATERMARK_OVERLAP
+
+        await loader.advance(NOW + timedelta(minutes=2))
+        service.find_events_updated_since.assert_called_once()
@@ -0,0 +1,54 @@
+"""Tests for metrics task."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.services import EndpointStats, ExecutorStats, HttpPoolStats, ResponseStats
+from src.tasks.metrics import MetricsTask
+
+
+class TestMetricsTask:
+    """Tests for MetricsTask."""
+
+    @pytest.mark.asyncio
+    async def test_log_stats_includes_pools_and_response_sizes(self, mock_bot: MagicMock) -> None:
+        """Test that pool, endpoint and response size statistics are logged."""
+        mock_bot.http_pool = MagicMock()
+        mock_bot.query_executor = MagicMock()
+        mock_bot.resilience = MagicMock()
+        mock_bot.http_pool.stats.return_value = HttpPoolStats(
+            max_connections=16, connections=3, idle=2, http2=3, requests=40
+        )
+        mock_bot.query_executor.stats.return_value = ExecutorStats(
+            max_workers=8, queue_depth=0, running=1, completed=4, total_wait=0.2, max_wait=0.1
+        )
+        mock_bot.resilience.breaker.state = "closed"
+        mock_bot.resilience.stats.return_value = {
+            "events.by_ids": EndpointStats(calls=4, failures=1, retries=2, rejected=0)
+        }
+        mock_bot.http_pool.response_stats.return_value = {
+            "GET events?select=id": ResponseStats(responses=2, bytes=100, wire_bytes=60)
+        }
+
+        cog = MetricsTask(mock_bot)
+        with patch("src.tasks.metrics.logger") as logger:
+            cog.log_stats()
+        await cog.cog_unload()
+
+        pools, endpoints, responses = (call.kwargs for call in logger.info.call_args_list)
+        assert pools["http_pool"]["active"] == 1
+        assert pools["http_pool"]["requests"] == 40
+        assert pools["query_executor"]["average_wait"] == 0.05
+        assert endpoints["circuit"] == "closed"
+        assert endpoints["endpoints"]["events.by_ids"]["error_rate"] == 0.25
+        assert responses["queries"]["GET events?select=id"]["bytes"] == 100
+
+    @pytest.mark.asyncio
+    async def test_disabled_when_interval_is_zero(self, mock_bot: MagicMock) -> None:
+        """Test that the loop is not started when the interval is 0."""
+        mock_bot.config = MagicMock(metrics_interval_seconds=0)
+
+        cog = MetricsTask(mock_bot)
+
+        assert not cog.metrics_loop.is_running()
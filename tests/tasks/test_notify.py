@@ -1,36 +1,96 @@
 """Tests for notification task."""
 
+from dataclasses import replace
 from datetime import UTC, datetime, timedelta, timezone
+from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import discord
+import httpx
 import pytest
 
+from src.config import Config
 from src.models import Event, EventSettings, NotificationPayload
-from src.tasks.notify import NotifyTask
+from src.tasks.notify import (
+    NotifyTask,
+    RenderedNotification,
+    batch_for_message,
+    get_notification_label,
+    join_within_limit,
+)
+from src.tasks.schedule import DueNotification
+from src.utils.embeds import create_notification_embed
 
 JST = timezone(timedelta(hours=9))
 
 
+def make_text_channel(channel_id: int) -> MagicMock:
+    """Create a mock that passes isinstance checks for discord.TextChannel."""
+    channel = MagicMock(spec=discord.TextChannel)
+    channel.id = channel_id
+    channel.send = AsyncMock()
+    return channel
+
+
+def make_event(
+    event_id: str, start_at: datetime | None = None, description: str | None = None
+) -> Event:
+    """Create a one-hour timed event in guild 123."""
+    start_at = start_at or datetime.now(JST).replace(second=0, microsecond=0)
+    return Event(
+        id=event_id,
+        guild_id="123",
+        name="Test Event",
+        description=description,
+        color="#FF0000",
+        is_all_day=False,
+        start_at=start_at,
+        end_at=start_at + timedelta(hours=1),
+        location=None,
+        channel_id=None,
+        channel_name=None,
+        notifications=[],
+        created_at=datetime.now(UTC),
+        updated_at=datetime.now(UTC),
+    )
+
+
+def make_rendered(event: Event) -> RenderedNotification:
+    """Render the event-start notification of an event."""
+    notification = NotificationPayload(key=-1, num=0, ty="分前")
+    label = get_notification_label(notification)
+    due = DueNotification(
+        event=event,
+        notification=notification,
+        fire_at=event.start_at,
+        start=event.start_at,
+        end=event.end_at,
+    )
+    return RenderedNotification(due=due, label=label, embed=create_notification_embed(event, label))
+
+
 class TestNotifyTask:
     """Tests for NotifyTask."""
 
     @pytest.mark.asyncio
-    async def test_process_notifications_fetches_events(
-        self, mock_bot: MagicMock
-    ) -> None:
-        """Test that _process_notifications fetches future events."""
-        mock_bot.event_service.find_all_future_events = AsyncMock(return_value=[])
+    async def test_process_notifications_fetches_events(self, mock_bot: MagicMock) -> None:
+        """Test that _process_notifications fetches events within the horizon only."""
+        mock_bot.event_service.find_events_starting_between = AsyncMock(return_value=[])
 
         cog = NotifyTask(mock_bot)
         await cog._process_notifications()
 
-        mock_bot.event_service.find_all_future_events.assert_called_once()
+        mock_bot.event_service.find_events_starting_between.assert_called_once()
+        start, end = mock_bot.event_service.find_events_starting_between.call_args[0]
+        assert end - start < timedelta(days=10)
+        mock_bot.event_service.find_all_future_events.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_check_event_notifications_skips_when_no_settings(
-        self, mock_bot: MagicMock
+    async def test_process_notifications_sends_due_notification(
+        self, mock_bot: MagicMock, mock_channel: MagicMock
     ) -> None:
-        """Test that _check_event_notifications skips when no settings exist."""
+        """Test that an event starting this minute is delivered exactly once."""
+        jst_now = datetime.now(JST).replace(second=0, microsecond=0)
         event = Event(
             id="1",
             guild_id="123",
@@ -38,8 +98,8 @@ class TestNotifyTask:
             description=None,
             color="#FF0000",
             is_all_day=False,
-            start_at=datetime.now(JST) + timedelta(hours=1),
-            end_at=datetime.now(JST) + timedelta(hours=2),
+            start_at=jst_now,
+            end_at=jst_now + timedelta(hours=1),
             location=None,
             channel_id=None,
             channel_name=None,
@@ -48,163 +108,300 @@ class TestNotifyTask:
             updated_at=datetime.now(UTC),
         )
 
-        mock_bot.event_service.get_settings = AsyncMock(return_value=None)
+        settings = EventSettings(id=1, guild_id="123", channel_id="456")
+        mock_bot.event_service.find_events_starting_between = AsyncMock(return_value=[event])
+        mock_bot.event_service.get_settings_many = AsyncMock(return_value={"123": settings})
 
-        cog = NotifyTask(mock_bot)
-        await cog._check_event_notifications(event, datetime.now(JST))
+        text_channel = make_text_channel(456)
+        mock_bot.get_channel = MagicMock(return_value=text_channel)
 
-        mock_bot.event_service.get_settings.assert_called_once_with("123")
-        mock_bot.get_channel.assert_not_called()
+        cog = NotifyTask(mock_bot)
+        cog._send_notifications = AsyncMock(return_value=1)  # type: ignore[method-assign]
+        with patch("src.tasks.notify.datetime") as mock_datetime:
+            mock_datetime.now.return_value = jst_now
+            await cog._process_notifications()
+            await cog._process_notifications()
+
+        cog._send_notifications.assert_called_once()
+        channel, batch = cog._send_notifications.call_args[0]
+        assert channel is text_channel
+        assert [item.due.event for item in batch] == [event]
+        assert batch[0].due.notification.key == -1
+        mock_bot.get_channel.assert_called_once_with(456)
+        mock_bot.event_service.get_settings_many.assert_called_once()
+        assert cog.dispatcher.last_report is not None
+        assert cog.dispatcher.last_report.sent == 1
 
     @pytest.mark.asyncio
-    async def test_check_event_notifications_skips_when_no_channel(
+    async def test_process_notifications_skips_guilds_without_settings(
         self, mock_bot: MagicMock
     ) -> None:
-        """Test that _check_event_notifications skips when channel not found."""
-        event = Event(
-            id="1",
-            guild_id="123",
-            name="Test Event",
-            description=None,
-            color="#FF0000",
-            is_all_day=False,
-            start_at=datetime.now(JST) + timedelta(hours=1),
-            end_at=datetime.now(JST) + timedelta(hours=2),
-            location=None,
-            channel_id=None,
-            channel_name=None,
-            notifications=[],
-            created_at=datetime.now(UTC),
-            updated_at=datetime.now(UTC),
-        )
+        """Test that settings are fetched once per tick and unset guilds are skipped."""
+        jst_now = datetime.now(JST).replace(second=0, microsecond=0)
+        events = [
+            Event(
+                id=str(i),
+                guild_id=guild_id,
+                name="Test Event",
+                description=None,
+                color="#FF0000",
+                is_all_day=False,
+                start_at=jst_now,
+                end_at=jst_now + timedelta(hours=1),
+                location=None,
+                channel_id=None,
+                channel_name=None,
+                notifications=[],
+                created_at=datetime.now(UTC),
+                updated_at=datetime.now(UTC),
+            )
+            for i, guild_id in enumerate(["123", "123", "999"])
+        ]
 
         settings = EventSettings(id=1, guild_id="123", channel_id="456")
-        mock_bot.event_service.get_settings = AsyncMock(return_value=settings)
-        mock_bot.get_channel = AsyncMock(return_value=None)
+        mock_bot.event_service.find_events_starting_between = AsyncMock(return_value=events)
+        mock_bot.event_service.get_settings_many = AsyncMock(return_value={"123": settings})
+
+        mock_bot.get_channel = MagicMock(return_value=make_text_channel(456))
 
         cog = NotifyTask(mock_bot)
-        await cog._check_event_notifications(event, datetime.now(JST))
+        cog._send_notifications = AsyncMock(return_value=2)  # type: ignore[method-assign]
+        with patch("src.tasks.notify.datetime") as mock_datetime:
+            mock_datetime.now.return_value = jst_now
+            await cog._process_notifications()
+
+        mock_bot.event_service.get_settings_many.assert_called_once()
+        assert set(mock_bot.event_service.get_settings_many.call_args[0][0]) == {"123", "999"}
+        cog._send_notifications.assert_called_once()
+        _, batch = cog._send_notifications.call_args[0]
+        assert {item.due.event.id for item in batch} == {"0", "1"}
+        mock_bot.event_service.get_settings.assert_not_called()
 
-        mock_bot.get_channel.assert_called_once_with(456)
-        # get_channel returns None, so we can't call send on it
-        # The test verifies that no send was attempted when channel is None
+    @pytest.mark.asyncio
+    async def test_process_notifications_loads_details_of_firing_events(
+        self, mock_bot: MagicMock
+    ) -> None:
+        """Test that partial scheduled events are completed before rendering."""
+        jst_now = datetime.now(JST).replace(second=0, microsecond=0)
+        complete = make_event("1", start_at=jst_now, description="Agenda")
+        partial = replace(complete, name="", description=None, partial=True)
+        settings = EventSettings(id=1, guild_id="123", channel_id="456")
+        mock_bot.event_service.find_events_starting_between = AsyncMock(return_value=[partial])
+        mock_bot.event_service.get_settings_many = AsyncMock(return_value={"123": settings})
+        mock_bot.event_service.load_details = AsyncMock(return_value={"1": complete})
+        mock_bot.get_channel = MagicMock(return_value=make_text_channel(456))
+
+        cog = NotifyTask(mock_bot)
+        cog._send_notifications = AsyncMock(return_value=1)  # type: ignore[method-assign]
+        with patch("src.tasks.notify.datetime") as mock_datetime:
+            mock_datetime.now.return_value = jst_now
+            await cog._process_notifications()
+
+        assert [e.id for e in mock_bot.event_service.load_details.call_args[0][0]] == ["1"]
+        _, batch = cog._send_notifications.call_args[0]
+        assert batch[0].due.event is complete
+        assert batch[0].embed.title == "Test Event"
+        assert batch[0].embed.description == "Agenda"
 
     @pytest.mark.asyncio
-    async def test_send_notification_sends_embed(
-        self, mock_bot: MagicMock, mock_channel: MagicMock
+    async def test_process_notifications_survives_refresh_failure(
+        self, mock_bot: MagicMock
     ) -> None:
-        """Test that _send_notification sends embed successfully."""
-        event = Event(
-            id="1",
-            guild_id="123",
-            name="Test Event",
-            description="Test Description",
-            color="#FF0000",
-            is_all_day=False,
-            start_at=datetime.now(JST),
-            end_at=datetime.now(JST) + timedelta(hours=1),
-            location=None,
-            channel_id=None,
-            channel_name=None,
-            notifications=[],
-            created_at=datetime.now(UTC),
-            updated_at=datetime.now(UTC),
-        )
+        """Test that loaded notifications still fire while Supabase is unavailable."""
+        jst_now = datetime.now(JST).replace(second=0, microsecond=0)
+        event = make_event("1", start_at=jst_now + timedelta(minutes=1))
+        settings = EventSettings(id=1, guild_id="123", channel_id="456")
+        mock_bot.event_service.find_events_starting_between = AsyncMock(return_value=[event])
+        mock_bot.event_service.get_settings_many = AsyncMock(return_value={"123": settings})
+        mock_bot.get_channel = MagicMock(return_value=make_text_channel(456))
 
-        notification = NotificationPayload(key=-1, num=0, ty="分前")
-        start = datetime.now(JST)
-        end = datetime.now(JST) + timedelta(hours=1)
+        cog = NotifyTask(mock_bot)
+        cog._send_notifications = AsyncMock(return_value=1)  # type: ignore[method-assign]
+        with patch("src.tasks.notify.datetime") as mock_datetime:
+            mock_datetime.now.return_value = jst_now
+            await cog._process_notifications()
+            mock_bot.event_service.find_events_updated_since = AsyncMock(
+                side_effect=httpx.ConnectError("refused")
+            )
+            mock_datetime.now.return_value = jst_now + timedelta(minutes=1)
+            await cog._process_notifications()
+
+        cog._send_notifications.assert_called_once()
 
-        with patch("src.tasks.notify.create_notification_embed") as mock_create_embed:
-            mock_embed = MagicMock()
-            mock_create_embed.return_value = mock_embed
+    @pytest.mark.asyncio
+    async def test_process_notifications_queries_next_notify_at(self, mock_bot: MagicMock) -> None:
+        """Test that NOTIFY_NEXT_AT delivers from the due query and then advances it."""
+        mock_bot.config = replace(mock_bot.config, notify_next_at=True)
+        jst_now = datetime.now(JST).replace(second=0, microsecond=0)
+        event = make_event("1", start_at=jst_now)
+        settings = EventSettings(id=1, guild_id="123", channel_id="456")
+        mock_bot.event_service.find_due_events = AsyncMock(return_value=[event])
+        mock_bot.event_service.advance_next_notify_at = AsyncMock()
+        mock_bot.event_service.get_settings_many = AsyncMock(return_value={"123": settings})
+        mock_bot.get_channel = MagicMock(return_value=make_text_channel(456))
 
-            cog = NotifyTask(mock_bot)
-            await cog._send_notification(mock_channel, event, notification, start, end)
+        cog = NotifyTask(mock_bot)
+        # Tick by hand only; the started loop would query the same rows
+        cog.notify_loop.cancel()
+        cog._send_notifications = AsyncMock(return_value=1)  # type: ignore[method-assign]
+        with patch("src.tasks.notify.datetime") as mock_datetime:
+            mock_datetime.now.return_value = jst_now
+            await cog._process_notifications()
 
-            mock_channel.send.assert_called_once_with(embed=mock_embed)
-            mock_create_embed.assert_called_once()
+        cog._send_notifications.assert_called_once()
+        mock_bot.event_service.find_events_starting_between.assert_not_called()
+        mock_bot.event_service.advance_next_notify_at.assert_called_once_with(["1"], jst_now)
 
     @pytest.mark.asyncio
-    async def test_send_notification_handles_forbidden_error(
-        self, mock_bot: MagicMock, mock_channel: MagicMock
+    async def test_get_notification_channel_skips_when_no_channel(
+        self, mock_bot: MagicMock
     ) -> None:
-        """Test that _send_notification handles Forbidden error gracefully."""
-        import discord
+        """Test that no channel is resolved when it is not found."""
+        settings = EventSettings(id=1, guild_id="123", channel_id="456")
+        mock_bot.get_channel = MagicMock(return_value=None)
 
-        event = Event(
-            id="1",
-            guild_id="123",
-            name="Test Event",
-            description=None,
-            color="#FF0000",
-            is_all_day=False,
-            start_at=datetime.now(JST),
-            end_at=datetime.now(JST) + timedelta(hours=1),
-            location=None,
-            channel_id=None,
-            channel_name=None,
-            notifications=[],
-            created_at=datetime.now(UTC),
-            updated_at=datetime.now(UTC),
-        )
+        cog = NotifyTask(mock_bot)
 
-        notification = NotificationPayload(key=-1, num=0, ty="分前")
-        start = datetime.now(JST)
-        end = datetime.now(JST) + timedelta(hours=1)
+        assert cog._get_notification_channel(settings) is None
+        mock_bot.get_channel.assert_called_once_with(456)
 
-        mock_channel.send = AsyncMock(side_effect=discord.Forbidden(MagicMock(), ""))
+    @pytest.mark.asyncio
+    async def test_process_notifications_coalesces_per_channel(self, mock_bot: MagicMock) -> None:
+        """Test that same-minute notifications share messages of up to 10 embeds."""
+        jst_now = datetime.now(JST).replace(second=0, microsecond=0)
+        events = [make_event(str(i), start_at=jst_now) for i in range(12)]
+        settings = EventSettings(id=1, guild_id="123", channel_id="456")
+        mock_bot.event_service.find_events_starting_between = AsyncMock(return_value=events)
+        mock_bot.event_service.get_settings_many = AsyncMock(return_value={"123": settings})
 
-        with patch("src.tasks.notify.create_notification_embed"):
-            cog = NotifyTask(mock_bot)
-            await cog._send_notification(mock_channel, event, notification, start, end)
+        text_channel = make_text_channel(456)
+        mock_bot.get_channel = MagicMock(return_value=text_channel)
 
-            mock_channel.send.assert_called_once()
+        cog = NotifyTask(mock_bot)
+        with patch("src.tasks.notify.datetime") as mock_datetime:
+            mock_datetime.now.return_value = jst_now
+            await cog._process_notifications()
+
+        assert text_channel.send.call_count == 2
+        sizes = [len(call.kwargs["embeds"]) for call in text_channel.send.call_args_list]
+        assert sizes == [10, 2]
+        assert cog.dispatcher.last_report is not None
+        assert cog.dispatcher.last_report.sent == 12
+        assert cog.dispatcher.last_report.messages == 2
 
     @pytest.mark.asyncio
-    async def test_send_notification_handles_http_exception(
-        self, mock_bot: MagicMock, mock_channel: MagicMock
+    async def test_restart_catches_up_without_resending(
+        self, mock_bot: MagicMock, test_config: Config, tmp_path: Path
     ) -> None:
-        """Test that _send_notification falls back to plain text on HTTPException."""
-        import discord
+        """Test that a restarted cog sends missed notifications but not delivered ones."""
+        jst_now = datetime.now(JST).replace(second=0, microsecond=0)
+        delivered = make_event("1", start_at=jst_now)
+        missed = make_event("2", start_at=jst_now + timedelta(minutes=1))
+        settings = EventSettings(id=1, guild_id="123", channel_id="456")
+        mock_bot.config = replace(test_config, notify_ledger_path=str(tmp_path / "ledger.db"))
+        mock_bot.event_service.find_events_starting_between = AsyncMock(return_value=[delivered])
+        mock_bot.event_service.get_settings_many = AsyncMock(return_value={"123": settings})
 
-        event = Event(
-            id="1",
-            guild_id="123",
-            name="Test Event",
-            description="Test Description",
-            color="#FF0000",
-            is_all_day=False,
-            start_at=datetime.now(JST),
-            end_at=datetime.now(JST) + timedelta(hours=1),
-            location=None,
-            channel_id=None,
-            channel_name=None,
-            notifications=[],
-            created_at=datetime.now(UTC),
-            updated_at=datetime.now(UTC),
+        text_channel = make_text_channel(456)
+        mock_bot.get_channel = MagicMock(return_value=text_channel)
+
+        cog = NotifyTask(mock_bot)
+        with patch("src.tasks.notify.datetime") as mock_datetime:
+            mock_datetime.now.return_value = jst_now
+            await cog._process_notifications()
+        await cog.cog_unload()
+        assert text_channel.send.call_count == 1
+
+        # The bot was down for the next few minutes
+        mock_bot.event_service.find_events_starting_between = AsyncMock(
+            return_value=[delivered, missed]
         )
+        restarted = NotifyTask(mock_bot)
+        with patch("src.tasks.notify.datetime") as mock_datetime:
+            mock_datetime.now.return_value = jst_now + timedelta(minutes=3)
+            await restarted._process_notifications()
+        await restarted.cog_unload()
 
-        notification = NotificationPayload(key=-1, num=0, ty="分前")
-        start = datetime.now(JST)
-        end = datetime.now(JST) + timedelta(hours=1)
+        assert text_channel.send.call_count == 2
+        assert restarted.dispatcher.last_report is not None
+        assert restarted.dispatcher.last_report.sent == 1
+
+    @pytest.mark.asyncio
+    async def test_event_created_after_reminder_time_is_not_caught_up(
+        self, mock_bot: MagicMock
+    ) -> None:
+        """Test that a reminder whose time passed before the event existed is not sent late."""
+        jst_now = datetime.now(JST).replace(second=0, microsecond=0)
+        settings = EventSettings(id=1, guild_id="123", channel_id="456")
+        mock_bot.event_service.find_events_starting_between = AsyncMock(return_value=[])
+        mock_bot.event_service.find_events_updated_since = AsyncMock(return_value=[])
+        mock_bot.event_service.find_event_versions_between = AsyncMock(return_value={})
+        mock_bot.event_service.get_settings_many = AsyncMock(return_value={"123": settings})
+        mock_bot.get_channel = MagicMock(return_value=make_text_channel(456))
+
+        cog = NotifyTask(mock_bot)
+        cog.notify_loop.cancel()
+        cog._send_notifications = AsyncMock(return_value=1)  # type: ignore[method-assign]
+        with patch("src.tasks.notify.datetime") as mock_datetime:
+            mock_datetime.now.return_value = jst_now
+            await cog._process_notifications()
+
+            # Created a minute later, starting in 8 minutes with a 10分前 reminder
+            event = replace(
+                make_event("1", start_at=jst_now + timedelta(minutes=9)),
+                notifications=[NotificationPayload(key=0, num=10, ty="分前")],
+            )
+            mock_bot.event_service.find_events_updated_since.return_value = [event]
+            mock_datetime.now.return_value = jst_now + timedelta(minutes=1)
+            await cog._process_notifications()
+
+        cog._send_notifications.assert_not_called()
 
-        mock_channel.send = AsyncMock(side_effect=[discord.HTTPException(MagicMock(), ""), None])
+    @pytest.mark.asyncio
+    async def test_send_notifications_sends_embeds(self, mock_bot: MagicMock) -> None:
+        """Test that _send_notifications sends all embeds in one message."""
+        channel = make_text_channel(456)
+        batch = [make_rendered(make_event("1")), make_rendered(make_event("2"))]
 
-        with patch("src.tasks.notify.create_notification_embed"):
-            cog = NotifyTask(mock_bot)
-            await cog._send_notification(mock_channel, event, notification, start, end)
+        cog = NotifyTask(mock_bot)
+        delivered = await cog._send_notifications(channel, batch)
 
-            assert mock_channel.send.call_count == 2
-            # Second call should be with plain text content
-            second_call = mock_channel.send.call_args_list[1]
-            assert "content" in second_call.kwargs or len(second_call.args) > 0
+        channel.send.assert_called_once_with(embeds=[item.embed for item in batch])
+        assert delivered == 2
 
     @pytest.mark.asyncio
-    async def test_check_event_notifications_handles_all_day_event(
+    async def test_send_notifications_handles_forbidden_error(self, mock_bot: MagicMock) -> None:
+        """Test that _send_notifications handles Forbidden error gracefully."""
+        channel = make_text_channel(456)
+        channel.send = AsyncMock(side_effect=discord.Forbidden(MagicMock(), ""))
+
+        cog = NotifyTask(mock_bot)
+        delivered = await cog._send_notifications(channel, [make_rendered(make_event("1"))])
+
+        channel.send.assert_called_once()
+        assert delivered == 0
+
+    @pytest.mark.asyncio
+    async def test_send_notifications_handles_http_exception(self, mock_bot: MagicMock) -> None:
+        """Test that _send_notifications falls back to plain text on HTTPException."""
+        channel = make_text_channel(456)
+        channel.send = AsyncMock(side_effect=[discord.HTTPException(MagicMock(), ""), None])
+        batch = [make_rendered(make_event("1")), make_rendered(make_event("2"))]
+
+        cog = NotifyTask(mock_bot)
+        delivered = await cog._send_notifications(channel, batch)
+
+        # Both notifications fit in a single plain text message
+        assert channel.send.call_count == 2
+        content = channel.send.call_args_list[1].args[0]
+        assert content.count("Test Event") == 2
+        assert delivered == 2
+
+    @pytest.mark.asyncio
+    async def test_process_notifications_handles_all_day_event(
         self, mock_bot: MagicMock, mock_channel: MagicMock
     ) -> None:
-        """Test that _check_event_notifications handles all-day events correctly."""
+        """Test that all-day events are not notified at the wrong time."""
         event = Event(
             id="1",
             guild_id="123",
@@ -223,85 +420,45 @@ class TestNotifyTask:
         )
 
         settings = EventSettings(id=1, guild_id="123", channel_id="456")
-        mock_bot.event_service.get_settings = AsyncMock(return_value=settings)
-        mock_bot.get_channel = AsyncMock(return_value=mock_channel)
+        mock_bot.event_service.find_events_starting_between = AsyncMock(return_value=[event])
+        mock_bot.event_service.get_settings_many = AsyncMock(return_value={"123": settings})
+        mock_bot.get_channel = MagicMock(return_value=mock_channel)
 
         cog = NotifyTask(mock_bot)
         # Use a time that won't trigger notification
         jst_now = datetime(2024, 1, 14, 23, 0, 0, tzinfo=JST)
-        await cog._check_event_notifications(event, jst_now)
+        with patch("src.tasks.notify.datetime") as mock_datetime:
+            mock_datetime.now.return_value = jst_now
+            await cog._process_notifications()
 
         # Should not send notification for all-day event at wrong time
         mock_channel.send.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_notification_label_for_event_time(self, mock_bot: MagicMock, mock_channel: MagicMock) -> None:
-        """Test that notification label is correct for event time notification."""
-        event = Event(
-            id="1",
-            guild_id="123",
-            name="Test Event",
-            description=None,
-            color="#FF0000",
-            is_all_day=False,
-            start_at=datetime.now(JST),
-            end_at=datetime.now(JST) + timedelta(hours=1),
-            location=None,
-            channel_id=None,
-            channel_name=None,
-            notifications=[],
-            created_at=datetime.now(UTC),
-            updated_at=datetime.now(UTC),
-        )
-
-        notification = NotificationPayload(key=-1, num=0, ty="分前")
-        start = datetime.now(JST)
-        end = datetime.now(JST) + timedelta(hours=1)
 
-        with patch("src.tasks.notify.create_notification_embed") as mock_create_embed:
-            mock_embed = MagicMock()
-            mock_create_embed.return_value = mock_embed
+class TestNotificationFormatting:
+    """Tests for notification formatting helpers."""
 
-            cog = NotifyTask(mock_bot)
-            await cog._send_notification(mock_channel, event, notification, start, end)
+    def test_notification_label_for_event_time(self) -> None:
+        """Test that notification label is correct for event time notification."""
+        notification = NotificationPayload(key=-1, num=0, ty="分前")
 
-            # Check that create_notification_embed was called with correct label
-            call_args = mock_create_embed.call_args
-            assert "以下の予定が開催されます" in call_args[0][1]
+        assert get_notification_label(notification) == "以下の予定が開催されます"
 
-    @pytest.mark.asyncio
-    async def test_notification_label_for_before_event(
-        self, mock_bot: MagicMock, mock_channel: MagicMock
-    ) -> None:
+    def test_notification_label_for_before_event(self) -> None:
         """Test that notification label is correct for before-event notification."""
-        event = Event(
-            id="1",
-            guild_id="123",
-            name="Test Event",
-            description=None,
-            color="#FF0000",
-            is_all_day=False,
-            start_at=datetime.now(JST),
-            end_at=datetime.now(JST) + timedelta(hours=1),
-            location=None,
-            channel_id=None,
-            channel_name=None,
-            notifications=[],
-            created_at=datetime.now(UTC),
-            updated_at=datetime.now(UTC),
-        )
-
         notification = NotificationPayload(key=0, num=30, ty="分前")
-        start = datetime.now(JST)
-        end = datetime.now(JST) + timedelta(hours=1)
 
-        with patch("src.tasks.notify.create_notification_embed") as mock_create_embed:
-            mock_embed = MagicMock()
-            mock_create_embed.return_value = mock_embed
+        assert get_notification_label(notification) == "30分後に以下の予定が開催されます"
+
+    def test_batch_for_message_respects_total_length(self) -> None:
+        """Test that batches are split before exceeding the embed character limit."""
+        long_event = make_event("1", description="x" * 4000)
+        batch = [make_rendered(long_event), make_rendered(make_event("2", description="y" * 4000))]
 
-            cog = NotifyTask(mock_bot)
-            await cog._send_notification(mock_channel, event, notification, start, end)
+        assert [len(b) for b in batch_for_message(batch)] == [1, 1]
+        assert [len(b) for b in batch_for_message([make_rendered(make_event("3"))] * 11)] == [10, 1]
 
-            # Check that create_notification_embed was called with correct label
-            call_args = mock_create_embed.call_args
-            assert "30分後に以下の予定が開催されます" in call_args[0][1]
+    def test_join_within_limit(self) -> None:
+        """Test that blocks are packed into as few messages as fit the limit."""
+        assert join_within_limit(["aaa", "bbb", "ccc"], 8) == ["aaa\n\nbbb", "ccc"]
+        assert join_within_limit(["a" * 10], 5) == ["aaaaa"]
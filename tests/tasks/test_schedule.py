@@ -0,0 +1,132 @@
+"""Tests for the notification schedule."""
+
+from datetime import UTC, datetime, timedelta, timezone
+
+from src.models import Event, NotificationPayload
+from src.tasks.schedule import (
+    NotificationSchedule,
+    get_due_notifications,
+    get_notification_range,
+)
+
+JST = timezone(timedelta(hours=9))
+
+NOW = datetime(2024, 1, 15, 10, 0, tzinfo=JST)
+
+
+def make_event(
+    event_id: str = "1",
+    start_at: datetime = NOW + timedelta(hours=1),
+    notifications: list[NotificationPayload] | None = None,
+    updated_at: datetime = datetime(2024, 1, 1, tzinfo=UTC),
+    is_all_day: bool = False,
+) -> Event:
+    """Create an event for schedule tests."""
+    return Event(
+        id=event_id,
+        guild_id="123",
+        name=f"Event {event_id}",
+        description=None,
+        color="#FF0000",
+        is_all_day=is_all_day,
+        start_at=start_at,
+        end_at=start_at + timedelta(hours=1),
+        location=None,
+        channel_id=None,
+        channel_name=None,
+        notifications=notifications or [],
+        created_at=datetime(2024, 1, 1, tzinfo=UTC),
+        updated_at=updated_at,
+    )
+
+
+class TestNotificationSchedule:
+    """Tests for NotificationSchedule."""
+
+    def test_pop_due_returns_only_due_entries(self) -> None:
+        """Test that only entries firing in the current minute are popped."""
+        schedule = NotificationSchedule()
+        schedule.upsert(make_event(notifications=[NotificationPayload(key=0, num=1, ty="時間前")]))
+
+        assert schedule.pop_due(NOW - timedelta(minutes=1)) == []
+
+        due = schedule.pop_due(NOW)
+        assert [str(d.notification) for d in due] == ["1時間前"]
+        assert due[0].fire_at == NOW
+
+        # Already popped; the start-time entry is still an hour away
+        assert schedule.pop_due(NOW) == []
+        assert schedule.next_fire_at == NOW + timedelta(hours=1)
+
+    def test_pop_due_discards_missed_entries(self) -> None:
+        """Test that entries whose minute has passed are dropped."""
+        schedule = NotificationSchedule()
+        schedule.upsert(make_event(start_at=NOW))
+
+        assert schedule.pop_due(NOW + timedelta(minutes=1)) == []
+        assert schedule.next_fire_at is None
+
+    def test_pop_due_catches_up_within_grace(self) -> None:
+        """Test that entries missed by less than the grace window are still popped."""
+        schedule = NotificationSchedule()
+        schedule.upsert(make_event("1", start_at=NOW))
+        schedule.upsert(make_event("2", start_at=NOW - timedelta(minutes=10)))
+
+        due = schedule.pop_due(NOW + timedelta(minutes=5), grace=timedelta(minutes=10))
+
+        assert [d.event.id for d in due] == ["1"]
+
+    def test_sync_only_reindexes_changed_events(self) -> None:
+        """Test that sync adds, updates and removes events incrementally."""
+        schedule = NotificationSchedule()
+        first = make_event("1")
+        second = make_event("2")
+
+        assert schedule.sync([first, second]) == (2, 0, 0)
+        assert schedule.sync([first, second]) == (0, 0, 0)
+
+        moved = make_event(
+            "1",
+            start_at=NOW + timedelta(minutes=30),
+            updated_at=datetime(2024, 1, 2, tzinfo=UTC),
+        )
+        assert schedule.sync([moved]) == (0, 1, 1)
+        assert "2" not in schedule
+        assert schedule.next_fire_at == NOW + timedelta(minutes=30)
+
+    def test_removed_event_is_not_popped(self) -> None:
+        """Test that stale heap entries of removed events are skipped."""
+        schedule = NotificationSchedule()
+        schedule.upsert(make_event(start_at=NOW))
+        schedule.remove("1")
+
+        assert schedule.pop_due(NOW) == []
+
+    def test_all_day_event_fires_at_midnight_jst(self) -> None:
+        """Test that all-day events are anchored at midnight JST."""
+        event = make_event(start_at=datetime(2024, 1, 16, 0, 0, tzinfo=UTC), is_all_day=True)
+        start, _ = get_notification_range(event)
+
+        assert start == datetime(2024, 1, 16, 0, 0, tzinfo=JST)
+
+
+class TestGetDueNotifications:
+    """Tests for get_due_notifications."""
+
+    def test_matches_pop_due(self) -> None:
+        """Test that the stateless check finds what the schedule pops, within grace."""
+        event = make_event(
+            notifications=[
+                NotificationPayload(key=0, num=1, ty="時間前"),
+                NotificationPayload(key=1, num=10, ty="分前"),
+            ]
+        )
+        grace = timedelta(minutes=5)
+
+        for minutes in range(0, 70):
+            now = NOW + timedelta(minutes=minutes)
+            schedule = NotificationSchedule()
+            schedule.upsert(event)
+            expected = schedule.pop_due(now, grace)
+
+            assert get_due_notifications(event, now, grace) == expected